@@ -0,0 +1,762 @@
+#!/usr/bin/env python3
+"""
+Initializer Skill Script: agent_channel
+
+Description:
+    Persistent WebSocket channel to an external agent.
+    One connection carries any number of concurrent requests, matched to
+    their responses by id, and push streams the agent sends on its own.
+    Ping frames keep the connection checked; when it goes quiet for too
+    long or drops, the channel reconnects with exponential backoff,
+    resumes its session (unanswered requests are re-sent, streams resume
+    after the last sequence number seen) and carries on. Round-trip times
+    are recorded per request. The WebSocket protocol (RFC 6455) is
+    implemented on the standard library, and a local echo server is
+    included for testing.
+
+Messages (JSON text frames):
+    {"type": "hello", "session": ...}
+    {"type": "request", "id": 1, "method": "echo", "params": {...}}
+    {"type": "response", "id": 1, "result": ... | "error": "..."}
+    {"type": "subscribe", "stream": "ticks", "from": 42}
+    {"type": "push", "stream": "ticks", "seq": 42, "data": ..., "sent_at": ...}
+"""
+
+import argparse
+import logging
+import base64
+import hashlib
+import json
+import os
+import random
+import socket
+import socketserver
+import ssl
+import struct
+import threading
+import time
+import urllib.parse
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from tracing import span, inject_headers
+
+WS_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+OP_CONTINUATION = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+MAX_MESSAGE = 16 * 1024 * 1024
+MAX_HANDSHAKE = 64 * 1024
+LATENCY_SAMPLES = 10000
+SESSION_CACHE = 1024
+SESSION_LIMIT = 256
+STREAM_HISTORY = 10000
+
+def main():
+    """Main script function"""
+    try:
+        parser = argparse.ArgumentParser(description='WebSocket channel to an external agent')
+        subparsers = parser.add_subparsers(dest='command', required=True)
+
+        serve_parser = subparsers.add_parser('serve', help='Run a local echo agent')
+        serve_parser.add_argument('--host', type=str, help='Address to listen on', default='127.0.0.1')
+        serve_parser.add_argument('--port', type=int, help='Port to listen on', default=8765)
+        serve_parser.add_argument('--tick', type=float, help='Publish to the "ticks" stream every N seconds', default=None)
+
+        request_parser = subparsers.add_parser('request', help='Send one request and print the result')
+        request_parser.add_argument('--url', type=str, help='Agent WebSocket URL', required=True)
+        request_parser.add_argument('--method', type=str, help='Request method', default='health')
+        request_parser.add_argument('--params', type=str, help='Request parameters (JSON)', default=None)
+        request_parser.add_argument('--timeout', type=float, help='Request timeout in seconds', default=30)
+
+        bench_parser = subparsers.add_parser('bench', help='Measure request latency over one channel')
+        bench_parser.add_argument('--url', type=str, help='Agent WebSocket URL', required=True)
+        bench_parser.add_argument('--requests', type=int, help='Number of requests', default=1000)
+        bench_parser.add_argument('--concurrency', type=int, help='Requests in flight at once', default=8)
+        bench_parser.add_argument('--size', type=int, help='Payload size in bytes', default=64)
+
+        args = parser.parse_args()
+
+        if args.command == 'serve':
+            server = EchoServer((args.host, args.port), tick=args.tick)
+            logging.info(f"Echo agent listening on ws://{args.host}:{server.server_address[1]}")
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                server.server_close()
+        elif args.command == 'request':
+            params = json.loads(args.params) if args.params else None
+            with AgentChannel(args.url, connect_timeout=args.timeout) as channel:
+                print(json.dumps(channel.request(args.method, params, args.timeout), indent=2))
+        elif args.command == 'bench':
+            with AgentChannel(args.url) as channel:
+                print(json.dumps(run_benchmark(channel, args.requests, args.concurrency, args.size), indent=2))
+
+        return 0
+
+    except Exception as e:
+        logging.exception(f"Agent channel failed: {str(e)}")
+        return 1
+
+def apply_mask(payload, key):
+    """XOR a payload with a 4-byte WebSocket masking key"""
+    n = len(payload)
+    if not n:
+        return b''
+    repeated = (key * (n // 4 + 1))[:n]
+    return (int.from_bytes(payload, 'little') ^ int.from_bytes(repeated, 'little')).to_bytes(n, 'little')
+
+def accept_key(key):
+    return base64.b64encode(hashlib.sha1((key + WS_GUID).encode('ascii')).digest()).decode('ascii')
+
+def read_http_head(sock):
+    """Read an HTTP head: (start line, headers, bytes read past the head)"""
+    data = b''
+    while b'\r\n\r\n' not in data:
+        chunk = sock.recv(4096)
+        if not chunk:
+            raise ConnectionError("Connection closed during handshake")
+        data += chunk
+        if len(data) > MAX_HANDSHAKE:
+            raise ConnectionError("Handshake too large")
+    head, rest = data.split(b'\r\n\r\n', 1)
+    lines = head.decode('latin-1').split('\r\n')
+    headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(':')
+        headers[name.strip().lower()] = value.strip()
+    return lines[0], headers, rest
+
+class WebSocket:
+    """RFC 6455 framing over a connected socket"""
+
+    def __init__(self, sock, mask, buffered=b''):
+        self.sock = sock
+        # Clients mask every frame they send; servers never do
+        self.mask = mask
+        self._buffer = bytearray(buffered)
+        self._send_lock = threading.Lock()
+        self._fragments = None
+        self._fragment_opcode = None
+
+    def send_frame(self, opcode, payload=b''):
+        n = len(payload)
+        mask_bit = 0x80 if self.mask else 0
+        header = bytearray([0x80 | opcode])
+        if n < 126:
+            header.append(mask_bit | n)
+        elif n < 65536:
+            header.append(mask_bit | 126)
+            header += struct.pack('!H', n)
+        else:
+            header.append(mask_bit | 127)
+            header += struct.pack('!Q', n)
+        if self.mask:
+            key = os.urandom(4)
+            header += key
+            payload = apply_mask(payload, key)
+        with self._send_lock:
+            self.sock.sendall(bytes(header) + payload)
+
+    def send_text(self, text):
+        self.send_frame(OP_TEXT, text.encode('utf-8'))
+
+    def _fill(self, n):
+        while len(self._buffer) < n:
+            chunk = self.sock.recv(max(65536, n - len(self._buffer)))
+            if not chunk:
+                raise ConnectionError("Connection closed by peer")
+            self._buffer += chunk
+
+    def recv_frame(self):
+        """Read one frame: (fin, opcode, payload).
+
+        Nothing is consumed until the frame is complete, so a socket timeout
+        leaves a partial frame buffered for the next call.
+        """
+        self._fill(2)
+        first, second = self._buffer[0], self._buffer[1]
+        length = second & 0x7F
+        position = 2
+        if length == 126:
+            self._fill(4)
+            length = struct.unpack_from('!H', self._buffer, 2)[0]
+            position = 4
+        elif length == 127:
+            self._fill(10)
+            length = struct.unpack_from('!Q', self._buffer, 2)[0]
+            position = 10
+        if length > MAX_MESSAGE:
+            raise ConnectionError(f"Frame of {length} bytes exceeds the {MAX_MESSAGE} byte limit")
+        key = None
+        if second & 0x80:
+            self._fill(position + 4)
+            key = bytes(self._buffer[position:position + 4])
+            position += 4
+        self._fill(position + length)
+        payload = bytes(self._buffer[position:position + length])
+        del self._buffer[:position + length]
+        if key:
+            payload = apply_mask(payload, key)
+        return bool(first & 0x80), first & 0x0F, payload
+
+    def recv_message(self):
+        """Read the next data message or control frame: (opcode, payload)"""
+        while True:
+            fin, opcode, payload = self.recv_frame()
+            if opcode >= OP_CLOSE:
+                # Control frames may arrive between the fragments of a message
+                return opcode, payload
+            if opcode == OP_CONTINUATION:
+                if self._fragments is None:
+                    raise ConnectionError("Unexpected continuation frame")
+                self._fragments += payload
+                if len(self._fragments) > MAX_MESSAGE:
+                    raise ConnectionError(f"Message exceeds the {MAX_MESSAGE} byte limit")
+                if fin:
+                    message, self._fragments = bytes(self._fragments), None
+                    return self._fragment_opcode, message
+            elif fin:
+                return opcode, payload
+            else:
+                self._fragments = bytearray(payload)
+                self._fragment_opcode = opcode
+
+    def close(self, code=1000):
+        try:
+            self.send_frame(OP_CLOSE, struct.pack('!H', code))
+        except OSError:
+            pass
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+def connect_websocket(url, timeout=10, headers=None):
+    """Open a client WebSocket to a ws://, wss://, http:// or https:// URL"""
+    parts = urllib.parse.urlsplit(url)
+    secure = parts.scheme in ('wss', 'https')
+    if parts.scheme not in ('ws', 'wss', 'http', 'https'):
+        raise ValueError(f"Unsupported URL scheme for WebSocket: {url}")
+    host = parts.hostname
+    port = parts.port or (443 if secure else 80)
+
+    sock = socket.create_connection((host, port), timeout)
+    try:
+        if secure:
+            sock = ssl.create_default_context().wrap_socket(sock, server_hostname=host)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        key = base64.b64encode(os.urandom(16)).decode('ascii')
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+        lines = [
+            f"GET {path} HTTP/1.1",
+            f"Host: {parts.netloc}",
+            "Upgrade: websocket",
+            "Connection: Upgrade",
+            f"Sec-WebSocket-Key: {key}",
+            "Sec-WebSocket-Version: 13"
+        ]
+        lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        sock.sendall(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+
+        status, response_headers, rest = read_http_head(sock)
+        if status.split(' ', 2)[1:2] != ['101']:
+            raise ConnectionError(f"WebSocket handshake rejected: {status}")
+        if response_headers.get('sec-websocket-accept') != accept_key(key):
+            raise ConnectionError("WebSocket handshake returned a bad accept key")
+        return WebSocket(sock, mask=True, buffered=rest)
+    except Exception:
+        sock.close()
+        raise
+
+class PendingRequest:
+    """A request awaiting its response"""
+
+    def __init__(self, request_id, message):
+        self.id = request_id
+        self.message = message
+        self.sent_at = time.perf_counter()
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+    def wait(self, timeout=None):
+        """Block for the result; raises on error or timeout"""
+        if not self.event.wait(timeout):
+            raise TimeoutError(f"Request {self.id} timed out after {timeout}s")
+        if self.error is not None:
+            raise RuntimeError(self.error)
+        return self.result
+
+def _summarize(samples):
+    if not samples:
+        return {'count': 0}
+    ordered = sorted(samples)
+    count = len(ordered)
+
+    def percentile(p):
+        return round(ordered[min(count - 1, int(p * count))], 3)
+    return {
+        'count': count,
+        'mean': round(sum(ordered) / count, 3),
+        'p50': percentile(0.50),
+        'p95': percentile(0.95),
+        'p99': percentile(0.99),
+        'max': round(ordered[-1], 3)
+    }
+
+class AgentChannel:
+    """Multiplexed request/response and push streams over one reconnecting WebSocket"""
+
+    def __init__(self, url, heartbeat_interval=5.0, heartbeat_timeout=15.0, connect_timeout=10.0,
+                 max_backoff=30.0, headers=None):
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme in ('http', 'https'):
+            url = urllib.parse.urlunsplit(('ws' if parts.scheme == 'http' else 'wss',) + tuple(parts[1:]))
+        self.url = url
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self.connect_timeout = connect_timeout
+        self.max_backoff = max_backoff
+        self.headers = headers or {}
+        self.session = os.urandom(8).hex()
+
+        self._lock = threading.Lock()
+        self._ws = None
+        self._next_id = 0
+        self._pending = {}
+        self._streams = {}
+        self._connected = threading.Event()
+        self._closed = threading.Event()
+        self._thread = None
+        self.last_error = None
+
+        self._latencies = deque(maxlen=LATENCY_SAMPLES)
+        self._push_latencies = deque(maxlen=LATENCY_SAMPLES)
+        self._counters = {'requests': 0, 'errors': 0, 'timeouts': 0, 'pushes': 0, 'connects': 0, 'disconnects': 0}
+        self._heartbeat_rtt = None
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def connect(self):
+        """Start the channel and wait for the first connection"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='agent-channel', daemon=True)
+            self._thread.start()
+        if not self._connected.wait(self.connect_timeout):
+            self.close()
+            raise ConnectionError(f"Could not connect to {self.url}: {self.last_error}")
+
+    @property
+    def connected(self):
+        return self._connected.is_set()
+
+    def _run(self):
+        attempt = 0
+        while not self._closed.is_set():
+            try:
+                ws = self._open()
+            except Exception as e:
+                self.last_error = str(e)
+                delay = min(self.max_backoff, 0.25 * 2 ** attempt) * random.uniform(0.5, 1.0)
+                attempt += 1
+                logging.debug(f"Connecting to {self.url} failed, retrying in {delay:.2f}s: {str(e)}")
+                self._closed.wait(delay)
+                continue
+
+            attempt = 0
+            try:
+                self._read_loop(ws)
+            except Exception as e:
+                self.last_error = str(e)
+                if not self._closed.is_set():
+                    logging.warning(f"Channel to {self.url} lost: {str(e)}")
+            finally:
+                with self._lock:
+                    self._ws = None
+                    self._connected.clear()
+                    self._counters['disconnects'] += 1
+                ws.close()
+
+    def _open(self):
+        """Connect, then resume the session: resubscribe streams and re-send unanswered requests"""
+        headers = inject_headers(self.headers)
+        ws = connect_websocket(self.url, self.connect_timeout, headers)
+        try:
+            ws.sock.settimeout(self.heartbeat_interval)
+            ws.send_text(json.dumps({'type': 'hello', 'session': self.session}))
+            with self._lock:
+                self._ws = ws
+                streams = [(name, state['last_seq']) for name, state in self._streams.items()]
+                pending = list(self._pending.values())
+            for name, last_seq in streams:
+                message = {'type': 'subscribe', 'stream': name}
+                if last_seq is not None:
+                    message['from'] = last_seq + 1
+                ws.send_text(json.dumps(message))
+            for request in pending:
+                ws.send_text(request.message)
+        except Exception:
+            with self._lock:
+                self._ws = None
+            ws.close()
+            raise
+        with self._lock:
+            self._counters['connects'] += 1
+        self._connected.set()
+        logging.info(f"Channel connected to {self.url}")
+        return ws
+
+    def _read_loop(self, ws):
+        last_received = time.monotonic()
+        last_ping = last_received
+        while not self._closed.is_set():
+            try:
+                opcode, payload = ws.recv_message()
+            except socket.timeout:
+                if time.monotonic() - last_received > self.heartbeat_timeout:
+                    raise ConnectionError(f"No traffic for {self.heartbeat_timeout}s")
+                ws.send_frame(OP_PING, struct.pack('!Q', time.perf_counter_ns()))
+                last_ping = time.monotonic()
+                continue
+
+            last_received = time.monotonic()
+            if opcode == OP_TEXT:
+                self._dispatch(json.loads(payload))
+            elif opcode == OP_PING:
+                ws.send_frame(OP_PONG, payload)
+            elif opcode == OP_PONG and len(payload) == 8:
+                self._heartbeat_rtt = (time.perf_counter_ns() - struct.unpack('!Q', payload)[0]) / 1e6
+            elif opcode == OP_CLOSE:
+                raise ConnectionError("Closed by peer")
+
+            if last_received - last_ping >= self.heartbeat_interval:
+                ws.send_frame(OP_PING, struct.pack('!Q', time.perf_counter_ns()))
+                last_ping = last_received
+
+    def _dispatch(self, message):
+        kind = message.get('type')
+        if kind == 'response':
+            with self._lock:
+                request = self._pending.pop(message.get('id'), None)
+                if request is None:
+                    return
+                if message.get('error') is not None:
+                    self._counters['errors'] += 1
+            self._latencies.append((time.perf_counter() - request.sent_at) * 1000)
+            if message.get('error') is not None:
+                request.error = message['error']
+            else:
+                request.result = message.get('result')
+            request.event.set()
+        elif kind == 'push':
+            with self._lock:
+                stream = self._streams.get(message.get('stream'))
+                seq = message.get('seq', 0)
+                # Pushes replayed after a resume may repeat ones already seen
+                if stream is None or (stream['last_seq'] is not None and seq <= stream['last_seq']):
+                    return
+                stream['last_seq'] = seq
+                self._counters['pushes'] += 1
+            if 'sent_at' in message:
+                self._push_latencies.append((time.time() - message['sent_at']) * 1000)
+            try:
+                stream['callback'](message.get('data'), seq)
+            except Exception as e:
+                logging.warning(f"Push handler for {message.get('stream')} failed: {str(e)}")
+
+    def send_request(self, method, params=None):
+        """Send a request without waiting; returns a PendingRequest"""
+        if self._closed.is_set():
+            raise ConnectionError("Channel is closed")
+        with self._lock:
+            self._next_id += 1
+            request_id = self._next_id
+            message = json.dumps({'type': 'request', 'id': request_id, 'method': method, 'params': params},
+                                 separators=(',', ':'))
+            request = PendingRequest(request_id, message)
+            self._pending[request_id] = request
+            self._counters['requests'] += 1
+            ws = self._ws
+        if ws is not None:
+            try:
+                ws.send_text(message)
+            except OSError:
+                # The reader notices the broken connection; _open re-sends on reconnect
+                pass
+        return request
+
+    def request(self, method, params=None, timeout=30):
+        """Send a request and wait for its result"""
+        with span('ws.request', method=method):
+            request = self.send_request(method, params)
+            try:
+                return request.wait(timeout)
+            except TimeoutError:
+                with self._lock:
+                    self._pending.pop(request.id, None)
+                    self._counters['timeouts'] += 1
+                raise
+
+    def subscribe(self, stream, callback, start=None):
+        """Receive a push stream; callback(data, seq) runs on the channel thread.
+
+        start is the first sequence number wanted (default: new pushes only).
+        """
+        with self._lock:
+            # last_seq stays None until the first push, so a resume before then asks for new pushes only
+            self._streams[stream] = {'callback': callback, 'last_seq': start - 1 if start is not None else None}
+            ws = self._ws
+        message = {'type': 'subscribe', 'stream': stream}
+        if start is not None:
+            message['from'] = start
+        if ws is not None:
+            try:
+                ws.send_text(json.dumps(message))
+            except OSError:
+                pass
+
+    def unsubscribe(self, stream):
+        with self._lock:
+            self._streams.pop(stream, None)
+            ws = self._ws
+        if ws is not None:
+            try:
+                ws.send_text(json.dumps({'type': 'unsubscribe', 'stream': stream}))
+            except OSError:
+                pass
+
+    def metrics(self):
+        """Counters and latency percentiles in milliseconds"""
+        with self._lock:
+            in_flight = len(self._pending)
+            counters = dict(self._counters)
+        return {
+            'url': self.url,
+            'connected': self.connected,
+            'in_flight': in_flight,
+            **counters,
+            'latency_ms': _summarize(list(self._latencies)),
+            'push_latency_ms': _summarize(list(self._push_latencies)),
+            'heartbeat_rtt_ms': round(self._heartbeat_rtt, 3) if self._heartbeat_rtt is not None else None
+        }
+
+    def close(self):
+        """Close the channel; unanswered requests fail"""
+        self._closed.set()
+        with self._lock:
+            ws = self._ws
+            pending = list(self._pending.values())
+            self._pending.clear()
+        if ws is not None:
+            ws.close()
+        for request in pending:
+            request.error = 'Channel closed'
+            request.event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+
+def run_benchmark(channel, requests, concurrency, size):
+    """Send requests with a fixed number in flight and report latency"""
+    payload = 'x' * size
+    started = time.perf_counter()
+    in_flight = deque()
+    for i in range(requests):
+        if len(in_flight) >= concurrency:
+            in_flight.popleft().wait(30)
+        in_flight.append(channel.send_request('echo', payload))
+    for request in in_flight:
+        request.wait(30)
+    elapsed = time.perf_counter() - started
+    return {'requests': requests, 'seconds': round(elapsed, 3), 'per_second': round(requests / elapsed), **channel.metrics()}
+
+class EchoServer(socketserver.ThreadingTCPServer):
+    """Local test agent: echoes requests, publishes streams, remembers sessions"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, tick=None):
+        super().__init__(address, EchoHandler)
+        self.lock = threading.Lock()
+        # Guards the session response caches, which request workers share
+        self.cache_lock = threading.Lock()
+        self.sessions = OrderedDict()
+        self.streams = {}
+        if tick:
+            threading.Thread(target=self._tick, args=(tick,), name='echo-ticker', daemon=True).start()
+
+    def _tick(self, interval):
+        count = 0
+        while True:
+            time.sleep(interval)
+            count += 1
+            self.publish('ticks', {'tick': count})
+
+    def _stream(self, name):
+        with self.lock:
+            # send_lock keeps one stream's pushes in sequence order without holding self.lock over socket writes
+            return self.streams.setdefault(name, {'seq': 0, 'history': deque(maxlen=STREAM_HISTORY), 'subscribers': set(),
+                                                  'send_lock': threading.Lock()})
+
+    def publish(self, name, data):
+        """Append to a stream and push to its subscribers; returns the sequence number"""
+        stream = self._stream(name)
+        with stream['send_lock']:
+            with self.lock:
+                stream['seq'] += 1
+                seq = stream['seq']
+                message = json.dumps({'type': 'push', 'stream': name, 'seq': seq, 'data': data, 'sent_at': time.time()})
+                stream['history'].append((seq, message))
+                subscribers = list(stream['subscribers'])
+            for ws in subscribers:
+                try:
+                    ws.send_text(message)
+                except OSError:
+                    with self.lock:
+                        stream['subscribers'].discard(ws)
+        return seq
+
+    def subscribe(self, name, ws, start=None):
+        """Subscribe, first replaying history from start when given"""
+        stream = self._stream(name)
+        with stream['send_lock']:
+            with self.lock:
+                replayed = [message for seq, message in stream['history'] if start is not None and seq >= start]
+                stream['subscribers'].add(ws)
+            for message in replayed:
+                ws.send_text(message)
+
+    def unsubscribe(self, ws, name=None):
+        with self.lock:
+            for stream_name, stream in self.streams.items():
+                if name is None or stream_name == name:
+                    stream['subscribers'].discard(ws)
+
+    def session_cache(self, session):
+        """Response cache of a session; the least recently resumed sessions are forgotten past SESSION_LIMIT"""
+        with self.cache_lock:
+            cache = self.sessions.setdefault(session, OrderedDict())
+            self.sessions.move_to_end(session)
+            while len(self.sessions) > SESSION_LIMIT:
+                self.sessions.popitem(last=False)
+            return cache
+
+class EchoHandler(socketserver.BaseRequestHandler):
+    """One echo server connection"""
+
+    def handle(self):
+        sock = self.request
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        try:
+            request_line, headers, rest = read_http_head(sock)
+        except ConnectionError:
+            return
+
+        path = request_line.split(' ')[1] if ' ' in request_line else '/'
+        if headers.get('upgrade', '').lower() != 'websocket':
+            body = b'ok' if path == '/health' else b'not found'
+            status = '200 OK' if path == '/health' else '404 Not Found'
+            sock.sendall(f"HTTP/1.1 {status}\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode('latin-1') + body)
+            return
+
+        key = headers.get('sec-websocket-key', '')
+        sock.sendall((
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept_key(key)}\r\n\r\n"
+        ).encode('latin-1'))
+
+        self.ws = WebSocket(sock, mask=False, buffered=rest)
+        self.cache = OrderedDict()
+        workers = ThreadPoolExecutor(max_workers=8, thread_name_prefix='echo-request')
+        try:
+            while True:
+                opcode, payload = self.ws.recv_message()
+                if opcode == OP_CLOSE:
+                    self.ws.close()
+                    break
+                if opcode == OP_PING:
+                    self.ws.send_frame(OP_PONG, payload)
+                    continue
+                if opcode != OP_TEXT:
+                    continue
+                message = json.loads(payload)
+                kind = message.get('type')
+                if kind == 'hello':
+                    self.cache = self.server.session_cache(message.get('session'))
+                elif kind == 'request':
+                    # Requests run concurrently, so responses may overtake each other
+                    workers.submit(self.handle_request, message)
+                elif kind == 'subscribe':
+                    self.server.subscribe(message['stream'], self.ws, message.get('from'))
+                elif kind == 'unsubscribe':
+                    self.server.unsubscribe(self.ws, message['stream'])
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self.server.unsubscribe(self.ws)
+            workers.shutdown(wait=False)
+
+    def handle_request(self, message):
+        request_id = message.get('id')
+        cache = self.cache
+        # A re-sent request after a reconnect gets the same answer, waiting for it if the first copy is still running
+        with self.server.cache_lock:
+            cached = cache.get(request_id)
+            if cached is None:
+                cached = cache[request_id] = Future()
+                while len(cache) > SESSION_CACHE:
+                    cache.popitem(last=False)
+                owner = True
+            else:
+                owner = False
+        if owner:
+            response = {'type': 'response', 'id': request_id}
+            try:
+                response['result'] = self.run_method(message.get('method'), message.get('params'))
+            except Exception as e:
+                response['error'] = str(e)
+            cached.set_result(json.dumps(response, separators=(',', ':')))
+        try:
+            self.ws.send_text(cached.result())
+        except OSError:
+            pass
+
+    def run_method(self, method, params):
+        if method == 'echo':
+            return params
+        if method == 'health':
+            return {'status': 'ok'}
+        if method == 'capabilities':
+            return {
+                'capabilities': {'echo': True, 'streams': sorted(self.server.streams), 'push': True},
+                'authentication': {'type': 'none'}
+            }
+        if method == 'sleep':
+            time.sleep(float(params or 0))
+            return {'slept': params}
+        if method == 'publish':
+            return {'seq': self.server.publish(params['stream'], params.get('data'))}
+        raise ValueError(f"Unknown method: {method}")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    exit(main())
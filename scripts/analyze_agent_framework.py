@@ -4,7 +4,8 @@ Initializer Skill Script: analyze_agent_framework
 
 Description:
     Analyze and understand different agent frameworks.
-    Supports analysis of OpenClaw, LangChain, CrewAI, and other agent systems.
+    Supports analysis of OpenClaw, LangChain, CrewAI, and any framework
+    declared through the framework registry (see framework_registry.py).
 """
 
 import argparse
@@ -16,11 +17,15 @@ import subprocess
 from pathlib import Path
 import importlib.util
 
+from framework_registry import get_framework_registry
+from tracing import traced, traced_run
+
+@traced('framework.main')
 def main():
     """Main script function"""
     try:
         parser = argparse.ArgumentParser(description='Analyze agent frameworks')
-        parser.add_argument('--target', type=str, help='Target framework (openclaw, langchain, crewai)', required=True)
+        parser.add_argument('--target', type=str, help='Target framework (openclaw, langchain, crewai, or a registered plugin)', required=True)
         parser.add_argument('--depth', type=str, help='Analysis depth (basic, full, comprehensive)', default='full')
         parser.add_argument('--compatibility', type=str, help='Compatibility mode (auto, strict, relaxed)', default='auto')
         parser.add_argument('--output', type=str, help='Output file for analysis results', default=None)
@@ -44,6 +49,7 @@ def main():
         logging.exception(f"Framework analysis failed: {str(e)}")
         return 1
 
+@traced('framework.analyze')
 def analyze_framework(target, depth, compatibility):
     """Analyze target agent framework"""
     logging.info(f"Analyzing framework: {target} at depth: {depth}")
@@ -73,6 +79,7 @@ def analyze_framework(target, depth, compatibility):
     
     return analysis
 
+@traced('framework.basic_analysis')
 def perform_basic_analysis(target, analysis):
     """Perform basic framework analysis"""
     logging.info(f"Performing basic analysis of {target}")
@@ -86,17 +93,15 @@ def perform_basic_analysis(target, analysis):
     }
     
     # Try to detect framework
-    if target == 'openclaw':
-        framework_info = detect_openclaw()
-    elif target == 'langchain':
-        framework_info = detect_langchain()
-    elif target == 'crewai':
-        framework_info = detect_crewai()
+    framework = get_framework_registry().get(target)
+    if framework:
+        framework_info = detect_framework(framework)
     
     analysis['capabilities'] = framework_info
     
     return analysis
 
+@traced('framework.deep_analysis')
 def perform_deep_analysis(target, analysis):
     """Perform deep framework analysis"""
     logging.info(f"Performing deep analysis of {target}")
@@ -118,85 +123,72 @@ def perform_deep_analysis(target, analysis):
     
     return analysis
 
-def detect_openclaw():
-    """Detect OpenClaw installation"""
+def detect_framework(framework):
+    """Detect a registered framework using its declared detection method"""
+    detect = framework['detect']
+    if 'command' in detect:
+        return detect_command(framework)
+    if 'module' in detect:
+        return detect_module(framework)
+    return {'detected': False, 'version': None, 'installation_path': None}
+
+def detect_command(framework):
+    """Detect a framework installed as a command line tool"""
+    detect = framework['detect']
     try:
-        # Check if OpenClaw is installed
-        result = subprocess.run(['openclaw', '--version'], capture_output=True, text=True)
+        # Check if the command is installed
+        result = traced_run(detect['command'], capture_output=True, text=True)
         if result.returncode == 0:
             return {
                 'detected': True,
                 'version': result.stdout.strip(),
-                'installation_path': find_openclaw_path(),
-                'configuration_files': find_openclaw_configs(),
-                'tooling': ['openclaw', 'sessions', 'skills', 'gateway'],
-                'capabilities': ['agent_management', 'skills', 'mcp_servers', 'sessions']
+                'installation_path': find_command_path(detect['command'][0]),
+                'configuration_files': find_config_files(detect.get('config_dirs', [])),
+                'tooling': framework['tooling'],
+                'capabilities': framework['capabilities']
             }
     except Exception as e:
-        logging.warning(f"OpenClaw detection failed: {str(e)}")
-    
-    return {'detected': False, 'version': None, 'installation_path': None}
-
-def detect_langchain():
-    """Detect LangChain installation"""
-    try:
-        # Try to import LangChain
-        spec = importlib.util.find_spec("langchain")
-        if spec:
-            import langchain
-            return {
-                'detected': True,
-                'version': getattr(langchain, '__version__', 'unknown'),
-                'installation_path': os.path.dirname(spec.origin),
-                'configuration_files': [],
-                'capabilities': ['chains', 'agents', 'tools', 'prompts', 'memory'],
-                'tooling': ['langchain', 'langchain-core', 'langchain-community']
-            }
-    except ImportError:
-        logging.warning("LangChain not installed")
+        logging.warning(f"{framework['name']} detection failed: {str(e)}")
     
     return {'detected': False, 'version': None, 'installation_path': None}
 
-def detect_crewai():
-    """Detect CrewAI installation"""
+def detect_module(framework):
+    """Detect a framework installed as a Python package"""
+    module_name = framework['detect']['module']
     try:
-        # Try to import CrewAI
-        spec = importlib.util.find_spec("crewai")
+        # Try to import the package
+        spec = importlib.util.find_spec(module_name)
         if spec:
-            import crewai
+            module = importlib.import_module(module_name)
             return {
                 'detected': True,
-                'version': getattr(crewai, '__version__', 'unknown'),
+                'version': getattr(module, '__version__', 'unknown'),
                 'installation_path': os.path.dirname(spec.origin),
                 'configuration_files': [],
-                'capabilities': ['agents', 'tasks', 'crews', 'tools', 'processes'],
-                'tooling': ['crewai', 'crewai-tools']
+                'capabilities': framework['capabilities'],
+                'tooling': framework['tooling']
             }
     except ImportError:
-        logging.warning("CrewAI not installed")
+        logging.warning(f"{framework['name']} not installed")
     
     return {'detected': False, 'version': None, 'installation_path': None}
 
-def find_openclaw_path():
-    """Find OpenClaw installation path"""
+def find_command_path(command):
+    """Find a command's installation path"""
     try:
-        result = subprocess.run(['where', 'openclaw'], capture_output=True, text=True)
+        result = traced_run(['where', command], capture_output=True, text=True)
         if result.returncode == 0:
-            return Path(result.stdout.strip()).parent.parent
+            return str(Path(result.stdout.strip()).parent.parent)
     except Exception:
         pass
     return None
 
-def find_openclaw_configs():
-    """Find OpenClaw configuration files"""
+def find_config_files(config_dirs):
+    """Find configuration files in a framework's configuration directories"""
     configs = []
-    config_dirs = [
-        os.path.expanduser('~/.openclaw'),
-        os.path.expanduser('~/AppData/Roaming/openclaw'),
-        '/etc/openclaw'
-    ]
     
     for config_dir in config_dirs:
+        config_dir = os.path.expanduser(config_dir)
         if os.path.exists(config_dir):
             for root, dirs, files in os.walk(config_dir):
                 for file in files:
@@ -217,69 +209,27 @@ def analyze_architecture(target):
 
 def analyze_capabilities_detailed(target):
     """Perform detailed capability analysis"""
-    capabilities = {
-        'agent_management': {'supported': False, 'details': ''},
-        'tool_integration': {'supported': False, 'details': ''},
-        'memory_management': {'supported': False, 'details': ''},
-        'communication': {'supported': False, 'details': ''},
-        'external_integrations': {'supported': False, 'details': ''}
-    }
-    
-    if target == 'openclaw':
-        capabilities = {
-            'agent_management': {'supported': True, 'details': 'Full agent lifecycle management'},
-            'tool_integration': {'supported': True, 'details': 'MCP servers and native tools'},
-            'memory_management': {'supported': True, 'details': 'Built-in memory systems'},
-            'communication': {'supported': True, 'details': 'Agent-to-agent messaging'},
-            'external_integrations': {'supported': True, 'details': 'Skills, plugins, MCP'}
-        }
-    elif target == 'langchain':
-        capabilities = {
-            'agent_management': {'supported': True, 'details': 'Agent creation and management'},
-            'tool_integration': {'supported': True, 'details': 'Tool ecosystem'},
-            'memory_management': {'supported': True, 'details': 'Memory components'},
-            'communication': {'supported': False, 'details': 'No built-in agent communication'},
-            'external_integrations': {'supported': True, 'details': 'Extensive integrations'}
+    framework = get_framework_registry().get(target)
+    if not framework:
+        return {
+            'agent_management': {'supported': False, 'details': ''},
+            'tool_integration': {'supported': False, 'details': ''},
+            'memory_management': {'supported': False, 'details': ''},
+            'communication': {'supported': False, 'details': ''},
+            'external_integrations': {'supported': False, 'details': ''}
         }
-    elif target == 'crewai':
-        capabilities = {
-            'agent_management': {'supported': True, 'details': 'Crew and task management'},
-            'tool_integration': {'supported': True, 'details': 'Custom tools'},
-            'memory_management': {'supported': False, 'details': 'Limited memory support'},
-            'communication': {'supported': True, 'details': 'Agent coordination'},
-            'external_integrations': {'supported': True, 'details': 'LangChain integration'}
-        }
-    
-    return capabilities
+    return {name: dict(entry) for name, entry in framework['capabilities_detailed'].items()}
 
 def analyze_dependencies(target):
     """Analyze framework dependencies"""
-    dependencies = {
-        'core': [],
-        'optional': [],
-        'development': []
-    }
-    
-    if target == 'openclaw':
-        dependencies = {
-            'core': ['node', 'npm'],
-            'optional': ['python', 'ollama', 'docker'],
-            'development': ['git', 'typescript']
-        }
-    elif target == 'langchain':
-        dependencies = {
-            'core': ['python', 'langchain-core'],
-            'optional': ['langchain-openai', 'langchain-anthropic'],
-            'development': ['pytest', 'ruff']
+    framework = get_framework_registry().get(target)
+    if not framework:
+        return {
+            'core': [],
+            'optional': [],
+            'development': []
         }
-    elif target == 'crewai':
-        dependencies = {
-            'core': ['python', 'crewai'],
-            'optional': ['langchain', 'openai'],
-            'development': ['pytest', 'black']
-        }
-    
-    return dependencies
+    return {kind: list(names) for kind, names in framework['dependencies'].items()}
 
 def analyze_configurations(target):
     """Analyze framework configuration"""
@@ -296,23 +246,7 @@ def analyze_configurations(target):
 
 def check_compatibility(target, mode):
     """Check compatibility with other frameworks"""
-    compatibility = {
-        'openclaw': {'compatible': False, 'notes': ''},
-        'langchain': {'compatible': False, 'notes': ''},
-        'crewai': {'compatible': False, 'notes': ''},
-        'generic': {'compatible': True, 'notes': 'REST API integration possible'}
-    }
-    
-    if target == 'openclaw':
-        compatibility['openclaw'] = {'compatible': True, 'notes': 'Native compatibility'}
-        compatibility['langchain'] = {'compatible': True, 'notes': 'Via Python tools and MCP'}
-        compatibility['crewai'] = {'compatible': True, 'notes': 'Via Python tools and MCP'}
-    elif target == 'langchain':
-        compatibility['openclaw'] = {'compatible': True, 'notes': 'Via Python integration'}
-        compatibility['langchain'] = {'compatible': True, 'notes': 'Native compatibility'}
-        compatibility['crewai'] = {'compatible': True, 'notes': 'LangChain-based'}
-    
-    return compatibility
+    return get_framework_registry().compatibility_row(target)
 
 def find_integration_points(target):
     """Find integration points with other frameworks"""
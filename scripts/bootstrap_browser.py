@@ -4,47 +4,415 @@ Bootstrap browser access for agents.
 Attempts to configure browser access with minimal user intervention.
 """
 
+import argparse
+import contextvars
 import subprocess
 import sys
 import os
+import glob
+import hashlib
+import importlib.util
+import json
+import shutil
+import tarfile
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from tracing import traced, traced_run
+
+# Candidate browsers in order of preference: (browser, executable name)
+BROWSER_CANDIDATES = [
+    ('chrome', 'chrome'),
+    ('chrome', 'google-chrome'),
+    ('chrome', 'google-chrome-stable'),
+    ('chromium', 'chromium'),
+    ('chromium', 'chromium-browser'),
+    ('firefox', 'firefox'),
+    ('edge', 'microsoft-edge'),
+    ('edge', 'msedge'),
+    ('edge', 'edge'),
+    ('safari', 'safari'),
+]
+
+# Browser executables inside the Playwright browser cache
+PLAYWRIGHT_EXECUTABLES = [
+    ('chromium', 'chromium-*/chrome-linux/chrome'),
+    ('chromium', 'chromium-*/chrome-win/chrome.exe'),
+    ('chromium', 'chromium-*/chrome-mac/Chromium.app/Contents/MacOS/Chromium'),
+    ('chromium', 'chromium_headless_shell-*/chrome-linux/headless_shell'),
+    ('firefox', 'firefox-*/firefox/firefox'),
+    ('firefox', 'firefox-*/firefox/firefox.exe'),
+    ('webkit', 'webkit-*/pw_run.sh'),
+]
+
+PROBE_TIMEOUT = 5
+
+# Failed probes may be transient (a slow first start, a busy machine), so they are only trusted briefly
+NEGATIVE_CACHE_TTL = 300
+
+DEFAULT_ENGINES = ['chromium']
+
+MIRROR_ARCHIVE_SUFFIXES = ('.zip', '.tar.gz', '.tgz', '.tar')
+
+# Mirror installs unpack here first; never parsed as an engine build
+STAGING_PREFIX = '.staging-'
+
+def get_playwright_cache_dir():
+    """Get the directory Playwright installs browsers into."""
+    custom = os.environ.get('PLAYWRIGHT_BROWSERS_PATH')
+    if custom and custom != '0':
+        return Path(custom)
+    if sys.platform.startswith('win'):
+        return Path(os.environ.get('LOCALAPPDATA', Path.home() / 'AppData' / 'Local')) / 'ms-playwright'
+    if sys.platform.startswith('darwin'):
+        return Path.home() / 'Library' / 'Caches' / 'ms-playwright'
+    return Path(os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache')) / 'ms-playwright'
+
+def get_detection_cache_path():
+    """Get the file detected browsers are cached in."""
+    return Path.home() / '.openclaw' / 'cache' / 'browsers.json'
+
+def find_browser_candidates():
+    """Resolve candidate browser executables without running any of them."""
+    candidates = []
+    seen = set()
+
+    for browser, executable in BROWSER_CANDIDATES:
+        path = shutil.which(executable)
+        if path:
+            candidates.append((browser, path))
+
+    cache_dir = get_playwright_cache_dir()
+    if cache_dir.is_dir():
+        for browser, pattern in PLAYWRIGHT_EXECUTABLES:
+            # Newest build first; revisions compare as numbers, so chromium-1100 beats chromium-999
+            paths = glob.glob(str(cache_dir / pattern))
+            paths.sort(key=lambda p: (build_revision(Path(p).relative_to(cache_dir).parts[0]), p), reverse=True)
+            for path in paths:
+                candidates.append((browser, path))
+
+    unique = []
+    for browser, path in candidates:
+        real_path = os.path.realpath(path)
+        if real_path not in seen:
+            seen.add(real_path)
+            unique.append((browser, path))
+    return unique
+
+def load_detection_cache():
+    """Load previously detected browsers keyed by executable path."""
+    try:
+        with open(get_detection_cache_path(), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_detection_cache(cache):
+    """Persist detected browsers."""
+    cache_path = get_detection_cache_path()
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(cache, f, indent=2)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+
+def probe_browser(path):
+    """Run a browser executable with --version and return its version string."""
+    try:
+        result = traced_run([path, '--version'], capture_output=True, text=True,
+                            timeout=PROBE_TIMEOUT, check=True)
+        return result.stdout.strip() or result.stderr.strip() or 'unknown'
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired, OSError):
+        return None
+
+def cache_entry_valid(entry, mtime_ns, now):
+    """Check whether a cached probe result still describes the binary."""
+    if not entry or entry.get('mtime_ns') != mtime_ns:
+        return False
+    if entry.get('version') is None:
+        return now - entry.get('probed_at', 0) < NEGATIVE_CACHE_TTL
+    return True
+
+@traced('browser.detect')
+def detect_browser():
+    """Detect the preferred available browser, using cached results when binaries are unchanged."""
+    candidates = find_browser_candidates()
+    if not candidates:
+        return None
+
+    cache = load_detection_cache()
+    mtimes = {}
+    for browser, path in candidates:
+        try:
+            mtimes[path] = os.stat(path).st_mtime_ns
+        except OSError:
+            mtimes[path] = None
+
+    # Probe every candidate the cache cannot vouch for, all at once
+    now = time.time()
+    to_probe = [path for _, path in candidates
+                if not cache_entry_valid(cache.get(path), mtimes[path], now)]
+    if to_probe:
+        with ThreadPoolExecutor(max_workers=len(to_probe)) as executor:
+            # Each probe runs in a copy of this context so its span nests under ours
+            futures = [executor.submit(contextvars.copy_context().run, probe_browser, path) for path in to_probe]
+            versions = {path: future.result() for path, future in zip(to_probe, futures)}
+        for path, version in versions.items():
+            cache[path] = {'mtime_ns': mtimes[path], 'version': version}
+            if version is None:
+                cache[path]['probed_at'] = now
+        save_detection_cache(cache)
+
+    for browser, path in candidates:
+        version = cache.get(path, {}).get('version')
+        if version:
+            return {'browser': browser, 'path': path, 'version': version}
+    return None
+
 def check_browser_available():
     """Check if a browser is available on the system."""
-    browsers = ['chrome', 'firefox', 'edge', 'safari']
-    for browser in browsers:
+    detected = detect_browser()
+    return detected['browser'] if detected else None
+
+def get_expected_revisions():
+    """Map each engine to the build revision the installed Playwright package expects.
+
+    Read from the browsers.json shipped with the Playwright driver; empty when
+    Playwright is not installed or the file cannot be read.
+    """
+    try:
+        spec = importlib.util.find_spec('playwright')
+    except (ImportError, ValueError):
+        spec = None
+    if not spec or not spec.submodule_search_locations:
+        return {}
+    for location in spec.submodule_search_locations:
         try:
-            subprocess.run([browser, '--version'], capture_output=True, check=True)
-            return browser
-        except (subprocess.CalledProcessError, FileNotFoundError):
+            with open(Path(location) / 'driver' / 'package' / 'browsers.json', 'r') as f:
+                browsers = json.load(f).get('browsers', [])
+        except (OSError, ValueError, AttributeError):
             continue
-    return None
+        # Cache directories use underscores: chromium-headless-shell -> chromium_headless_shell-1091
+        return {b['name'].replace('-', '_'): str(b['revision'])
+                for b in browsers if isinstance(b, dict) and 'name' in b and 'revision' in b}
+    return {}
+
+def get_installed_engines():
+    """List Playwright engines with a completed installation in the browser cache.
+
+    When the expected revisions are known, only a build of that revision counts;
+    Playwright ignores any other.
+    """
+    cache_dir = get_playwright_cache_dir()
+    expected = get_expected_revisions()
+    installed = set()
+    if cache_dir.is_dir():
+        for entry in cache_dir.iterdir():
+            if entry.name.startswith(STAGING_PREFIX):
+                continue
+            engine = entry.name.rsplit('-', 1)[0]
+            if engine in expected and entry.name != f"{engine}-{expected[engine]}":
+                continue
+            if (entry / 'INSTALLATION_COMPLETE').exists():
+                installed.add(engine)
+    return installed
+
+def load_mirror_checksums(mirror_dir):
+    """Load SHA256SUMS from a mirror directory into {filename: digest}."""
+    checksums = {}
+    sums_path = mirror_dir / 'SHA256SUMS'
+    if not sums_path.exists():
+        return checksums
+    with open(sums_path, 'r') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 2:
+                checksums[parts[1].lstrip('*')] = parts[0].lower()
+    return checksums
+
+def file_sha256(path):
+    """Compute the SHA-256 digest of a file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def extract_archive(archive_path, dest_dir):
+    """Extract a zip or tar archive, refusing entries that escape dest_dir."""
+    dest_dir = os.path.realpath(dest_dir)
+    if zipfile.is_zipfile(archive_path):
+        with zipfile.ZipFile(archive_path) as archive:
+            for info in archive.infolist():
+                target = os.path.realpath(os.path.join(dest_dir, info.filename))
+                if not target.startswith(dest_dir + os.sep):
+                    raise ValueError(f"Unsafe path in archive: {info.filename}")
+                archive.extract(info, dest_dir)
+                # Zip extraction drops permission bits; browsers need their exec bits
+                mode = (info.external_attr >> 16) & 0o777
+                if mode and not info.is_dir():
+                    os.chmod(target, mode)
+    else:
+        with tarfile.open(archive_path) as archive:
+            if hasattr(tarfile, 'data_filter'):
+                archive.extractall(dest_dir, filter='data')
+            else:
+                for member in archive.getmembers():
+                    target = os.path.realpath(os.path.join(dest_dir, member.name))
+                    if not target.startswith(dest_dir + os.sep) or member.issym() or member.islnk():
+                        raise ValueError(f"Unsafe path in archive: {member.name}")
+                archive.extractall(dest_dir)
+
+def strip_archive_suffix(name):
+    """chromium-1091.tar.gz -> chromium-1091"""
+    for suffix in MIRROR_ARCHIVE_SUFFIXES:
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return name
+
+def build_revision(build_name):
+    """Numeric revision of a build name like chromium-1091, or -1 when it has none."""
+    revision = build_name.rsplit('-', 1)[-1]
+    return int(revision) if revision.isdigit() else -1
+
+@traced('browser.install_from_mirror')
+def install_from_mirror(engines, mirror):
+    """Install Playwright engines from a local mirror directory or tarball.
+
+    The mirror holds one archive per engine build, named like
+    chromium-1091.zip or firefox-1429.tar.gz, plus a SHA256SUMS file.
+    The build Playwright expects is preferred over newer ones.
+    """
+    mirror_path = Path(mirror)
+    with tempfile.TemporaryDirectory() as unpack_dir:
+        if mirror_path.is_file():
+            extract_archive(mirror_path, unpack_dir)
+            mirror_path = Path(unpack_dir)
+            # A tarball of the mirror directory wraps everything in one top-level directory
+            entries = list(mirror_path.iterdir())
+            if not (mirror_path / 'SHA256SUMS').exists() and len(entries) == 1 and entries[0].is_dir():
+                mirror_path = entries[0]
+        if not mirror_path.is_dir():
+            print(f"Mirror not found: {mirror}")
+            return False
+
+        checksums = load_mirror_checksums(mirror_path)
+        expected_revisions = get_expected_revisions()
+        cache_dir = get_playwright_cache_dir()
+        cache_dir.mkdir(parents=True, exist_ok=True)
+
+        for engine in engines:
+            archives = [
+                p for p in mirror_path.iterdir()
+                if p.name.endswith(MIRROR_ARCHIVE_SUFFIXES) and p.name.rsplit('-', 1)[0] == engine
+            ]
+            if not archives:
+                print(f"No archive for {engine} in mirror")
+                return False
+            expected_revision = expected_revisions.get(engine)
+            matching = [p for p in archives if strip_archive_suffix(p.name) == f"{engine}-{expected_revision}"]
+            if expected_revision and not matching:
+                print(f"Mirror has no {engine}-{expected_revision} build expected by Playwright; using the newest")
+            archive = max(matching or archives, key=lambda p: (build_revision(strip_archive_suffix(p.name)), p.name))
 
-def install_playwright_browsers():
-    """Install Playwright browsers if not already installed."""
+            expected = checksums.get(archive.name)
+            if not expected:
+                print(f"No checksum for {archive.name} in mirror SHA256SUMS")
+                return False
+            if file_sha256(archive) != expected:
+                print(f"Checksum mismatch for {archive.name}")
+                return False
+
+            build_name = strip_archive_suffix(archive.name)
+            target_dir = cache_dir / build_name
+            staging_dir = Path(tempfile.mkdtemp(prefix=STAGING_PREFIX + build_name + '.', dir=cache_dir))
+            try:
+                extract_archive(archive, staging_dir)
+                # Some mirrors wrap the build in its own directory (chromium-1091/chrome-linux/...)
+                entries = os.listdir(staging_dir)
+                root = staging_dir / build_name if entries == [build_name] and (staging_dir / build_name).is_dir() else staging_dir
+                os.chmod(root, 0o755)
+                if target_dir.exists():
+                    shutil.rmtree(target_dir)
+                os.replace(root, target_dir)
+                # Marked complete only once in place, so an interrupted install is redone
+                (target_dir / 'INSTALLATION_COMPLETE').touch()
+            finally:
+                shutil.rmtree(staging_dir, ignore_errors=True)
+            print(f"Installed {engine} from mirror ({archive.name})")
+
+    return True
+
+def child_stdout():
+    """Where a child process should write: wherever print() currently goes, if it has a descriptor"""
+    try:
+        return sys.stdout.fileno()
+    except (AttributeError, OSError, ValueError):
+        return None
+
+@traced('browser.install')
+def install_playwright_browsers(engines=None, mirror=None, download_host=None):
+    """Install the requested Playwright browsers if not already installed."""
+    engines = engines or DEFAULT_ENGINES
+    missing = [engine for engine in engines if engine not in get_installed_engines()]
+    if not missing:
+        print(f"Playwright engines already installed: {', '.join(engines)}")
+        return True
+
+    if mirror:
+        try:
+            return install_from_mirror(missing, mirror)
+        except (OSError, ValueError, tarfile.TarError, zipfile.BadZipFile) as e:
+            print(f"Mirror installation failed: {e}")
+            return False
+
+    env = dict(os.environ)
+    if download_host:
+        env['PLAYWRIGHT_DOWNLOAD_HOST'] = download_host
     try:
-        subprocess.run([sys.executable, '-m', 'playwright', 'install'], check=True)
+        sys.stdout.flush()
+        traced_run([sys.executable, '-m', 'playwright', 'install'] + missing, check=True, env=env, stdout=child_stdout())
         return True
-    except subprocess.CalledProcessError:
+    except (subprocess.CalledProcessError, OSError):
         return False
 
-def bootstrap_browser_access():
+@traced('browser.bootstrap')
+def bootstrap_browser_access(engines=None, mirror=None, download_host=None, provision=False):
     """Main function to bootstrap browser access."""
-    print("Checking browser availability...")
-    browser = check_browser_available()
-    
-    if browser:
-        print(f"Found browser: {browser}")
-        return True
-    
-    print("No browser found. Attempting to install Playwright browsers...")
-    if install_playwright_browsers():
+    if not provision:
+        print("Checking browser availability...")
+        detected = detect_browser()
+        
+        if detected:
+            print(f"Found browser: {detected['browser']} ({detected['version']}) at {detected['path']}")
+            return True
+        
+        print("No browser found. Attempting to install Playwright browsers...")
+    if install_playwright_browsers(engines, mirror, download_host):
         print("Playwright browsers installed successfully")
         return True
     
     print("Failed to bootstrap browser access. User intervention may be required.")
     return False
 
+def main():
+    """Parse arguments and bootstrap browser access."""
+    parser = argparse.ArgumentParser(description='Bootstrap browser access')
+    parser.add_argument('--engines', type=str, help='Playwright engines to provision (comma-separated)', default=None)
+    parser.add_argument('--mirror', type=str, help='Local mirror directory or tarball of browser archives', default=None)
+    parser.add_argument('--download-host', type=str, help='Playwright download mirror URL', default=None)
+    parser.add_argument('--provision', action='store_true', help='Provision engines even if a browser is found')
+    args = parser.parse_args()
+
+    engines = [e.strip().lower() for e in args.engines.split(',')] if args.engines else None
+    success = bootstrap_browser_access(engines, args.mirror, args.download_host, args.provision)
+    return 0 if success else 1
+
 if __name__ == "__main__":
-    success = bootstrap_browser_access()
-    sys.exit(0 if success else 1)
\ No newline at end of file
+    sys.exit(main())
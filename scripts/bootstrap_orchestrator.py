@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Initializer Skill Script: bootstrap_orchestrator
+
+Description:
+    Run the full bootstrap in one process as a dependency graph.
+    Browser, permission, framework and external-agent stages run
+    concurrently; the sandbox stage waits for the stages it needs and
+    receives their results in memory. A failed stage only skips its
+    dependents, and the report includes the critical path.
+"""
+
+import argparse
+import contextlib
+import contextvars
+import functools
+import logging
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from tracing import span, traced
+
+@traced('bootstrap.main')
+def main():
+    """Main script function"""
+    try:
+        parser = argparse.ArgumentParser(description='Run the full bootstrap as a parallel stage graph')
+        parser.add_argument('--target', type=str, help='Framework to analyze (openclaw, langchain, crewai)', default='openclaw')
+        parser.add_argument('--depth', type=str, help='Analysis depth (basic, full, comprehensive)', default='basic')
+        parser.add_argument('--level', type=str, help='Permission level (user, admin, system)', default='user')
+        parser.add_argument('--rights', type=str, help='Access rights (comma-separated)', default='read,write')
+        parser.add_argument('--agent', type=str, help='External agent type; omit to skip the external stage', default=None)
+        parser.add_argument('--protocol', type=str, help='External agent protocol', default='http')
+        parser.add_argument('--url', type=str, help='External agent URL', default=None)
+        parser.add_argument('--config', type=str, help='External agent configuration mode', default='auto')
+        parser.add_argument('--external-timeout', type=int, help='External agent connection timeout in seconds', default=30)
+        parser.add_argument('--sandbox-name', type=str, help='Sandbox to create; omit to skip the sandbox stage', default=None)
+        parser.add_argument('--capabilities', type=str, help='Sandbox capabilities (comma-separated)', default='web,file')
+        parser.add_argument('--skip-browser', action='store_true', help='Skip the browser stage')
+        parser.add_argument('--output', type=str, help='Output file for the bootstrap report', default=None)
+
+        args = parser.parse_args()
+
+        if args.output:
+            report = run_stages(build_stages(args))
+        else:
+            # stdout carries only the JSON report; stage chatter goes to stderr.
+            # Children that inherit stdout are pointed at sys.stdout per call
+            with contextlib.redirect_stdout(sys.stderr):
+                report = run_stages(build_stages(args))
+
+        # Output results
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(report, f, indent=2, default=str)
+            logging.info(f"Bootstrap report saved to {args.output}")
+        else:
+            print(json.dumps(report, indent=2, default=str))
+
+        return 0 if report['status'] == 'success' else 1
+
+    except Exception as e:
+        logging.exception(f"Bootstrap failed: {str(e)}")
+        return 1
+
+def browser_stage(args, results):
+    """Ensure a browser is available"""
+    from bootstrap_browser import bootstrap_browser_access, detect_browser
+    detected = detect_browser()
+    if detected:
+        return detected
+    if not bootstrap_browser_access(provision=True):
+        raise RuntimeError("No browser available")
+    return detect_browser() or {'available': True}
+
+def permissions_stage(args, results):
+    """Snapshot and request system permissions"""
+    from get_system_permissions import detect_platform, get_current_permissions, parse_permissions, request_permissions
+    platform = detect_platform()
+    current = get_current_permissions(platform)
+    needed = parse_permissions(args.rights)
+    if not request_permissions(needed, args.level, 'default', platform):
+        raise RuntimeError(f"Could not obtain {args.level} permissions: {needed}")
+    return {'platform': platform, 'current': current, 'granted': needed}
+
+def framework_stage(args, results):
+    """Analyze the target framework"""
+    from analyze_agent_framework import analyze_framework
+    return analyze_framework(args.target, args.depth, 'auto')
+
+def external_stage(args, results):
+    """Configure external agent communication"""
+    from setup_external_agent import setup_external_agent
+    return setup_external_agent(args.agent, args.protocol, args.external_timeout, args.config, args.url)
+
+def sandbox_stage(args, results):
+    """Create the sandbox, wiring in the detected framework"""
+    from create_sandboxed_agent import create_sandboxed_agent
+    framework = results['framework']
+    frameworks = [framework['framework']] if framework.get('capabilities', {}).get('detected') else []
+    return create_sandboxed_agent(args.sandbox_name, args.capabilities, None, None, None, True, frameworks)
+
+def build_stages(args):
+    """Build the stage graph: name -> (function, dependencies)"""
+    stages = {
+        'permissions': (permissions_stage, []),
+        'framework': (framework_stage, [])
+    }
+    if not args.skip_browser:
+        stages['browser'] = (browser_stage, [])
+    if args.agent:
+        stages['external'] = (external_stage, [])
+    if args.sandbox_name:
+        stages['sandbox'] = (sandbox_stage, ['permissions', 'framework'])
+
+    return {name: (functools.partial(fn, args), deps) for name, (fn, deps) in stages.items()}
+
+def run_stages(stages, max_workers=None):
+    """Run a stage graph, starting each stage as soon as its dependencies succeed.
+
+    stages maps a name to (function, dependencies); each function receives a
+    dict of its dependencies' results.
+    """
+    for name, (_, deps) in stages.items():
+        missing = [dep for dep in deps if dep not in stages]
+        if missing:
+            raise ValueError(f"Stage {name} depends on unknown stages: {missing}")
+
+    started = time.monotonic()
+    status = {name: 'pending' for name in stages}
+    timing = {}
+    results = {}
+    errors = {}
+
+    def run(name):
+        fn, deps = stages[name]
+        stage_started = time.monotonic()
+        try:
+            with span(f'stage.{name}'):
+                return fn({dep: results[dep] for dep in deps})
+        finally:
+            timing[name] = (stage_started - started, time.monotonic() - started)
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(stages) or 1, thread_name_prefix='stage') as executor:
+        running = {}
+        while True:
+            # Settle every pending stage whose dependencies are resolved
+            progress = True
+            while progress:
+                progress = False
+                for name, (_, deps) in stages.items():
+                    if status[name] != 'pending':
+                        continue
+                    if any(status[dep] in ('failed', 'skipped') for dep in deps):
+                        status[name] = 'skipped'
+                        errors[name] = 'dependency did not succeed: ' + ', '.join(
+                            dep for dep in deps if status[dep] in ('failed', 'skipped'))
+                        progress = True
+                    elif all(status[dep] == 'success' for dep in deps):
+                        status[name] = 'running'
+                        # A fresh context copy per stage keeps its span under the caller's
+                        running[executor.submit(contextvars.copy_context().run, run, name)] = name
+                        logging.info(f"Stage started: {name}")
+
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                    status[name] = 'success'
+                    logging.info(f"Stage succeeded: {name} ({timing[name][1] - timing[name][0]:.2f}s)")
+                except Exception as e:
+                    status[name] = 'failed'
+                    errors[name] = str(e)
+                    logging.error(f"Stage failed: {name}: {str(e)}")
+
+    wall = time.monotonic() - started
+    report = {
+        'status': 'success' if all(s == 'success' for s in status.values()) else 'failed',
+        'wall_seconds': round(wall, 3),
+        'critical_path': critical_path(stages, timing),
+        'stages': {}
+    }
+    for name, (_, deps) in stages.items():
+        entry = {'status': status[name], 'dependencies': deps}
+        if name in timing:
+            entry['started_at'] = round(timing[name][0], 3)
+            entry['seconds'] = round(timing[name][1] - timing[name][0], 3)
+        if name in results:
+            entry['result'] = results[name]
+        if name in errors:
+            entry['error'] = errors[name]
+        report['stages'][name] = entry
+
+    return report
+
+def critical_path(stages, timing):
+    """Find the longest chain of dependent stage durations among the stages that ran"""
+    longest = {}
+
+    def visit(name):
+        if name not in longest:
+            ran = [dep for dep in stages[name][1] if dep in timing]
+            best = max((visit(dep) for dep in ran), key=lambda p: p[0], default=(0.0, []))
+            duration = timing[name][1] - timing[name][0] if name in timing else 0.0
+            longest[name] = (best[0] + duration, best[1] + [name])
+        return longest[name]
+
+    seconds, path = max((visit(name) for name in stages if name in timing), key=lambda p: p[0], default=(0.0, []))
+    return {'stages': path, 'seconds': round(seconds, 3)}
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    exit(main())
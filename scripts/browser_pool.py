@@ -0,0 +1,463 @@
+#!/usr/bin/env python3
+"""
+Initializer Skill Script: browser_pool
+
+Description:
+    Keep a pool of warm headless browsers and lease them to agents.
+    Agents request a lease from a local HTTP endpoint and receive CDP
+    endpoints for a browser process (and a fresh page when the browser
+    supports it), instead of cold-starting their own browser. Processes are
+    health checked, recycled after a number of uses and shrunk when idle.
+"""
+
+import argparse
+import logging
+import json
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEVTOOLS_PATTERN = re.compile(r'DevTools listening on (ws://\S+)')
+
+CDP_BROWSERS = ('chrome', 'chromium', 'edge')
+
+def main():
+    """Main script function"""
+    try:
+        parser = argparse.ArgumentParser(description='Run a warm headless browser pool')
+        parser.add_argument('--executable', type=str, help='Browser executable (auto-detected if omitted)', default=None)
+        parser.add_argument('--min-size', type=int, help='Warm browser processes kept when idle', default=1)
+        parser.add_argument('--max-size', type=int, help='Maximum browser processes', default=4)
+        parser.add_argument('--leases-per-process', type=int, help='Concurrent leases per browser process', default=4)
+        parser.add_argument('--max-uses', type=int, help='Leases served before a process is recycled', default=50)
+        parser.add_argument('--idle-timeout', type=int, help='Seconds before surplus idle processes are stopped', default=300)
+        parser.add_argument('--health-interval', type=int, help='Seconds between health checks', default=15)
+        parser.add_argument('--lease-ttl', type=int, help='Seconds a lease lives without renewal (0 to never expire)', default=600)
+        parser.add_argument('--host', type=str, help='Pool service host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, help='Pool service port', default=9333)
+
+        args = parser.parse_args()
+
+        executable = args.executable or find_cdp_browser()
+        if not executable:
+            logging.error("No CDP-capable browser found; use --executable")
+            return 1
+
+        pool = BrowserPool(
+            executable,
+            min_size=args.min_size,
+            max_size=args.max_size,
+            leases_per_process=args.leases_per_process,
+            max_uses=args.max_uses,
+            idle_timeout=args.idle_timeout,
+            health_interval=args.health_interval,
+            lease_ttl=args.lease_ttl
+        )
+        pool.start()
+        server = serve_pool(pool, args.host, args.port)
+        logging.info(f"Browser pool listening on http://{args.host}:{server.server_address[1]}")
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            pool.stop()
+
+        return 0
+
+    except Exception as e:
+        logging.exception(f"Browser pool failed: {str(e)}")
+        return 1
+
+def find_cdp_browser():
+    """Find a Chromium-family browser that speaks the DevTools protocol"""
+    from bootstrap_browser import find_browser_candidates
+    for browser, path in find_browser_candidates():
+        if browser in CDP_BROWSERS:
+            return path
+    return None
+
+class BrowserProcess:
+    """A single headless browser process with its own profile directory"""
+
+    def __init__(self, executable, extra_args=None, startup_timeout=30):
+        self.id = uuid.uuid4().hex[:12]
+        self.profile_dir = tempfile.mkdtemp(prefix='browser-pool-')
+        self.uses = 0
+        self.leases = set()
+        self.last_used = time.monotonic()
+        self.ws_endpoint = None
+        self._ready = threading.Event()
+
+        command = [
+            executable,
+            '--headless=new',
+            '--remote-debugging-port=0',
+            f'--user-data-dir={self.profile_dir}',
+            '--no-first-run',
+            '--no-default-browser-check'
+        ] + list(extra_args or []) + ['about:blank']
+
+        self.process = subprocess.Popen(
+            command,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True
+        )
+        threading.Thread(target=self._drain_stderr, name=f'browser-{self.id}', daemon=True).start()
+
+        if not self._ready.wait(startup_timeout) or not self.ws_endpoint:
+            self.terminate()
+            raise RuntimeError(f"Browser did not report a DevTools endpoint within {startup_timeout}s")
+
+        # ws://127.0.0.1:PORT/devtools/browser/ID -> http://127.0.0.1:PORT
+        self.http_endpoint = 'http://' + self.ws_endpoint[len('ws://'):].split('/', 1)[0]
+        logging.info(f"Started browser {self.id} at {self.ws_endpoint}")
+
+    def _drain_stderr(self):
+        """Read stderr until exit so the pipe never fills, noting the DevTools URL"""
+        for line in self.process.stderr:
+            if not self._ready.is_set():
+                match = DEVTOOLS_PATTERN.search(line)
+                if match:
+                    self.ws_endpoint = match.group(1)
+                    self._ready.set()
+        self._ready.set()
+
+    def is_healthy(self, timeout=2):
+        """Check the process is alive and its DevTools endpoint answers"""
+        if self.process.poll() is not None:
+            return False
+        try:
+            with urllib.request.urlopen(f"{self.http_endpoint}/json/version", timeout=timeout) as response:
+                return response.status == 200
+        except Exception:
+            return False
+
+    def open_page(self, timeout=5):
+        """Open a new page target and return its DevTools description, if supported"""
+        request = urllib.request.Request(f"{self.http_endpoint}/json/new?about:blank", method='PUT')
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                return json.loads(response.read().decode('utf-8'))
+        except Exception as e:
+            logging.debug(f"Browser {self.id} could not open a page: {str(e)}")
+            return None
+
+    def close_page(self, target_id, timeout=5):
+        """Close a page target opened for a lease"""
+        try:
+            with urllib.request.urlopen(f"{self.http_endpoint}/json/close/{target_id}", timeout=timeout):
+                pass
+        except Exception as e:
+            logging.debug(f"Browser {self.id} could not close page {target_id}: {str(e)}")
+
+    def terminate(self, timeout=5):
+        """Stop the browser and remove its profile directory"""
+        if self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        shutil.rmtree(self.profile_dir, ignore_errors=True)
+        logging.info(f"Stopped browser {self.id} after {self.uses} uses")
+
+class PendingBrowser:
+    """Placeholder holding a pool slot while a browser starts outside the lock"""
+
+class BrowserPool:
+    """Pool of warm browser processes handing out leases"""
+
+    def __init__(self, executable, min_size=1, max_size=4, leases_per_process=4, max_uses=50,
+                 idle_timeout=300, health_interval=15, extra_args=None, lease_ttl=600):
+        self.executable = executable
+        self.min_size = min_size
+        self.max_size = max(max_size, min_size, 1)
+        self.leases_per_process = max(1, leases_per_process)
+        self.max_uses = max_uses
+        self.idle_timeout = idle_timeout
+        self.health_interval = health_interval
+        self.extra_args = extra_args or []
+        self.lease_ttl = lease_ttl
+
+        self.browsers = []
+        # lease_id -> (browser, page, expires_at); expires_at is None when leases never expire
+        self.leases = {}
+        self.lock = threading.Condition()
+        self.stop_event = threading.Event()
+        self.maintenance_thread = None
+
+    def _spawn(self):
+        return BrowserProcess(self.executable, self.extra_args)
+
+    def start(self):
+        """Warm up min_size browsers and start the maintenance thread"""
+        for _ in range(self.min_size):
+            browser = self._spawn()
+            with self.lock:
+                self.browsers.append(browser)
+        self.maintenance_thread = threading.Thread(target=self._maintain, name='browser-pool', daemon=True)
+        self.maintenance_thread.start()
+
+    def stop(self):
+        """Stop maintenance and terminate every browser"""
+        self.stop_event.set()
+        with self.lock:
+            browsers, self.browsers = self.browsers, []
+            self.leases.clear()
+            self.lock.notify_all()
+        for browser in browsers:
+            # Browsers still starting are terminated by the lease that spawns them
+            if not isinstance(browser, PendingBrowser):
+                browser.terminate()
+
+    def _started(self):
+        """Browsers in the pool that have finished starting; caller holds the lock"""
+        return [b for b in self.browsers if not isinstance(b, PendingBrowser)]
+
+    def _expiry(self):
+        return time.monotonic() + self.lease_ttl if self.lease_ttl else None
+
+    def _pick_browser(self):
+        """Choose the least-loaded usable browser, or None"""
+        candidates = [
+            b for b in self._started()
+            if len(b.leases) < self.leases_per_process and b.uses < self.max_uses and b.process.poll() is None
+        ]
+        return min(candidates, key=lambda b: len(b.leases)) if candidates else None
+
+    def _reserve(self, browser, lease_id):
+        """Claim a lease slot on a browser; caller holds the lock"""
+        browser.leases.add(lease_id)
+        browser.uses += 1
+        browser.last_used = time.monotonic()
+
+    def lease(self, timeout=30):
+        """Lease a browser, starting a new process if all are busy and the pool can grow"""
+        deadline = time.monotonic() + timeout
+        lease_id = uuid.uuid4().hex
+        pending = None
+        with self.lock:
+            while True:
+                if self.stop_event.is_set():
+                    raise RuntimeError("Browser pool is stopped")
+                browser = self._pick_browser()
+                if browser:
+                    # Reserved before the lock is dropped so concurrent leases and
+                    # maintenance see the slot as taken
+                    self._reserve(browser, lease_id)
+                    break
+                if len(self.browsers) < self.max_size:
+                    # Reserve the slot with a placeholder while the browser starts unlocked
+                    pending = PendingBrowser()
+                    self.browsers.append(pending)
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("No browser available in the pool")
+                self.lock.wait(remaining)
+
+        if pending:
+            try:
+                browser = self._spawn()
+            except BaseException:
+                with self.lock:
+                    # stop() may have emptied the pool meanwhile
+                    if pending in self.browsers:
+                        self.browsers.remove(pending)
+                    # Waiters may now spawn into the freed slot
+                    self.lock.notify_all()
+                raise
+            with self.lock:
+                stopped = pending not in self.browsers
+                if not stopped:
+                    self.browsers[self.browsers.index(pending)] = browser
+                    self._reserve(browser, lease_id)
+                self.lock.notify_all()
+            if stopped:
+                browser.terminate()
+                raise RuntimeError("Browser pool is stopped")
+
+        try:
+            page = browser.open_page()
+        except BaseException:
+            with self.lock:
+                browser.leases.discard(lease_id)
+                browser.uses -= 1
+                self.lock.notify_all()
+            raise
+        with self.lock:
+            self.leases[lease_id] = (browser, page, self._expiry())
+
+        lease = {
+            'lease_id': lease_id,
+            'browser_id': browser.id,
+            'ws_endpoint': browser.ws_endpoint,
+            'http_endpoint': browser.http_endpoint,
+            'ttl': self.lease_ttl
+        }
+        if page:
+            lease['page_id'] = page.get('id')
+            lease['page_ws_endpoint'] = page.get('webSocketDebuggerUrl')
+        return lease
+
+    def release(self, lease_id):
+        """Return a lease; recycle its browser once it has served max_uses"""
+        with self.lock:
+            entry = self.leases.pop(lease_id, None)
+            if not entry:
+                return False
+            browser, page, _ = entry
+            browser.leases.discard(lease_id)
+            browser.last_used = time.monotonic()
+            retire = browser.uses >= self.max_uses and not browser.leases
+            if retire:
+                self.browsers.remove(browser)
+            self.lock.notify_all()
+
+        if retire:
+            browser.terminate()
+            self._refill()
+        elif page and page.get('id'):
+            browser.close_page(page['id'])
+        return True
+
+    def renew(self, lease_id):
+        """Extend a lease by another lease_ttl; holders renew to keep long sessions alive"""
+        with self.lock:
+            entry = self.leases.get(lease_id)
+            if not entry:
+                return False
+            browser, page, _ = entry
+            self.leases[lease_id] = (browser, page, self._expiry())
+            return True
+
+    def reclaim_expired(self):
+        """Release leases whose holders stopped renewing them"""
+        now = time.monotonic()
+        with self.lock:
+            expired = [lease_id for lease_id, (_, _, expires_at) in self.leases.items()
+                       if expires_at is not None and expires_at <= now]
+        for lease_id in expired:
+            if self.release(lease_id):
+                logging.warning(f"Reclaimed expired lease {lease_id}")
+        return len(expired)
+
+    def _refill(self):
+        """Start browsers until the pool is back at min_size"""
+        while not self.stop_event.is_set():
+            with self.lock:
+                if len(self.browsers) >= self.min_size:
+                    return
+            try:
+                browser = self._spawn()
+            except Exception as e:
+                logging.warning(f"Failed to start browser: {str(e)}")
+                return
+            with self.lock:
+                self.browsers.append(browser)
+                self.lock.notify_all()
+
+    def _maintain(self):
+        """Reclaim expired leases, replace unhealthy browsers and stop surplus idle ones"""
+        while not self.stop_event.wait(self.health_interval):
+            self.reclaim_expired()
+            with self.lock:
+                idle = [b for b in self._started() if not b.leases]
+            now = time.monotonic()
+            doomed = []
+            for browser in idle:
+                if not browser.is_healthy():
+                    logging.warning(f"Browser {browser.id} failed health check")
+                    doomed.append(browser)
+            with self.lock:
+                for browser in doomed:
+                    if browser in self.browsers and not browser.leases:
+                        self.browsers.remove(browser)
+                surplus = len(self._started()) - self.min_size
+                for browser in sorted(idle, key=lambda b: b.last_used):
+                    if surplus <= 0:
+                        break
+                    if browser in self.browsers and not browser.leases and now - browser.last_used >= self.idle_timeout:
+                        self.browsers.remove(browser)
+                        doomed.append(browser)
+                        surplus -= 1
+            for browser in doomed:
+                browser.terminate()
+            self._refill()
+
+    def status(self):
+        """Summarize the pool state"""
+        with self.lock:
+            return {
+                'executable': self.executable,
+                'browsers': [
+                    {
+                        'id': b.id,
+                        'ws_endpoint': b.ws_endpoint,
+                        'leases': len(b.leases),
+                        'uses': b.uses,
+                        'idle_seconds': round(time.monotonic() - b.last_used, 1)
+                    }
+                    for b in self._started()
+                ],
+                'active_leases': len(self.leases)
+            }
+
+def serve_pool(pool, host='127.0.0.1', port=9333):
+    """Expose a pool over HTTP: POST /lease, POST /renew/<id>, POST /release/<id>, GET /status"""
+
+    class PoolHandler(BaseHTTPRequestHandler):
+        def _reply(self, code, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(code)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == '/status':
+                self._reply(200, pool.status())
+            else:
+                self._reply(404, {'error': 'not found'})
+
+        def do_POST(self):
+            try:
+                if self.path == '/lease':
+                    self._reply(200, pool.lease())
+                elif self.path.startswith('/release/'):
+                    released = pool.release(self.path[len('/release/'):])
+                    self._reply(200 if released else 404, {'released': released})
+                elif self.path.startswith('/renew/'):
+                    renewed = pool.renew(self.path[len('/renew/'):])
+                    self._reply(200 if renewed else 404, {'renewed': renewed})
+                else:
+                    self._reply(404, {'error': 'not found'})
+            except TimeoutError as e:
+                self._reply(503, {'error': str(e)})
+            except Exception as e:
+                logging.exception(f"Pool request failed: {str(e)}")
+                self._reply(500, {'error': str(e)})
+
+        def log_message(self, format, *args):
+            logging.debug(format % args)
+
+    server = ThreadingHTTPServer((host, port), PoolHandler)
+    server.daemon_threads = True
+    return server
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    exit(main())
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Initializer Skill Script: config_templates
+
+Description:
+    Render agent configurations from the Markdown templates in assets/.
+    A template's JSON blocks (everything above its "## Variables" section)
+    are parsed once and merged into a single document. Blocks in the same
+    section that set the same top-level keys are alternatives, of which
+    the first is the default and others are picked with --choose. Each
+    merged document is compiled into literal text segments and
+    {{variable}} slots, so rendering an agent is a string join. Compiled
+    templates are cached and recompiled only when the file changes.
+"""
+
+import argparse
+import logging
+import copy
+import csv
+import json
+import os
+import re
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'assets')
+
+HEADING_RE = re.compile(r'^(#{2,6}) +(.+?)\s*$')
+VARIABLE_RE = re.compile(r'^- `\{\{(\w+)\}\}`')
+# A placeholder that is a whole JSON string is replaced by any JSON value
+SLOT_RE = re.compile(r'"\{\{(\w+)\}\}"|\{\{(\w+)\}\}')
+
+def main():
+    """Main script function"""
+    try:
+        parser = argparse.ArgumentParser(description='Render agent configurations from templates')
+        subparsers = parser.add_subparsers(dest='command', required=True)
+
+        render_parser = subparsers.add_parser('render', help='Render one agent configuration')
+        render_parser.add_argument('--template', type=str, help='Template name (general, solo, specialized) or path', required=True)
+        render_parser.add_argument('--set', type=str, action='append', help='Variable as name=value (repeatable)', default=[])
+        render_parser.add_argument('--choose', type=str, action='append', help='Pick alternative blocks by heading text (repeatable)', default=[])
+        render_parser.add_argument('--output', type=str, help='Output file for the configuration', default=None)
+
+        batch_parser = subparsers.add_parser('batch', help='Render one configuration per row of a parameter table')
+        batch_parser.add_argument('--template', type=str, help='Template name (general, solo, specialized) or path', required=True)
+        batch_parser.add_argument('--params', type=str, help='Parameter table (.csv, .json or .jsonl)', required=True)
+        batch_parser.add_argument('--choose', type=str, action='append', help='Pick alternative blocks by heading text (repeatable)', default=[])
+        batch_parser.add_argument('--output-dir', type=str, help='Write <agent_name>.json per row here', default=None)
+        batch_parser.add_argument('--jsonl', type=str, help='Write all configurations to one JSONL file', default=None)
+
+        variables_parser = subparsers.add_parser('variables', help='Show a template\'s variables and alternatives')
+        variables_parser.add_argument('--template', type=str, help='Template name (general, solo, specialized) or path', required=True)
+
+        args = parser.parse_args()
+
+        template = get_template(resolve_template(args.template))
+
+        if args.command == 'render':
+            variables = dict(item.split('=', 1) for item in args.set)
+            text = template.render(variables, args.choose)
+            if args.output:
+                with open(args.output, 'w') as f:
+                    f.write(text)
+                logging.info(f"Configuration saved to {args.output}")
+            else:
+                print(text)
+        elif args.command == 'batch':
+            if not (args.output_dir or args.jsonl):
+                logging.error("One of --output-dir or --jsonl is required")
+                return 1
+            rows = read_parameter_table(args.params)
+            count = render_batch(template, rows, args.choose, args.output_dir, args.jsonl)
+            logging.info(f"Rendered {count} configurations from {args.params}")
+        elif args.command == 'variables':
+            print(json.dumps(template.describe(), indent=2))
+
+        return 0
+
+    except Exception as e:
+        logging.exception(f"Template rendering failed: {str(e)}")
+        return 1
+
+class CompiledTemplate:
+    """A parsed template; rendering plans are compiled per choice of alternatives"""
+
+    def __init__(self, path, groups, required, optional):
+        self.path = path
+        # Each group is a list of (heading, document) alternatives
+        self.groups = groups
+        self.required = required
+        self.optional = optional
+        self._plans = {}
+
+    def _selection(self, choose):
+        choose = [c.lower() for c in choose or ()]
+        selection = []
+        for alternatives in self.groups:
+            picked = 0
+            for i, (heading, _) in enumerate(alternatives):
+                if any(c in heading.lower() for c in choose):
+                    picked = i
+                    break
+            selection.append(picked)
+        return tuple(selection)
+
+    def _plan(self, selection, compact):
+        plan = self._plans.get((selection, compact))
+        if plan is None:
+            document = {}
+            for alternatives, picked in zip(self.groups, selection):
+                deep_merge(document, copy.deepcopy(alternatives[picked][1]))
+            if compact:
+                text = json.dumps(document, separators=(',', ':'))
+            else:
+                text = json.dumps(document, indent=2)
+            plan = compile_text(text)
+            self._plans[(selection, compact)] = plan
+        return plan
+
+    def render(self, variables, choose=None, compact=False):
+        """Render the configuration as JSON text (one line if compact)"""
+        missing = [name for name in self.required if variables.get(name) in (None, '')]
+        if missing:
+            raise ValueError(f"Missing required template variables: {', '.join(missing)}")
+
+        literals, slots = self._plan(self._selection(choose), compact)
+        parts = [literals[0]]
+        for (name, whole), literal in zip(slots, literals[1:]):
+            value = variables.get(name)
+            if whole:
+                parts.append(json.dumps(value))
+            else:
+                parts.append(json.dumps('' if value is None else str(value))[1:-1])
+            parts.append(literal)
+        return ''.join(parts)
+
+    def render_config(self, variables, choose=None):
+        """Render the configuration as a dict"""
+        return json.loads(self.render(variables, choose))
+
+    def describe(self):
+        return {
+            'path': self.path,
+            'required': self.required,
+            'optional': self.optional,
+            'alternatives': [[heading for heading, _ in alternatives] for alternatives in self.groups if len(alternatives) > 1]
+        }
+
+def deep_merge(target, source):
+    """Merge source into target in place, recursing into nested objects"""
+    for key, value in source.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            deep_merge(target[key], value)
+        else:
+            target[key] = value
+
+def compile_text(text):
+    """Split JSON text into literal segments and (variable, whole_string) slots"""
+    literals = []
+    slots = []
+    position = 0
+    for match in SLOT_RE.finditer(text):
+        literals.append(text[position:match.start()])
+        if match.group(1):
+            slots.append((match.group(1), True))
+        else:
+            slots.append((match.group(2), False))
+        position = match.end()
+    literals.append(text[position:])
+    return literals, slots
+
+def parse_template(path):
+    """Parse a Markdown template into groups of alternative JSON blocks and its variables"""
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = f.read().splitlines()
+
+    groups = []
+    section_groups = []
+    required = []
+    optional = []
+    section = None
+    heading = None
+    variables = None
+    block = None
+
+    for number, line in enumerate(lines, 1):
+        if block is not None:
+            if line.strip() == '```':
+                try:
+                    document = json.loads('\n'.join(block))
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{path}:{number}: invalid JSON block: {str(e)}")
+                if isinstance(document, dict):
+                    _add_block(section_groups, heading or section, document)
+                block = None
+            else:
+                block.append(line)
+            continue
+
+        match = HEADING_RE.match(line)
+        if match:
+            level, title = len(match.group(1)), match.group(2)
+            heading = title
+            if level == 2:
+                groups.extend(section_groups)
+                section_groups = []
+                section = title
+                if title.lower() == 'variables':
+                    variables = required
+                elif variables is not None:
+                    break
+            elif variables is not None:
+                variables = optional if 'optional' in title.lower() else required
+            continue
+
+        if variables is not None:
+            match = VARIABLE_RE.match(line)
+            if match:
+                variables.append(match.group(1))
+        elif line.strip() == '```json':
+            block = []
+
+    groups.extend(section_groups)
+    return groups, required, optional
+
+def _add_block(section_groups, heading, document):
+    """Blocks overlapping an earlier block's top-level keys are its alternatives"""
+    for alternatives in section_groups:
+        if set(alternatives[0][1]) & set(document):
+            alternatives.append((heading, document))
+            return
+    section_groups.append([(heading, document)])
+
+def resolve_template(template):
+    """Resolve a template name (general, solo, specialized) or path to a file"""
+    if os.path.isfile(template):
+        return template
+    for candidate in (f'{template}_config_template.md', f'{template}_agent_template.md', f'{template}.md'):
+        path = os.path.join(ASSETS_DIR, candidate)
+        if os.path.isfile(path):
+            return path
+    raise FileNotFoundError(f"Template not found: {template}")
+
+_templates = {}
+
+def get_template(path):
+    """Get the compiled template for a file, recompiling when the file changes"""
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+
+    cached = _templates.get(path)
+    if cached and cached[0] == stamp:
+        return cached[1]
+
+    template = CompiledTemplate(path, *parse_template(path))
+    _templates[path] = (stamp, template)
+    return template
+
+def read_parameter_table(path):
+    """Read rows of template variables from CSV, a JSON list or JSONL"""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if path.endswith('.csv'):
+            return list(csv.DictReader(f))
+        if path.endswith('.jsonl'):
+            return [json.loads(line) for line in f if line.strip()]
+        return json.load(f)
+
+def render_batch(template, rows, choose=None, output_dir=None, jsonl_path=None):
+    """Render one configuration per row; a row's "choose" column adds to choose"""
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    jsonl = open(jsonl_path, 'w') if jsonl_path else None
+    try:
+        for number, row in enumerate(rows, 1):
+            row_choose = list(choose or ())
+            if row.get('choose'):
+                row_choose.extend(c.strip() for c in row['choose'].split(','))
+            missing = [name for name in template.required if row.get(name) in (None, '')]
+            if missing:
+                raise ValueError(f"Row {number}: missing required template variables: {', '.join(missing)}")
+
+            if jsonl:
+                jsonl.write(template.render(row, row_choose, compact=True) + '\n')
+            if output_dir:
+                name = str(row.get('agent_name') or f'agent_{number}')
+                with open(os.path.join(output_dir, f"{os.path.basename(name)}.json"), 'w') as f:
+                    f.write(template.render(row, row_choose))
+    finally:
+        if jsonl:
+            jsonl.close()
+    return len(rows)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    exit(main())
@@ -8,6 +8,7 @@ Description:
 """
 
 import argparse
+import copy
 import logging
 import json
 import os
@@ -16,6 +17,12 @@ import subprocess
 import shutil
 from pathlib import Path
 
+from tracing import traced
+
+# Configuration keys set by the sandbox itself; templates cannot override them
+SANDBOX_OWNED_KEYS = ('name', 'type', 'capabilities', 'sandbox', 'security')
+
+@traced('sandbox.main')
 def main():
     """Main script function"""
     try:
@@ -24,12 +31,21 @@ def main():
         parser.add_argument('--capabilities', type=str, help='Agent capabilities (comma-separated)', default='web,file')
         parser.add_argument('--resources', type=str, help='Resource limits', default=None)
         parser.add_argument('--path', type=str, help='Sandbox directory path', default=None)
-        parser.add_argument('--config', type=str, help='Configuration template to use', default=None)
+        parser.add_argument('--config', type=str, help='Configuration template to use (JSON file, or general, solo, specialized)', default=None)
+        parser.add_argument('--template-var', type=str, action='append', help='Template variable as KEY=VALUE (repeatable)', default=[])
         parser.add_argument('--isolate', type=bool, help='Full isolation mode', default=True)
         parser.add_argument('--output', type=str, help='Output file for configuration', default=None)
         
         args = parser.parse_args()
         
+        template_vars = {}
+        for item in args.template_var:
+            key, sep, value = item.partition('=')
+            if not sep or not key:
+                logging.error(f"Invalid --template-var {item!r}; expected KEY=VALUE")
+                return 1
+            template_vars[key] = value
+        
         # Create sandboxed agent
         config = create_sandboxed_agent(
             args.name,
@@ -37,7 +53,8 @@ def main():
             args.resources,
             args.path,
             args.config,
-            args.isolate
+            args.isolate,
+            template_vars=template_vars
         )
         
         # Output results
@@ -54,7 +71,8 @@ def main():
         logging.exception(f"Sandboxed agent creation failed: {str(e)}")
         return 1
 
-def create_sandboxed_agent(name, capabilities, resources, path, config, isolate):
+@traced('sandbox.create')
+def create_sandboxed_agent(name, capabilities, resources, path, config, isolate, frameworks=None, template_vars=None):
     """Create sandboxed agent instance"""
     logging.info(f"Creating sandboxed agent: {name}")
     
@@ -64,6 +82,9 @@ def create_sandboxed_agent(name, capabilities, resources, path, config, isolate)
     # Determine sandbox path
     sandbox_path = determine_sandbox_path(name, path)
     
+    # Load the template before creating anything, so a bad one leaves no half-built sandbox
+    template_config = load_agent_template(config, name, sandbox_path, template_vars) if config else None
+    
     # Create sandbox directory structure
     create_sandbox_structure(sandbox_path)
     
@@ -74,10 +95,10 @@ def create_sandboxed_agent(name, capabilities, resources, path, config, isolate)
     resource_config = apply_resource_limits(sandbox_path, resources)
     
     # Configure capabilities
-    cap_config = configure_capabilities(sandbox_path, caps)
+    cap_config = configure_capabilities(sandbox_path, caps, frameworks)
     
     # Create agent configuration
-    agent_config = create_agent_configuration(sandbox_path, name, config, caps)
+    agent_config = create_agent_configuration(sandbox_path, name, template_config, caps)
     
     # Final configuration
     final_config = {
@@ -92,6 +113,13 @@ def create_sandboxed_agent(name, capabilities, resources, path, config, isolate)
         'status': 'created'
     }
     
+    # Record the sandbox in the registry
+    try:
+        from sandbox_registry import register_sandbox
+        register_sandbox(final_config)
+    except Exception as e:
+        logging.warning(f"Failed to register sandbox: {str(e)}")
+    
     return final_config
 
 def parse_capabilities(capabilities_str):
@@ -107,6 +135,7 @@ def determine_sandbox_path(name, custom_path):
     sandbox_dir = os.path.join(os.path.expanduser('~/.openclaw'), 'sandboxes', name)
     return os.path.abspath(sandbox_dir)
 
+@traced('sandbox.create_structure')
 def create_sandbox_structure(sandbox_path):
     """Create sandbox directory structure"""
     logging.info(f"Creating sandbox structure at {sandbox_path}")
@@ -151,6 +180,7 @@ def configure_sandbox_environment(sandbox_path, isolate):
     
     return env_config
 
+@traced('sandbox.apply_resource_limits')
 def apply_resource_limits(sandbox_path, resources_str):
     """Apply resource limits to sandbox"""
     resource_config = {
@@ -167,10 +197,16 @@ def apply_resource_limits(sandbox_path, resources_str):
             resource_config.update(custom_resources)
         except json.JSONDecodeError:
             logging.warning(f"Failed to parse custom resources: {resources_str}")
-    
+
+    # Persist limits so quota checks can enforce them later
+    resources_path = os.path.join(sandbox_path, 'config', 'resources.json')
+    with open(resources_path, 'w') as f:
+        json.dump(resource_config, f, indent=2)
+
     return resource_config
 
-def configure_capabilities(sandbox_path, capabilities):
+@traced('sandbox.configure_capabilities')
+def configure_capabilities(sandbox_path, capabilities, frameworks=None):
     """Configure sandbox capabilities"""
     cap_config = {
         'allowed': capabilities,
@@ -193,13 +229,42 @@ def configure_capabilities(sandbox_path, capabilities):
         },
         'analysis': {
             'enabled': 'analysis' in capabilities,
-            'frameworks': []
+            'frameworks': frameworks or []
         }
     }
     
+    # Persist restrictions so agent runtimes can enforce them
+    capabilities_path = os.path.join(sandbox_path, 'config', 'capabilities.json')
+    with open(capabilities_path, 'w') as f:
+        json.dump(cap_config, f, indent=2)
+    
     return cap_config
 
-def create_agent_configuration(sandbox_path, name, template, capabilities):
+def load_agent_template(template, name, sandbox_path, template_vars=None):
+    """Load a JSON file or render a markdown template into a configuration dict"""
+    try:
+        if os.path.exists(template) and not template.endswith('.md'):
+            with open(template, 'r') as f:
+                template_config = json.load(f)
+        else:
+            # Markdown templates (general, solo, specialized) are compiled once and cached
+            from config_templates import get_template, resolve_template
+            variables = {
+                'agent_name': name,
+                'workspace': os.path.join(sandbox_path, 'workspace'),
+                'specialization_type': 'general'
+            }
+            variables.update(template_vars or {})
+            template_config = get_template(resolve_template(template)).render_config(variables)
+    except Exception as e:
+        raise ValueError(f"Failed to apply template {template}: {str(e)}") from e
+    
+    if not isinstance(template_config, dict):
+        raise ValueError(f"Failed to apply template {template}: expected a JSON object")
+    return template_config
+
+@traced('sandbox.create_agent_configuration')
+def create_agent_configuration(sandbox_path, name, template_config, capabilities):
     """Create agent configuration file"""
     agent_config = {
         'name': name,
@@ -228,16 +293,15 @@ def create_agent_configuration(sandbox_path, name, template, capabilities):
         }
     }
     
-    # Load template if provided
-    if template:
-        try:
-            template_path = os.path.join(sandbox_path, 'config', 'agent.json')
-            if os.path.exists(template):
-                with open(template, 'r') as f:
-                    template_config = json.load(f)
-                    agent_config.update(template_config)
-        except Exception as e:
-            logging.warning(f"Failed to load template: {str(e)}")
+    # Apply the template if provided
+    if template_config:
+        from config_templates import deep_merge
+        
+        # The template extends the defaults, but never the keys the sandbox owns
+        owned = copy.deepcopy({key: agent_config[key] for key in SANDBOX_OWNED_KEYS})
+        deep_merge(agent_config, template_config)
+        for key in SANDBOX_OWNED_KEYS:
+            agent_config[key] = owned[key]
     
     # Write configuration
     config_path = os.path.join(sandbox_path, 'config', 'agent.json')
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Initializer Skill Script: framework_registry
+
+Description:
+    Data-driven registry of agent frameworks.
+    Frameworks are declared as data: built-in declarations below, JSON
+    plugin files in ~/.openclaw/frameworks (plus any directory listed in
+    INITIALIZER_FRAMEWORK_PATH) and "initializer.frameworks" entry points.
+    Plugins are loaded on first use, and the pairwise compatibility matrix
+    is computed once per load so every lookup is an index operation.
+    Added or removed plugin files are noticed through the plugin
+    directories' mtimes; files edited in place are picked up within
+    RECHECK_INTERVAL seconds.
+
+Plugin file format:
+    {
+      "name": "myframework",
+      "detect": {"module": "myframework"},
+      "capabilities": ["agents", "tools"],
+      "tooling": ["myframework"],
+      "capabilities_detailed": {"agent_management": {"supported": true, "details": "..."}},
+      "dependencies": {"core": ["python"], "optional": [], "development": []},
+      "compatibility": {"openclaw": "Via MCP"}
+    }
+    "detect" is either {"module": name} or {"command": [...], "config_dirs": [...]}.
+    A file may also hold a list of declarations or {"frameworks": [...]}.
+"""
+
+import argparse
+import logging
+import json
+import os
+import time
+
+PLUGIN_DIR = os.path.expanduser('~/.openclaw/frameworks')
+PLUGIN_PATH_ENV = 'INITIALIZER_FRAMEWORK_PATH'
+ENTRY_POINT_GROUP = 'initializer.frameworks'
+
+# Seconds between full listings of the plugin files
+RECHECK_INTERVAL = 2.0
+
+DETAILED_CAPABILITIES = ['agent_management', 'tool_integration', 'memory_management', 'communication', 'external_integrations']
+DEPENDENCY_KINDS = ['core', 'optional', 'development']
+
+GENERIC_COMPATIBILITY = {'compatible': True, 'notes': 'REST API integration possible'}
+
+BUILTIN_FRAMEWORKS = [
+    {
+        'name': 'openclaw',
+        'detect': {
+            'command': ['openclaw', '--version'],
+            'config_dirs': ['~/.openclaw', '~/AppData/Roaming/openclaw', '/etc/openclaw']
+        },
+        'capabilities': ['agent_management', 'skills', 'mcp_servers', 'sessions'],
+        'tooling': ['openclaw', 'sessions', 'skills', 'gateway'],
+        'capabilities_detailed': {
+            'agent_management': {'supported': True, 'details': 'Full agent lifecycle management'},
+            'tool_integration': {'supported': True, 'details': 'MCP servers and native tools'},
+            'memory_management': {'supported': True, 'details': 'Built-in memory systems'},
+            'communication': {'supported': True, 'details': 'Agent-to-agent messaging'},
+            'external_integrations': {'supported': True, 'details': 'Skills, plugins, MCP'}
+        },
+        'dependencies': {
+            'core': ['node', 'npm'],
+            'optional': ['python', 'ollama', 'docker'],
+            'development': ['git', 'typescript']
+        },
+        'compatibility': {
+            'openclaw': 'Native compatibility',
+            'langchain': 'Via Python tools and MCP',
+            'crewai': 'Via Python tools and MCP'
+        }
+    },
+    {
+        'name': 'langchain',
+        'detect': {'module': 'langchain'},
+        'capabilities': ['chains', 'agents', 'tools', 'prompts', 'memory'],
+        'tooling': ['langchain', 'langchain-core', 'langchain-community'],
+        'capabilities_detailed': {
+            'agent_management': {'supported': True, 'details': 'Agent creation and management'},
+            'tool_integration': {'supported': True, 'details': 'Tool ecosystem'},
+            'memory_management': {'supported': True, 'details': 'Memory components'},
+            'communication': {'supported': False, 'details': 'No built-in agent communication'},
+            'external_integrations': {'supported': True, 'details': 'Extensive integrations'}
+        },
+        'dependencies': {
+            'core': ['python', 'langchain-core'],
+            'optional': ['langchain-openai', 'langchain-anthropic'],
+            'development': ['pytest', 'ruff']
+        },
+        'compatibility': {
+            'openclaw': 'Via Python integration',
+            'langchain': 'Native compatibility',
+            'crewai': 'LangChain-based'
+        }
+    },
+    {
+        'name': 'crewai',
+        'detect': {'module': 'crewai'},
+        'capabilities': ['agents', 'tasks', 'crews', 'tools', 'processes'],
+        'tooling': ['crewai', 'crewai-tools'],
+        'capabilities_detailed': {
+            'agent_management': {'supported': True, 'details': 'Crew and task management'},
+            'tool_integration': {'supported': True, 'details': 'Custom tools'},
+            'memory_management': {'supported': False, 'details': 'Limited memory support'},
+            'communication': {'supported': True, 'details': 'Agent coordination'},
+            'external_integrations': {'supported': True, 'details': 'LangChain integration'}
+        },
+        'dependencies': {
+            'core': ['python', 'crewai'],
+            'optional': ['langchain', 'openai'],
+            'development': ['pytest', 'black']
+        },
+        'compatibility': {}
+    }
+]
+
+def main():
+    """Main script function"""
+    try:
+        parser = argparse.ArgumentParser(description='List registered agent frameworks')
+        subparsers = parser.add_subparsers(dest='command', required=True)
+
+        subparsers.add_parser('list', help='List registered frameworks')
+
+        show_parser = subparsers.add_parser('show', help='Show one framework declaration')
+        show_parser.add_argument('name', type=str, help='Framework name')
+
+        subparsers.add_parser('matrix', help='Print the compatibility matrix')
+
+        args = parser.parse_args()
+
+        registry = get_framework_registry()
+
+        if args.command == 'list':
+            for name in registry.names:
+                print(f"{name}\t{registry.sources[name]}")
+        elif args.command == 'show':
+            framework = registry.get(args.name)
+            if not framework:
+                logging.error(f"Framework not registered: {args.name}")
+                return 1
+            print(json.dumps(framework, indent=2))
+        elif args.command == 'matrix':
+            width = max(len(name) for name in registry.names)
+            print(' ' * width + '  ' + ' '.join(registry.names))
+            for a in registry.names:
+                cells = ['yes'.center(len(b)) if registry.is_compatible(a, b) else '-'.center(len(b)) for b in registry.names]
+                print(a.ljust(width) + '  ' + ' '.join(cells))
+
+        return 0
+
+    except Exception as e:
+        logging.exception(f"Framework registry failed: {str(e)}")
+        return 1
+
+def _require(condition, message):
+    if not condition:
+        raise ValueError(message)
+
+def _is_string_list(value):
+    return isinstance(value, list) and all(isinstance(item, str) for item in value)
+
+def validate_declaration(declaration):
+    """Check the shape of a framework declaration, raising ValueError on the first problem"""
+    _require(isinstance(declaration, dict) and isinstance(declaration.get('name'), str) and declaration['name'],
+             "Framework declaration must be an object with a 'name'")
+    name = declaration['name']
+
+    detect = declaration.get('detect', {})
+    _require(isinstance(detect, dict), f"{name}: 'detect' must be an object")
+    if 'module' in detect:
+        _require(isinstance(detect['module'], str) and detect['module'], f"{name}: 'detect.module' must be a string")
+    if 'command' in detect:
+        _require(_is_string_list(detect['command']) and detect['command'], f"{name}: 'detect.command' must be a non-empty list of strings")
+    _require(_is_string_list(detect.get('config_dirs', [])), f"{name}: 'detect.config_dirs' must be a list of strings")
+
+    for key in ('capabilities', 'tooling'):
+        _require(_is_string_list(declaration.get(key, [])), f"{name}: '{key}' must be a list of strings")
+
+    detailed = declaration.get('capabilities_detailed', {})
+    _require(isinstance(detailed, dict), f"{name}: 'capabilities_detailed' must be an object")
+    for cap, entry in detailed.items():
+        _require(isinstance(entry, dict)
+                 and isinstance(entry.get('supported', False), bool)
+                 and isinstance(entry.get('details', ''), str),
+                 f"{name}: 'capabilities_detailed.{cap}' must be an object with boolean 'supported' and string 'details'")
+
+    dependencies = declaration.get('dependencies', {})
+    _require(isinstance(dependencies, dict), f"{name}: 'dependencies' must be an object")
+    for kind, names in dependencies.items():
+        _require(_is_string_list(names), f"{name}: 'dependencies.{kind}' must be a list of strings")
+
+    compatibility = declaration.get('compatibility', {})
+    _require(isinstance(compatibility, dict) and all(isinstance(notes, str) for notes in compatibility.values()),
+             f"{name}: 'compatibility' must map framework names to note strings")
+
+def normalize_declaration(declaration):
+    """Fill in defaults for a framework declaration, validating its shape"""
+    validate_declaration(declaration)
+
+    detailed = {cap: {'supported': False, 'details': ''} for cap in DETAILED_CAPABILITIES}
+    for cap, entry in declaration.get('capabilities_detailed', {}).items():
+        detailed[cap] = {'supported': entry.get('supported', False), 'details': entry.get('details', '')}
+    dependencies = {kind: [] for kind in DEPENDENCY_KINDS}
+    dependencies.update({kind: list(names) for kind, names in declaration.get('dependencies', {}).items()})
+
+    return {
+        'name': declaration['name'],
+        'detect': dict(declaration.get('detect', {})),
+        'capabilities': list(declaration.get('capabilities', [])),
+        'tooling': list(declaration.get('tooling', [])),
+        'capabilities_detailed': detailed,
+        'dependencies': dependencies,
+        'compatibility': dict(declaration.get('compatibility', {}))
+    }
+
+class FrameworkRegistry:
+    """Framework declarations with a precomputed compatibility matrix"""
+
+    def __init__(self, frameworks):
+        """frameworks is a list of (framework, source), each already normalized"""
+        self.frameworks = {}
+        self.sources = {}
+        for framework, source in frameworks:
+            # Later declarations (plugins) override earlier ones (built-ins)
+            self.frameworks[framework['name']] = framework
+            self.sources[framework['name']] = source
+
+        self.names = list(self.frameworks)
+        self.index = {name: i for i, name in enumerate(self.names)}
+
+        # matrix[i][j] is the notes string when i declares j compatible, else None
+        self.matrix = [
+            [self.frameworks[a]['compatibility'].get(b) for b in self.names]
+            for a in self.names
+        ]
+        self._rows = {name: self._build_row(self.matrix[i]) for i, name in enumerate(self.names)}
+        self._unknown_row = self._build_row([None] * len(self.names))
+
+    def _build_row(self, cells):
+        row = {
+            name: {'compatible': notes is not None, 'notes': notes or ''}
+            for name, notes in zip(self.names, cells)
+        }
+        row['generic'] = dict(GENERIC_COMPATIBILITY)
+        return row
+
+    def get(self, name):
+        return self.frameworks.get(name)
+
+    def is_compatible(self, source, target):
+        """Check whether source declares target compatible"""
+        i = self.index.get(source)
+        j = self.index.get(target)
+        return i is not None and j is not None and self.matrix[i][j] is not None
+
+    def compatibility_row(self, name):
+        """Compatibility of one framework with every registered framework"""
+        row = self._rows.get(name, self._unknown_row)
+        return {other: dict(entry) for other, entry in row.items()}
+
+def plugin_dirs():
+    """Directories scanned for framework plugin files"""
+    dirs = [PLUGIN_DIR]
+    extra = os.environ.get(PLUGIN_PATH_ENV)
+    if extra:
+        dirs.extend(d for d in extra.split(os.pathsep) if d)
+    return dirs
+
+def plugin_dir_stamp():
+    """mtimes of the plugin directories, which change when files are added or removed"""
+    stamp = []
+    for directory in plugin_dirs():
+        try:
+            stamp.append((directory, os.stat(directory).st_mtime_ns))
+        except OSError:
+            stamp.append((directory, None))
+    return tuple(stamp)
+
+def list_plugin_files():
+    """Plugin files with their mtimes, in load order"""
+    files = []
+    for directory in plugin_dirs():
+        try:
+            names = sorted(os.listdir(directory))
+        except OSError:
+            continue
+        for name in names:
+            if name.endswith('.json'):
+                path = os.path.join(directory, name)
+                try:
+                    files.append((path, os.stat(path).st_mtime_ns))
+                except OSError:
+                    continue
+    return files
+
+def _declarations_from(value):
+    """Accept one declaration, a list, or {"frameworks": [...]}"""
+    if callable(value):
+        value = value()
+    if isinstance(value, dict) and 'frameworks' in value and 'name' not in value:
+        value = value['frameworks']
+    return value if isinstance(value, list) else [value]
+
+def load_plugin_file(path):
+    with open(path, 'r') as f:
+        return _declarations_from(json.load(f))
+
+_entry_point_declarations = None
+
+def load_entry_points():
+    """Declarations from installed packages' entry points, loaded once"""
+    global _entry_point_declarations
+    if _entry_point_declarations is None:
+        _entry_point_declarations = []
+        try:
+            from importlib.metadata import entry_points
+            try:
+                points = entry_points(group=ENTRY_POINT_GROUP)
+            except TypeError:
+                points = entry_points().get(ENTRY_POINT_GROUP, [])
+        except ImportError:
+            points = []
+        for point in points:
+            try:
+                for declaration in _declarations_from(point.load()):
+                    _entry_point_declarations.append((declaration, f"entry point {point.name}"))
+            except Exception as e:
+                logging.warning(f"Failed to load framework entry point {point.name}: {str(e)}")
+    return _entry_point_declarations
+
+_registry = None
+
+def get_framework_registry():
+    """Get the framework registry, reloading when plugin files change"""
+    global _registry
+    now = time.monotonic()
+    dir_stamp = plugin_dir_stamp()
+    if _registry and _registry['dirs'] == dir_stamp and now - _registry['checked_at'] < RECHECK_INTERVAL:
+        return _registry['registry']
+
+    files = list_plugin_files()
+    stamp = tuple(files)
+    if _registry and _registry['files'] == stamp:
+        _registry.update(dirs=dir_stamp, checked_at=now)
+        return _registry['registry']
+
+    declarations = [(declaration, 'builtin') for declaration in BUILTIN_FRAMEWORKS]
+    declarations.extend(load_entry_points())
+    for path, _ in files:
+        try:
+            declarations.extend((declaration, path) for declaration in load_plugin_file(path))
+        except (OSError, ValueError) as e:
+            logging.warning(f"Skipping framework plugin {path}: {str(e)}")
+
+    # One malformed plugin must not take down the whole registry
+    valid = []
+    for declaration, source in declarations:
+        try:
+            valid.append((normalize_declaration(declaration), source))
+        except ValueError as e:
+            logging.warning(f"Skipping framework declaration from {source}: {str(e)}")
+
+    registry = FrameworkRegistry(valid)
+    _registry = {'dirs': dir_stamp, 'files': stamp, 'checked_at': now, 'registry': registry}
+    return registry
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    exit(main())
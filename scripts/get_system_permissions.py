@@ -8,12 +8,17 @@ Description:
 """
 
 import argparse
+import copy
+import functools
 import logging
 import subprocess
 import json
 import os
 import sys
 
+from tracing import traced, traced_run
+
+@traced('permissions.main')
 def main():
     """Main script function"""
     try:
@@ -59,33 +64,103 @@ def detect_platform():
     else:
         raise Exception(f"Unsupported platform: {sys.platform}")
 
+# Linux capability numbers, from include/uapi/linux/capability.h
+LINUX_CAPABILITIES = [
+    'chown', 'dac_override', 'dac_read_search', 'fowner', 'fsetid', 'kill',
+    'setgid', 'setuid', 'setpcap', 'linux_immutable', 'net_bind_service',
+    'net_broadcast', 'net_admin', 'net_raw', 'ipc_lock', 'ipc_owner',
+    'sys_module', 'sys_rawio', 'sys_chroot', 'sys_ptrace', 'sys_pacct',
+    'sys_admin', 'sys_boot', 'sys_nice', 'sys_resource', 'sys_time',
+    'sys_tty_config', 'mknod', 'lease', 'audit_write', 'audit_control',
+    'setfcap', 'mac_override', 'mac_admin', 'syslog', 'wake_alarm',
+    'block_suspend', 'audit_read', 'perfmon', 'bpf', 'checkpoint_restore'
+]
+
+def get_permission_snapshot(platform=None):
+    """Get a memoized snapshot of the current process's identity and privileges"""
+    return copy.deepcopy(_build_permission_snapshot(platform or detect_platform()))
+
+@functools.lru_cache(maxsize=None)
+def _build_permission_snapshot(platform):
+    """Build the permission snapshot in-process (Windows still asks whoami)"""
+    if platform == 'windows':
+        result = traced_run(['whoami', '/priv'], capture_output=True, text=True)
+        return {
+            'platform': platform,
+            'user': os.getenv('USERNAME'),
+            'privileges': result.stdout.strip().split('\n') if result.returncode == 0 else [],
+            'elevated': has_elevated_privileges(platform)
+        }
+
+    import grp
+    import pwd
+
+    euid = os.geteuid()
+    egid = os.getegid()
+    group_ids = sorted(set(os.getgroups()) | {egid})
+
+    try:
+        user = pwd.getpwuid(euid).pw_name
+    except KeyError:
+        user = os.getenv('USER') or str(euid)
+
+    groups = []
+    for gid in group_ids:
+        try:
+            groups.append(grp.getgrgid(gid).gr_name)
+        except KeyError:
+            groups.append(str(gid))
+
+    status = read_proc_status()
+    capabilities = decode_capabilities(status.get('CapEff'))
+
+    return {
+        'platform': platform,
+        'user': user,
+        'uid': os.getuid(),
+        'euid': euid,
+        'gid': os.getgid(),
+        'egid': egid,
+        'groups': groups,
+        'group_ids': group_ids,
+        'capabilities': capabilities,
+        'umask': format(get_umask(status), '03o'),
+        'elevated': has_elevated_privileges(platform)
+    }
+
+def read_proc_status():
+    """Read /proc/self/status into a dict (empty where /proc is unavailable)"""
+    status = {}
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                status[key] = value.strip()
+    except OSError:
+        pass
+    return status
+
+def decode_capabilities(cap_hex):
+    """Decode a CapEff bitmask into capability names"""
+    if not cap_hex:
+        return []
+    mask = int(cap_hex, 16)
+    return [name for bit, name in enumerate(LINUX_CAPABILITIES) if mask & (1 << bit)]
+
+def get_umask(status=None):
+    """Get the process umask without changing it where the kernel reports it"""
+    if status and 'Umask' in status:
+        return int(status['Umask'], 8)
+    # No way to read the umask without setting it elsewhere
+    current = os.umask(0o022)
+    os.umask(current)
+    return current
+
+@traced('permissions.current')
 def get_current_permissions(platform):
     """Get current system permissions"""
     try:
-        if platform == 'windows':
-            # Windows: Check user permissions
-            result = subprocess.run(['whoami', '/priv'], capture_output=True, text=True)
-            return {
-                'platform': platform,
-                'user': os.getenv('USERNAME'),
-                'privileges': result.stdout.strip().split('\n') if result.returncode == 0 else []
-            }
-        elif platform == 'linux':
-            # Linux: Check user groups and permissions
-            result = subprocess.run(['groups'], capture_output=True, text=True)
-            return {
-                'platform': platform,
-                'user': os.getenv('USER'),
-                'groups': result.stdout.strip().split() if result.returncode == 0 else []
-            }
-        elif platform == 'macos':
-            # macOS: Similar to Linux
-            result = subprocess.run(['groups'], capture_output=True, text=True)
-            return {
-                'platform': platform,
-                'user': os.getenv('USER'),
-                'groups': result.stdout.strip().split() if result.returncode == 0 else []
-            }
+        return get_permission_snapshot(platform)
     except Exception as e:
         logging.error(f"Failed to get current permissions: {str(e)}")
     
@@ -95,6 +170,7 @@ def parse_permissions(rights_str):
     """Parse permissions string into list"""
     return [right.strip().lower() for right in rights_str.split(',')]
 
+@traced('permissions.request')
 def request_permissions(needed_perms, level, context, platform):
     """Request and configure needed permissions"""
     try:
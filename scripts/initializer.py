@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Initializer Skill Script: initializer
+
+Description:
+    Single entry point for all Initializer scripts.
+    Dispatches subcommands to the existing script modules, importing a
+    module only once its subcommand is chosen so that --help and light
+    subcommands start quickly.
+
+Usage:
+    python initializer.py <command> [options]
+    python initializer.py sandbox --name test_agent --capabilities web,file
+"""
+
+import sys
+
+# Subcommand -> (module, summary); modules are imported on dispatch only
+COMMANDS = {
+    'bootstrap': ('bootstrap_orchestrator', 'Run the full bootstrap as a parallel stage graph'),
+    'browser': ('bootstrap_browser', 'Bootstrap browser access'),
+    'browser-pool': ('browser_pool', 'Run a warm headless browser pool'),
+    'permissions': ('get_system_permissions', 'Get and configure system permissions'),
+    'audit': ('permission_audit', 'Audit or apply tree permissions against a policy'),
+    'analyze': ('analyze_agent_framework', 'Analyze agent frameworks'),
+    'frameworks': ('framework_registry', 'List registered frameworks and their compatibility'),
+    'external': ('setup_external_agent', 'Setup external agent communication'),
+    'sandbox': ('create_sandboxed_agent', 'Create sandboxed agent'),
+    'registry': ('sandbox_registry', 'Query the sandbox registry'),
+    'quota': ('sandbox_disk_quota', 'Check sandbox disk usage against quota'),
+    'gc': ('sandbox_gc', 'Rotate sandbox logs and purge stale temp files'),
+    'snapshot': ('sandbox_snapshot', 'Snapshot and restore sandboxes'),
+    'policy': ('sandbox_policy', 'Check file and network access against a sandbox policy'),
+    'state': ('shared_state', 'Inspect or update a sandbox shared state store'),
+    'synclog': ('sync_log', 'Inspect, replay or compact a sandbox sync log'),
+    'merge': ('merge_agents', 'Three-way merge of agent configs and workflows'),
+    'template': ('config_templates', 'Render agent configurations from templates'),
+    'channel': ('agent_channel', 'Talk to an external agent over a persistent WebSocket channel'),
+    'trace': ('tracing', 'Inspect initializer trace files')
+}
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+def usage():
+    """Build the top-level help text"""
+    width = max(len(name) for name in COMMANDS)
+    lines = [
+        'usage: initializer <command> [options]',
+        '',
+        'Initializer skill command line.',
+        '',
+        'commands:'
+    ]
+    lines += [f"  {name.ljust(width)}  {summary}" for name, (_, summary) in COMMANDS.items()]
+    lines += ['', "Run 'initializer <command> --help' for command options."]
+    return '\n'.join(lines)
+
+def main(argv=None):
+    """Main script function"""
+    argv = sys.argv[1:] if argv is None else list(argv)
+
+    # Hand-rolled dispatch keeps argparse and every script module out of --help
+    if not argv or argv[0] in ('-h', '--help'):
+        print(usage())
+        return 0 if argv else 1
+
+    command, command_args = argv[0], argv[1:]
+    if command not in COMMANDS:
+        print(usage(), file=sys.stderr)
+        print(f"\ninitializer: unknown command '{command}'", file=sys.stderr)
+        return 1
+
+    return run_command(command, command_args)
+
+def run_command(command, command_args):
+    """Import a subcommand's module and run its main() with the given arguments"""
+    import importlib
+    import logging
+
+    module_name = COMMANDS[command][0]
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+    module = importlib.import_module(module_name)
+
+    from tracing import span
+
+    saved_argv = sys.argv
+    sys.argv = [f'initializer {command}'] + list(command_args)
+    try:
+        with span(f'initializer.{command}', args=list(command_args)):
+            return module.main()
+    finally:
+        sys.argv = saved_argv
+
+if __name__ == "__main__":
+    exit(main())
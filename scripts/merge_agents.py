@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Initializer Skill Script: merge_agents
+
+Description:
+    Merge two agents' configurations and workflow definitions (Merging Mode).
+    Performs a three-way structural merge of JSON documents: every subtree
+    is hashed once, bottom-up, so shared structure is recognized in linear
+    time and only subtrees changed on both sides are descended into.
+    Lists of nodes with an "id" are merged by id and lists of unique
+    scalars (capability lists) as sets. Other concurrent changes are
+    reported as explicit conflicts rather than overwritten; the merged
+    output keeps "ours" at each conflict.
+
+    Workflow definitions stored as JSONL (one node with an "id" per line)
+    are merged by streaming: only an id -> (offset, hash) index is held in
+    memory, and nodes are read back individually when both sides changed.
+"""
+
+import argparse
+import logging
+import json
+import hashlib
+import os
+
+MISSING = object()
+
+def main():
+    """Main script function"""
+    try:
+        parser = argparse.ArgumentParser(description='Three-way merge of agent configs and workflows')
+        parser.add_argument('--base', type=str, help='Common ancestor (omit for a two-way merge)', default=None)
+        parser.add_argument('--ours', type=str, help='Our version', required=True)
+        parser.add_argument('--theirs', type=str, help='Their version', required=True)
+        parser.add_argument('--output', type=str, help='Output file for the merged document', default=None)
+        parser.add_argument('--conflicts', type=str, help='Output file for conflicts (JSON)', default=None)
+
+        args = parser.parse_args()
+
+        streaming = args.ours.endswith('.jsonl')
+        if streaming:
+            if not args.output:
+                logging.error("--output is required for JSONL workflows")
+                return 1
+            conflicts = merge_jsonl_files(args.base, args.ours, args.theirs, args.output)
+        else:
+            merged, conflicts = merge_json_files(args.base, args.ours, args.theirs)
+            if args.output:
+                with open(args.output, 'w') as f:
+                    json.dump(merged, f, indent=2)
+                logging.info(f"Merged document saved to {args.output}")
+            else:
+                print(json.dumps(merged, indent=2))
+
+        if args.conflicts:
+            with open(args.conflicts, 'w') as f:
+                json.dump(conflicts, f, indent=2)
+        for conflict in conflicts:
+            logging.warning(f"Conflict at {conflict['path']}: {conflict['reason']}")
+
+        logging.info(f"Merge finished with {len(conflicts)} conflicts")
+        return 0 if not conflicts else 2
+
+    except Exception as e:
+        logging.exception(f"Merge failed: {str(e)}")
+        return 1
+
+def scalar_bytes(value):
+    """Type-tagged encoding of a JSON scalar"""
+    if value is None:
+        return b'n'
+    if value is True:
+        return b't'
+    if value is False:
+        return b'f'
+    if isinstance(value, str):
+        return b's' + value.encode('utf-8', 'surrogatepass')
+    if isinstance(value, int):
+        return b'i' + str(value).encode('ascii')
+    return b'd' + repr(value).encode('ascii')
+
+def _scalar_digest(value):
+    return hashlib.blake2b(scalar_bytes(value), digest_size=16).digest()
+
+class SubtreeHasher:
+    """Memoized Merkle hashes of JSON subtrees, each computed once"""
+
+    def __init__(self):
+        # id(container) -> digest
+        self.digests = {}
+        # Hashed containers stay referenced so their ids are never reused
+        self.keep = []
+
+    def digest(self, node):
+        if not isinstance(node, (dict, list)):
+            return _scalar_digest(node)
+        cached = self.digests.get(id(node))
+        if cached is not None:
+            return cached
+
+        # Post-order walk on an explicit stack: children are hashed before their
+        # parent, and document depth is bounded by memory rather than recursion
+        stack = [(node, False)]
+        while stack:
+            current, children_done = stack.pop()
+            if id(current) in self.digests:
+                continue
+            children = current.values() if isinstance(current, dict) else current
+            if not children_done:
+                stack.append((current, True))
+                stack.extend(
+                    (child, False) for child in children
+                    if isinstance(child, (dict, list)) and id(child) not in self.digests
+                )
+                continue
+
+            h = hashlib.blake2b(digest_size=16)
+            if isinstance(current, dict):
+                h.update(b'{')
+                for k in sorted(current):
+                    kb = k.encode('utf-8', 'surrogatepass')
+                    h.update(len(kb).to_bytes(4, 'little'))
+                    h.update(kb)
+                    h.update(self._child_digest(current[k]))
+            else:
+                h.update(b'[')
+                for item in current:
+                    h.update(self._child_digest(item))
+            self.digests[id(current)] = h.digest()
+            self.keep.append(current)
+        return self.digests[id(node)]
+
+    def _child_digest(self, child):
+        if isinstance(child, (dict, list)):
+            return self.digests[id(child)]
+        return _scalar_digest(child)
+
+    def same(self, a, b):
+        if a is MISSING or b is MISSING:
+            return a is b
+        return self.digest(a) == self.digest(b)
+
+def _pointer(path, key):
+    """Extend a JSON pointer with one key"""
+    return f"{path}/{str(key).replace('~', '~0').replace('/', '~1')}"
+
+def _conflict(path, reason, base, ours, theirs):
+    def show(value):
+        return None if value is MISSING else value
+    return {'path': path or '/', 'reason': reason, 'base': show(base), 'ours': show(ours), 'theirs': show(theirs)}
+
+def _is_keyed_list(*values):
+    """Lists whose items are all objects with an 'id' are merged by id"""
+    for value in values:
+        if value is MISSING:
+            continue
+        if not isinstance(value, list) or not all(isinstance(item, dict) and 'id' in item for item in value):
+            return False
+    return True
+
+def _is_scalar_set(*values):
+    """Lists of unique strings or numbers (e.g. capability lists) are merged as sets"""
+    for value in values:
+        if value is MISSING:
+            continue
+        if not isinstance(value, list):
+            return False
+        if not all(isinstance(item, (str, int, float)) and not isinstance(item, bool) for item in value):
+            return False
+        if len(set(value)) != len(value):
+            return False
+    return True
+
+def _merge_scalar_sets(base, ours, theirs):
+    removed = set(base) - set(theirs)
+    kept = [item for item in ours if item not in removed]
+    present = set(ours)
+    return kept + [item for item in theirs if item not in present and item not in base]
+
+def merge_values(base, ours, theirs, hasher, conflicts, path=''):
+    """Three-way merge of two JSON values against their base; returns the merged value.
+
+    Works through an explicit stack rather than recursion, so deeply nested
+    documents merge without hitting the interpreter's recursion limit.
+    Conflicts are reported in document order.
+    """
+    root = [MISSING]
+    containers = []
+    stack = [(base, ours, theirs, path, root, 0)]
+    while stack:
+        b, o, t, p, parent, slot = stack.pop()
+        value, children = _merge_step(b, o, t, hasher, conflicts, p)
+        parent[slot] = value
+        if children:
+            containers.append(value)
+            # Reversed so children are merged, and conflicts reported, in order
+            stack.extend(reversed(children))
+
+    # Drop entries deleted by the merge, keeping the order of the rest
+    for container in containers:
+        if isinstance(container, dict):
+            for key in [k for k, v in container.items() if v is MISSING]:
+                del container[key]
+        else:
+            container[:] = [v for v in container if v is not MISSING]
+    return root[0]
+
+def _merge_step(base, ours, theirs, hasher, conflicts, path):
+    """Merge one level: (value, child tasks filling the value's slots)"""
+    if hasher.same(ours, theirs):
+        return ours, None
+    if hasher.same(base, ours):
+        return theirs, None
+    if hasher.same(base, theirs):
+        return ours, None
+
+    # Both sides changed this subtree in different ways
+    if ours is MISSING or theirs is MISSING:
+        conflicts.append(_conflict(path, 'modify/delete', base, ours, theirs))
+        return ours, None
+
+    if isinstance(ours, dict) and isinstance(theirs, dict):
+        return _merge_dicts(base if isinstance(base, dict) else {}, ours, theirs, path)
+
+    if isinstance(ours, list) and isinstance(theirs, list) and _is_keyed_list(base, ours, theirs):
+        return _merge_keyed_lists(base if isinstance(base, list) else [], ours, theirs, path)
+
+    if isinstance(ours, list) and isinstance(theirs, list) and _is_scalar_set(base, ours, theirs):
+        return _merge_scalar_sets(base if isinstance(base, list) else [], ours, theirs), None
+
+    reason = 'add/add' if base is MISSING else 'modify/modify'
+    conflicts.append(_conflict(path, reason, base, ours, theirs))
+    return ours, None
+
+def _merge_dicts(base, ours, theirs, path):
+    keys = list(ours) + [k for k in theirs if k not in ours]
+    keys += [k for k in base if k not in ours and k not in theirs]
+    merged = dict.fromkeys(keys, MISSING)
+    children = [
+        (base.get(key, MISSING), ours.get(key, MISSING), theirs.get(key, MISSING), _pointer(path, key), merged, key)
+        for key in keys
+    ]
+    return merged, children
+
+def _merge_keyed_lists(base, ours, theirs, path):
+    base_by_id = {item['id']: item for item in base}
+    ours_by_id = {item['id']: item for item in ours}
+    theirs_by_id = {item['id']: item for item in theirs}
+
+    # Our order first, then nodes only they added, in their order
+    order = [item['id'] for item in ours] + [item['id'] for item in theirs if item['id'] not in ours_by_id]
+    merged = [MISSING] * len(order)
+    children = [
+        (base_by_id.get(node_id, MISSING), ours_by_id.get(node_id, MISSING), theirs_by_id.get(node_id, MISSING),
+         _pointer(path, f"[id={node_id}]"), merged, index)
+        for index, node_id in enumerate(order)
+    ]
+    return merged, children
+
+def merge_documents(base, ours, theirs):
+    """Merge in-memory JSON documents; base=None performs a two-way merge"""
+    hasher = SubtreeHasher()
+    conflicts = []
+    merged = merge_values(MISSING if base is None else base, ours, theirs, hasher, conflicts)
+    return merged, conflicts
+
+def merge_json_files(base_path, ours_path, theirs_path):
+    """Merge three JSON files in memory"""
+    def load(path):
+        if not path:
+            return None
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    return merge_documents(load(base_path), load(ours_path), load(theirs_path))
+
+def index_jsonl(path):
+    """Index a JSONL workflow: ordered ids and id -> (offset, length, digest)"""
+    order = []
+    index = {}
+    if not path:
+        return order, index
+
+    with open(path, 'rb') as f:
+        offset = 0
+        for line in f:
+            length = len(line)
+            if line.strip():
+                node = json.loads(line)
+                node_id = node['id']
+                if node_id in index:
+                    raise ValueError(f"Duplicate node id {node_id!r} in {path}")
+                # Whole-node digest via the C encoder; nodes are compared, not descended
+                digest = hashlib.blake2b(
+                    json.dumps(node, sort_keys=True, separators=(',', ':')).encode('utf-8'),
+                    digest_size=16
+                ).digest()
+                index[node_id] = (offset, length, digest)
+                order.append(node_id)
+            offset += length
+    return order, index
+
+def read_jsonl_node(f, entry):
+    """Read one node back by its indexed offset"""
+    f.seek(entry[0])
+    return json.loads(f.read(entry[1]))
+
+def merge_jsonl_files(base_path, ours_path, theirs_path, output_path):
+    """Stream-merge JSONL workflow definitions keyed by node id; returns conflicts"""
+    _, base_index = index_jsonl(base_path)
+    ours_order, ours_index = index_jsonl(ours_path)
+    theirs_order, theirs_index = index_jsonl(theirs_path)
+    logging.info(f"Indexed {len(ours_index)} ours / {len(theirs_index)} theirs / {len(base_index)} base nodes")
+
+    conflicts = []
+    order = ours_order + [node_id for node_id in theirs_order if node_id not in ours_index]
+
+    base_f = open(base_path, 'rb') if base_path else None
+    try:
+        with open(ours_path, 'rb') as ours_f, open(theirs_path, 'rb') as theirs_f, \
+                open(output_path + '.tmp', 'w') as out:
+            for node_id in order:
+                b = base_index.get(node_id)
+                o = ours_index.get(node_id)
+                t = theirs_index.get(node_id)
+                bd, od, td = (e[2] if e else None for e in (b, o, t))
+
+                # Decide from digests alone wherever possible
+                if od == td or bd == td:
+                    source = (ours_f, o)
+                elif bd == od:
+                    source = (theirs_f, t)
+                else:
+                    source = None
+
+                if source is not None:
+                    if source[1] is None:
+                        continue
+                    f, entry = source
+                    f.seek(entry[0])
+                    line = f.read(entry[1]).rstrip(b'\r\n').decode('utf-8')
+                    out.write(line + '\n')
+                    continue
+
+                node_conflicts = []
+                merged = merge_values(
+                    read_jsonl_node(base_f, b) if b else MISSING,
+                    read_jsonl_node(ours_f, o) if o else MISSING,
+                    read_jsonl_node(theirs_f, t) if t else MISSING,
+                    SubtreeHasher(), node_conflicts, _pointer('', f"[id={node_id}]")
+                )
+                conflicts.extend(node_conflicts)
+                if merged is not MISSING:
+                    out.write(json.dumps(merged, separators=(',', ':')) + '\n')
+        os.replace(output_path + '.tmp', output_path)
+    finally:
+        if base_f:
+            base_f.close()
+
+    return conflicts
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    exit(main())
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Initializer Skill Script: permission_audit
+
+Description:
+    Audit file permissions across sandbox and workspace trees.
+    Walks large trees with os.scandir across a thread pool, checks each
+    entry's mode, owner and effective access against a declared policy and
+    streams violations as they are found.
+"""
+
+import argparse
+import errno
+import logging
+import json
+import os
+import stat
+import sys
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from get_system_permissions import get_permission_snapshot
+
+ACCESS_BITS = {'read': 4, 'write': 2, 'execute': 1}
+
+def main():
+    """Main script function"""
+    try:
+        parser = argparse.ArgumentParser(description='Audit permissions of a directory tree')
+        parser.add_argument('--path', type=str, help='Tree to audit', default=None)
+        parser.add_argument('--name', type=str, help='Sandbox name (audits its tree against security.json)', default=None)
+        parser.add_argument('--policy', type=str, help='Policy JSON file', default=None)
+        parser.add_argument('--dir-mode', type=str, help='Required directory mode (octal)', default=None)
+        parser.add_argument('--file-mode', type=str, help='Required file mode (octal)', default=None)
+        parser.add_argument('--forbidden-bits', type=str, help='Mode bits that must not be set (octal)', default=None)
+        parser.add_argument('--owner', type=str, help='Required owner (name or uid)', default=None)
+        parser.add_argument('--group', type=str, help='Required group (name or gid)', default=None)
+        parser.add_argument('--access', type=str, help='Access the current user needs (comma-separated)', default=None)
+        parser.add_argument('--workers', type=int, help='Scanner threads', default=None)
+        parser.add_argument('--limit', type=int, help='Stop after this many violations', default=None)
+        parser.add_argument('--apply', action='store_true', help='Change entries to match the policy')
+        parser.add_argument('--dry-run', action='store_true', help='Show the changes --apply would make')
+
+        args = parser.parse_args()
+
+        if args.name:
+            from sandbox_disk_quota import resolve_sandbox_path
+            root = resolve_sandbox_path(args.name, args.path)
+        elif args.path:
+            root = os.path.abspath(args.path)
+        else:
+            logging.error("One of --path or --name is required")
+            return 1
+
+        policy = load_policy(args.policy, root) if args.policy or args.name else {}
+        overrides = {
+            'dir_mode': args.dir_mode,
+            'file_mode': args.file_mode,
+            'forbidden_bits': args.forbidden_bits,
+            'owner': args.owner,
+            'group': args.group,
+            'access': parse_access(args.access) if args.access else None
+        }
+        policy.update({k: v for k, v in overrides.items() if v is not None})
+        if not policy:
+            logging.error("No policy given; use --policy, --name or the individual policy options")
+            return 1
+
+        if args.apply or args.dry_run:
+            summary = {'chmod': 0, 'chown': 0, 'errors': 0}
+            for change in apply_policy(root, policy, args.workers, args.dry_run):
+                print(json.dumps(change))
+                summary['chmod'] += change['chmod']
+                summary['chown'] += change['chown']
+                summary['errors'] += 'error' in change
+            print(json.dumps({'summary': summary, 'dry_run': args.dry_run}))
+            logging.info(f"{'Planned' if args.dry_run else 'Applied'} {summary['chmod']} chmod and {summary['chown']} chown on {root}")
+            return 0 if summary['errors'] == 0 else 1
+
+        count = 0
+        for violation in audit_tree(root, policy, args.workers):
+            print(json.dumps(violation))
+            count += 1
+            if args.limit and count >= args.limit:
+                break
+        sys.stdout.flush()
+
+        logging.info(f"Audit of {root} found {count} violations")
+        return 0 if count == 0 else 2
+
+    except BrokenPipeError:
+        # Output consumer (e.g. head) went away; nothing left to report
+        return 0
+    except Exception as e:
+        logging.exception(f"Permission audit failed: {str(e)}")
+        return 1
+
+def parse_access(access_str):
+    """Parse an access string into a list of rights"""
+    return [right.strip().lower() for right in access_str.split(',') if right.strip()]
+
+def load_policy(policy_path, sandbox_path=None):
+    """Load a policy from a JSON file, or derive one from a sandbox's security.json"""
+    if policy_path:
+        with open(policy_path, 'r') as f:
+            return json.load(f)
+
+    security_path = os.path.join(sandbox_path, 'config', 'security.json')
+    file_permissions = '700'
+    try:
+        with open(security_path, 'r') as f:
+            file_permissions = json.load(f).get('file_permissions', file_permissions)
+    except (OSError, json.JSONDecodeError):
+        logging.info(f"No security configuration at {security_path}; assuming {file_permissions}")
+
+    # 700 means owner-only: nothing for group or other, directories exactly 700
+    mode = int(str(file_permissions), 8)
+    return {
+        'dir_mode': format(mode, '03o'),
+        'forbidden_bits': format(~mode & 0o777, '03o'),
+        'owner': os.geteuid() if hasattr(os, 'geteuid') else None
+    }
+
+def resolve_uid(owner):
+    """Resolve an owner name or uid to a uid"""
+    if owner is None or isinstance(owner, int):
+        return owner
+    if str(owner).isdigit():
+        return int(owner)
+    import pwd
+    return pwd.getpwnam(owner).pw_uid
+
+def resolve_gid(group):
+    """Resolve a group name or gid to a gid"""
+    if group is None or isinstance(group, int):
+        return group
+    if str(group).isdigit():
+        return int(group)
+    import grp
+    return grp.getgrnam(group).gr_gid
+
+def compile_policy(policy):
+    """Turn a policy dict into the integer form the scanners compare against"""
+    def octal(value):
+        return None if value is None else int(str(value), 8)
+
+    snapshot = get_permission_snapshot()
+    return {
+        'dir_mode': octal(policy.get('dir_mode')),
+        'file_mode': octal(policy.get('file_mode')),
+        'forbidden_bits': octal(policy.get('forbidden_bits')) or 0,
+        'owner': resolve_uid(policy.get('owner')),
+        'group': resolve_gid(policy.get('group')),
+        'access': [ACCESS_BITS[right] for right in policy.get('access') or []],
+        'access_names': list(policy.get('access') or []),
+        'euid': snapshot.get('euid'),
+        'group_ids': set(snapshot.get('group_ids', [])),
+        'privileged': snapshot.get('euid') == 0 or 'dac_override' in snapshot.get('capabilities', [])
+    }
+
+def effective_access_bits(st, compiled):
+    """Compute the rwx bits the current user effectively has on an entry"""
+    mode = st.st_mode
+    if compiled['privileged']:
+        execute = 1 if stat.S_ISDIR(mode) or mode & 0o111 else 0
+        return 6 | execute
+    if st.st_uid == compiled['euid']:
+        return (mode >> 6) & 7
+    if st.st_gid in compiled['group_ids']:
+        return (mode >> 3) & 7
+    return mode & 7
+
+def check_entry(path, st, compiled):
+    """Evaluate one entry against a compiled policy and return its violations"""
+    if stat.S_ISLNK(st.st_mode):
+        return []
+
+    violations = []
+    mode = stat.S_IMODE(st.st_mode)
+    is_dir = stat.S_ISDIR(st.st_mode)
+
+    required = compiled['dir_mode'] if is_dir else compiled['file_mode']
+    if required is not None and mode != required:
+        violations.append({'path': path, 'check': 'mode', 'expected': format(required, '03o'), 'actual': format(mode, '03o')})
+    elif mode & compiled['forbidden_bits']:
+        violations.append({'path': path, 'check': 'forbidden_bits', 'expected': format(mode & ~compiled['forbidden_bits'], '03o'), 'actual': format(mode, '03o')})
+
+    if compiled['owner'] is not None and st.st_uid != compiled['owner']:
+        violations.append({'path': path, 'check': 'owner', 'expected': compiled['owner'], 'actual': st.st_uid})
+    if compiled['group'] is not None and st.st_gid != compiled['group']:
+        violations.append({'path': path, 'check': 'group', 'expected': compiled['group'], 'actual': st.st_gid})
+
+    if compiled['access']:
+        have = effective_access_bits(st, compiled)
+        granted = [name for name, bit in zip(compiled['access_names'], compiled['access']) if have & bit]
+        if len(granted) < len(compiled['access']):
+            violations.append({'path': path, 'check': 'access', 'expected': compiled['access_names'], 'actual': granted})
+
+    return violations
+
+def scan_directory(dir_path, visit):
+    """Scan one directory, visiting every entry; returns (results, subdirectories)"""
+    results = []
+    subdirs = []
+    try:
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                try:
+                    st = entry.stat(follow_symlinks=False)
+                except FileNotFoundError:
+                    continue
+                results.extend(visit(entry.path, st))
+                if stat.S_ISDIR(st.st_mode):
+                    subdirs.append(entry.path)
+    except (FileNotFoundError, NotADirectoryError):
+        pass
+    except PermissionError as e:
+        results.append({'path': dir_path, 'check': 'unreadable', 'error': str(e)})
+    return results, subdirs
+
+def walk_tree_parallel(root, visit, workers=None):
+    """Walk a tree with a thread pool, yielding visit(path, lstat) results as they arrive"""
+    workers = workers or min(32, (os.cpu_count() or 1) * 4)
+
+    try:
+        root_stat = os.lstat(root)
+    except FileNotFoundError:
+        return
+    yield from visit(root, root_stat)
+    if not stat.S_ISDIR(root_stat.st_mode):
+        return
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='audit') as executor:
+        pending = {executor.submit(scan_directory, root, visit)}
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results, subdirs = future.result()
+                    for subdir in subdirs:
+                        pending.add(executor.submit(scan_directory, subdir, visit))
+                    yield from results
+        finally:
+            # Stop queued scans if the consumer stops early
+            for future in pending:
+                future.cancel()
+
+def audit_tree(root, policy, workers=None):
+    """Audit a tree against a policy, yielding violations as they are found"""
+    compiled = compile_policy(policy)
+    yield from walk_tree_parallel(root, lambda path, st: check_entry(path, st, compiled), workers)
+
+def plan_entry(st, compiled):
+    """Compute the (mode, uid, gid) an entry should have; -1 means leave unchanged"""
+    mode = stat.S_IMODE(st.st_mode)
+    required = compiled['dir_mode'] if stat.S_ISDIR(st.st_mode) else compiled['file_mode']
+    desired_mode = required if required is not None else mode & ~compiled['forbidden_bits']
+
+    uid = compiled['owner'] if compiled['owner'] is not None and compiled['owner'] != st.st_uid else -1
+    gid = compiled['group'] if compiled['group'] is not None and compiled['group'] != st.st_gid else -1
+    return (desired_mode if desired_mode != mode else -1), uid, gid
+
+def change_entry(path, st, mode, uid, gid):
+    """chown/chmod the entry scanned as st, through a descriptor that cannot follow a symlink.
+
+    Raises OSError when path no longer refers to the scanned inode, so an
+    entry swapped for a symlink or hard link after the scan is left alone.
+    """
+    # O_PATH opens the entry without needing read access, and with
+    # O_NOFOLLOW a symlink is opened as itself rather than followed
+    fd = os.open(path, os.O_NOFOLLOW | getattr(os, 'O_PATH', os.O_RDONLY) | getattr(os, 'O_CLOEXEC', 0))
+    try:
+        current = os.fstat(fd)
+        if stat.S_ISLNK(current.st_mode) or (current.st_ino, current.st_dev) != (st.st_ino, st.st_dev):
+            raise OSError(errno.ESTALE, "Replaced since it was scanned", path)
+        # O_PATH descriptors cannot be fchown-ed or fchmod-ed; /proc resolves to the same inode
+        fd_path = f"/proc/self/fd/{fd}"
+        # chown first: changing ownership can clear setuid/setgid bits
+        if uid != -1 or gid != -1:
+            try:
+                os.fchown(fd, uid, gid)
+            except OSError:
+                os.chown(fd_path, uid, gid)
+        if mode != -1:
+            try:
+                os.fchmod(fd, mode)
+            except OSError:
+                os.chmod(fd_path, mode)
+    finally:
+        os.close(fd)
+
+def apply_entry(path, st, compiled, dry_run=False):
+    """Bring one entry in line with the policy, issuing syscalls only for differences"""
+    if stat.S_ISLNK(st.st_mode):
+        return []
+
+    mode, uid, gid = plan_entry(st, compiled)
+    if mode == -1 and uid == -1 and gid == -1:
+        return []
+
+    change = {'path': path, 'chmod': 0, 'chown': 0}
+    if mode != -1:
+        change['mode'] = [format(stat.S_IMODE(st.st_mode), '03o'), format(mode, '03o')]
+        change['chmod'] = 1
+    if uid != -1 or gid != -1:
+        change['owner'] = [[st.st_uid, st.st_gid], [st.st_uid if uid == -1 else uid, st.st_gid if gid == -1 else gid]]
+        change['chown'] = 1
+
+    if not dry_run:
+        try:
+            change_entry(path, st, mode, uid, gid)
+        except OSError as e:
+            change['error'] = str(e)
+    return [change]
+
+def apply_policy(root, policy, workers=None, dry_run=False):
+    """Apply a policy across a tree in parallel, yielding each change made (or planned).
+
+    Directories are changed after the walk, deepest first, so tightening a
+    directory never stops the walk from reaching its children.
+    """
+    compiled = compile_policy(policy)
+    directories = []
+
+    def visit(path, st):
+        if stat.S_ISDIR(st.st_mode):
+            directories.append((path, st))
+            return []
+        return apply_entry(path, st, compiled, dry_run)
+
+    for result in walk_tree_parallel(root, visit, workers):
+        if result.get('check') == 'unreadable':
+            result = {'path': result['path'], 'chmod': 0, 'chown': 0, 'error': result['error']}
+        yield result
+    for path, st in sorted(directories, key=lambda d: (-d[0].count(os.sep), d[0])):
+        yield from apply_entry(path, st, compiled, dry_run)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    exit(main())
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Initializer Skill Script: sandbox_disk_quota
+
+Description:
+    Track sandbox disk usage incrementally and enforce the disk limit set by
+    create_sandboxed_agent. A size index with every directory's files is
+    kept for every sandbox. Each check rescans only directories that changed
+    recently (and so are likely to keep changing) plus a fixed budget of
+    quiet directories in rotation, so its cost follows activity rather than
+    sandbox size; quiet directories are all revisited within a few checks
+    and a periodic full rescan backs this up.
+"""
+
+import argparse
+import logging
+import json
+import os
+import stat
+import time
+
+INDEX_FILE = 'disk_usage.json'
+INDEX_VERSION = 2
+
+# Directories an agent writes to; their write bits are removed when blocking
+WRITABLE_DIRS = ['workspace', 'data', 'logs', 'temp']
+
+# Directories with a change (to themselves or a file in them) this recent
+# are rescanned on every check: files being written keep growing in place
+HOT_WINDOW_NS = 15 * 60 * 1000 * 1000 * 1000
+# Quiet directories rescanned per check, in rotation
+SCAN_BUDGET = 256
+
+SIZE_UNITS = {
+    'B': 1,
+    'KB': 1024,
+    'MB': 1024 ** 2,
+    'GB': 1024 ** 3,
+    'TB': 1024 ** 4
+}
+
+def main():
+    """Main script function"""
+    try:
+        parser = argparse.ArgumentParser(description='Check sandbox disk usage against quota')
+        parser.add_argument('--name', type=str, help='Sandbox name', default=None)
+        parser.add_argument('--path', type=str, help='Sandbox directory path', default=None)
+        parser.add_argument('--all', action='store_true', help='Check every sandbox under ~/.openclaw/sandboxes')
+        parser.add_argument('--limit', type=str, help='Disk limit override (e.g. 10GB)', default=None)
+        parser.add_argument('--action', type=str, help='Action on excess (report, flag, block)', default='flag')
+        parser.add_argument('--full', action='store_true', help='Force a full rescan')
+        parser.add_argument('--rescan-after', type=int, help='Seconds between forced full rescans', default=3600)
+        parser.add_argument('--scan-budget', type=int, help='Quiet directories rescanned per check', default=SCAN_BUDGET)
+        parser.add_argument('--output', type=str, help='Output file for quota report', default=None)
+
+        args = parser.parse_args()
+
+        if args.all:
+            paths = list_sandbox_paths()
+        elif args.path or args.name:
+            paths = [resolve_sandbox_path(args.name, args.path)]
+        else:
+            logging.error("One of --name, --path or --all is required")
+            return 1
+
+        reports = [
+            check_sandbox_quota(path, args.limit, args.action, args.full, args.rescan_after, args.scan_budget)
+            for path in paths
+        ]
+
+        # Output results
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(reports, f, indent=2)
+            logging.info(f"Quota report saved to {args.output}")
+        else:
+            print(json.dumps(reports, indent=2))
+
+        return 0 if all(not r['over_quota'] for r in reports) else 2
+
+    except Exception as e:
+        logging.exception(f"Disk quota check failed: {str(e)}")
+        return 1
+
+def resolve_sandbox_path(name, custom_path):
+    """Resolve sandbox directory path the same way create_sandboxed_agent does"""
+    if custom_path:
+        return os.path.abspath(custom_path)
+    return os.path.abspath(os.path.join(os.path.expanduser('~/.openclaw'), 'sandboxes', name))
+
+def list_sandbox_paths():
+    """List sandbox directories under the default sandbox root"""
+    root = os.path.join(os.path.expanduser('~/.openclaw'), 'sandboxes')
+    if not os.path.isdir(root):
+        return []
+    return sorted(
+        entry.path for entry in os.scandir(root)
+        if entry.is_dir(follow_symlinks=False) and os.path.isdir(os.path.join(entry.path, 'config'))
+    )
+
+def parse_size(size_str):
+    """Parse a size string such as '10GB' or '512MB' into bytes"""
+    if isinstance(size_str, (int, float)):
+        return int(size_str)
+    text = size_str.strip().upper().replace(' ', '')
+    for unit in sorted(SIZE_UNITS, key=len, reverse=True):
+        if text.endswith(unit):
+            return int(float(text[:-len(unit)]) * SIZE_UNITS[unit])
+    return int(float(text))
+
+def load_disk_limit(sandbox_path):
+    """Load the disk limit recorded by apply_resource_limits"""
+    resources_path = os.path.join(sandbox_path, 'config', 'resources.json')
+    try:
+        with open(resources_path, 'r') as f:
+            resources = json.load(f)
+        return resources.get('disk', {}).get('limit')
+    except (OSError, json.JSONDecodeError) as e:
+        logging.warning(f"Failed to load resource limits from {resources_path}: {str(e)}")
+        return None
+
+def load_index(sandbox_path):
+    """Load the size index for a sandbox"""
+    index_path = os.path.join(sandbox_path, 'config', INDEX_FILE)
+    try:
+        with open(index_path, 'r') as f:
+            index = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        index = {}
+    if index.get('version') == INDEX_VERSION:
+        return index
+    # An index from an older version is rebuilt, but a block it recorded still has to be lifted
+    return {'version': INDEX_VERSION, 'last_full_scan': 0, 'state': index.get('state', 'ok'), 'dirs': {}}
+
+def save_index(sandbox_path, index):
+    """Atomically write the size index"""
+    index_path = os.path.join(sandbox_path, 'config', INDEX_FILE)
+    tmp_path = index_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(index, f)
+    os.replace(tmp_path, index_path)
+
+def scan_directory(path):
+    """Scan one directory: ({file name: [bytes, mtime_ns]}, subdirectory names)"""
+    files = {}
+    subdirs = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.name)
+                    continue
+                st = entry.stat(follow_symlinks=False)
+            except FileNotFoundError:
+                continue
+            blocks = getattr(st, 'st_blocks', None)
+            files[entry.name] = [blocks * 512 if blocks is not None else st.st_size, st.st_mtime_ns]
+    return files, subdirs
+
+def _drop_subtree(dirs, rel):
+    """Remove a directory and everything below it from the index"""
+    stack = [rel]
+    while stack:
+        current = stack.pop()
+        entry = dirs.pop(current, None)
+        if entry:
+            stack.extend(os.path.join(current, name) for name in entry['subdirs'])
+
+def _rescan(sandbox_path, dirs, rel):
+    """Rescan one directory, adding new subdirectories (scanned too) and dropping vanished ones.
+
+    Returns the number of directories scanned.
+    """
+    scanned = 0
+    stack = [rel]
+    while stack:
+        current = stack.pop()
+        full_path = os.path.normpath(os.path.join(sandbox_path, current))
+        try:
+            st = os.stat(full_path, follow_symlinks=False)
+            files, subdirs = scan_directory(full_path)
+        except (FileNotFoundError, NotADirectoryError):
+            _drop_subtree(dirs, current)
+            continue
+        except PermissionError as e:
+            logging.warning(f"Cannot scan {full_path}: {str(e)}")
+            files, subdirs = {}, []
+        scanned += 1
+
+        old = dirs.get(current)
+        for name in set(old['subdirs']).difference(subdirs) if old else ():
+            _drop_subtree(dirs, os.path.join(current, name))
+        dirs[current] = {
+            'bytes': sum(size for size, _ in files.values()),
+            'changed_ns': max([st.st_mtime_ns] + [mtime_ns for _, mtime_ns in files.values()]),
+            'subdirs': subdirs,
+            'files': files
+        }
+        stack.extend(os.path.join(current, name) for name in subdirs
+                     if os.path.join(current, name) not in dirs)
+    return scanned
+
+def refresh_index(sandbox_path, index, full=False, budget=SCAN_BUDGET):
+    """Bring the size index up to date.
+
+    Directories changed within HOT_WINDOW_NS are rescanned on every check,
+    which catches new files and files growing in place, together with the
+    next budget of quiet directories in rotation. Without an index, or with
+    full, the whole tree is scanned.
+    """
+    dirs = {} if full else index.get('dirs', {})
+    now_ns = time.time_ns()
+
+    if not dirs:
+        scanned = _rescan(sandbox_path, dirs, '.')
+        full = True
+    else:
+        names = sorted(dirs)
+        cursor = index.get('cursor', 0) % len(names)
+        rotation = (names[cursor:] + names[:cursor])[:budget]
+        index['cursor'] = cursor + len(rotation)
+        hot = [rel for rel, entry in dirs.items() if now_ns - entry['changed_ns'] < HOT_WINDOW_NS]
+        scanned = 0
+        for rel in dict.fromkeys(hot + rotation):
+            # An earlier rescan may have dropped it along with a removed parent
+            if rel in dirs:
+                scanned += _rescan(sandbox_path, dirs, rel)
+
+    index['dirs'] = dirs
+    index['total_bytes'] = sum(entry['bytes'] for entry in dirs.values())
+    if full:
+        index['last_full_scan'] = time.time()
+        index['cursor'] = 0
+
+    logging.info(f"Refreshed {sandbox_path}: {scanned} of {len(dirs)} directories rescanned")
+    return index
+
+def chmod_nofollow(path, mode, expected=None):
+    """chmod path itself, never a symlink swapped in for it; returns whether it was changed.
+
+    expected is an earlier lstat of path: nothing is changed unless path
+    still refers to that inode.
+    """
+    # O_PATH opens the entry without needing read access, and with
+    # O_NOFOLLOW a symlink is opened as itself rather than followed
+    flags = os.O_NOFOLLOW | getattr(os, 'O_PATH', os.O_RDONLY) | getattr(os, 'O_CLOEXEC', 0)
+    try:
+        fd = os.open(path, flags)
+    except OSError as e:
+        logging.debug(f"Not changing mode of {path}: {str(e)}")
+        return False
+    try:
+        st = os.fstat(fd)
+        if stat.S_ISLNK(st.st_mode):
+            return False
+        if expected is not None and (st.st_ino, st.st_dev) != (expected.st_ino, expected.st_dev):
+            logging.warning(f"Not changing mode of {path}: replaced since it was checked")
+            return False
+        try:
+            os.fchmod(fd, mode)
+        except OSError:
+            # O_PATH descriptors cannot be fchmod-ed; /proc resolves to the same inode
+            os.chmod(f"/proc/self/fd/{fd}", mode)
+        return True
+    finally:
+        os.close(fd)
+
+def set_sandbox_writable(sandbox_path, writable, saved_modes=None):
+    """Revoke or restore write access to the sandbox's writable directories.
+
+    Revoking clears the write bits of every directory and file under
+    WRITABLE_DIRS, since a read-only directory alone still lets an agent
+    grow the files it has, and returns {relative path: previous mode}.
+    Restoring puts those modes back. Files the agent already holds open
+    stay writable; only a filesystem quota can stop those.
+    """
+    if writable:
+        if saved_modes is None:
+            # Blocked before modes were recorded: only the directories were changed
+            saved_modes = {subdir: 0o700 for subdir in WRITABLE_DIRS}
+        for rel, mode in saved_modes.items():
+            chmod_nofollow(os.path.join(sandbox_path, rel), mode)
+        return {}
+
+    saved = {}
+    for subdir in WRITABLE_DIRS:
+        top = os.path.join(sandbox_path, subdir)
+        if not os.path.isdir(top):
+            continue
+        for dirpath, dirnames, filenames in os.walk(top):
+            for name in [''] + dirnames + filenames:
+                path = os.path.join(dirpath, name) if name else dirpath
+                try:
+                    st = os.lstat(path)
+                except FileNotFoundError:
+                    continue
+                mode = stat.S_IMODE(st.st_mode)
+                if stat.S_ISLNK(st.st_mode) or not mode & 0o222:
+                    continue
+                if chmod_nofollow(path, mode & ~0o222, st):
+                    saved[os.path.relpath(path, sandbox_path)] = mode
+    return saved
+
+def check_sandbox_quota(sandbox_path, limit=None, action='flag', full=False, rescan_after=3600, budget=SCAN_BUDGET):
+    """Check a sandbox's disk usage against its quota"""
+    logging.info(f"Checking disk quota for {sandbox_path}")
+
+    limit = limit or load_disk_limit(sandbox_path) or '10GB'
+    limit_bytes = parse_size(limit)
+
+    index = load_index(sandbox_path)
+    if not full and time.time() - index.get('last_full_scan', 0) > rescan_after:
+        # Files resized in place leave their directory mtime untouched
+        full = True
+    index = refresh_index(sandbox_path, index, full, budget)
+
+    used = index['total_bytes']
+    over_quota = used > limit_bytes
+    previous_state = index.get('state', 'ok')
+
+    if over_quota:
+        if action == 'block':
+            saved = set_sandbox_writable(sandbox_path, False)
+            if previous_state == 'blocked':
+                # Modes recorded by the earlier block win over the read-only ones now found
+                saved.update(index.get('blocked_modes') or {})
+            index['blocked_modes'] = saved
+            index['state'] = 'blocked'
+        elif action == 'flag':
+            index['state'] = 'over_quota'
+        logging.warning(f"Sandbox {sandbox_path} over quota: {used} > {limit_bytes} bytes")
+    elif action != 'report':
+        if previous_state == 'blocked':
+            set_sandbox_writable(sandbox_path, True, index.pop('blocked_modes', None))
+            logging.info(f"Sandbox {sandbox_path} back under quota, write access restored")
+        index['state'] = 'ok'
+
+    index['limit_bytes'] = limit_bytes
+    index['checked_at'] = time.time()
+    save_index(sandbox_path, index)
+
+    return {
+        'path': sandbox_path,
+        'limit': limit,
+        'limit_bytes': limit_bytes,
+        'used_bytes': used,
+        'over_quota': over_quota,
+        'state': index.get('state', 'ok')
+    }
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    exit(main())
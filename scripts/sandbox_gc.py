@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+Initializer Skill Script: sandbox_gc
+
+Description:
+    Garbage-collect sandbox logs/ and temp/ directories.
+    Rotates logs by size and age (copy-and-truncate, so writers holding a
+    log open keep writing to it), gzip-compresses them as a stream into
+    rotated-<log>.<timestamp>.<ns>.gz archives, prunes old archives and
+    purges stale temp/ content. Runs at low CPU
+    priority under an I/O budget so it does not compete with active agents,
+    either as a one-off pass, a background daemon or an in-process thread.
+"""
+
+import argparse
+import logging
+import json
+import gzip
+import os
+import re
+import shutil
+import threading
+import time
+
+from sandbox_disk_quota import parse_size, resolve_sandbox_path, list_sandbox_paths
+
+CHUNK_SIZE = 1024 * 1024
+
+# Archives are rotated-<log>.<YYYYmmddHHMMSS>.<nanoseconds>.gz; nothing else is pruned
+ARCHIVE_PREFIX = 'rotated-'
+ARCHIVE_RE = re.compile(r'^rotated-(.+)\.\d{14}\.\d{9}\.gz$')
+# <log>.<YYYYmmddHHMMSS>: left uncompressed by older versions that rotated by renaming
+ROTATED_RE = re.compile(r'^(.+)\.\d{14}$')
+
+DEFAULT_SETTINGS = {
+    'max_log_bytes': 50 * 1024 * 1024,
+    'max_log_age': 24 * 3600,
+    'keep_archives': 5,
+    'archive_max_age': 30 * 24 * 3600,
+    'temp_max_age': 24 * 3600
+}
+
+def main():
+    """Main script function"""
+    try:
+        parser = argparse.ArgumentParser(description='Rotate sandbox logs and purge stale temp files')
+        parser.add_argument('--name', type=str, help='Sandbox name', default=None)
+        parser.add_argument('--path', type=str, help='Sandbox directory path', default=None)
+        parser.add_argument('--all', action='store_true', help='Collect every known sandbox')
+        parser.add_argument('--max-log-size', type=str, help='Rotate logs larger than this', default='50MB')
+        parser.add_argument('--max-log-age', type=float, help='Rotate logs older than this many hours', default=24)
+        parser.add_argument('--keep', type=int, help='Compressed archives kept per log', default=5)
+        parser.add_argument('--archive-max-age', type=float, help='Delete archives older than this many days', default=30)
+        parser.add_argument('--temp-max-age', type=float, help='Purge temp entries older than this many hours', default=24)
+        parser.add_argument('--io-budget', type=str, help='Maximum GC I/O per second', default='8MB')
+        parser.add_argument('--daemon', action='store_true', help='Keep running in the background')
+        parser.add_argument('--interval', type=int, help='Seconds between passes in daemon mode', default=600)
+
+        args = parser.parse_args()
+
+        settings = {
+            'max_log_bytes': parse_size(args.max_log_size),
+            'max_log_age': args.max_log_age * 3600,
+            'keep_archives': args.keep,
+            'archive_max_age': args.archive_max_age * 24 * 3600,
+            'temp_max_age': args.temp_max_age * 3600
+        }
+        budget = IOBudget(parse_size(args.io_budget))
+
+        if args.path or args.name:
+            get_paths = lambda: [resolve_sandbox_path(args.name, args.path)]
+        elif args.all:
+            get_paths = known_sandbox_paths
+        else:
+            logging.error("One of --name, --path or --all is required")
+            return 1
+
+        lower_priority(whole_process=True)
+
+        if args.daemon:
+            stop_event = threading.Event()
+            run_gc_loop(get_paths, settings, budget, args.interval, stop_event)
+            return 0
+
+        stats = collect_sandboxes(get_paths(), settings, budget)
+        print(json.dumps(stats, indent=2))
+        return 0
+
+    except KeyboardInterrupt:
+        return 0
+    except Exception as e:
+        logging.exception(f"Sandbox GC failed: {str(e)}")
+        return 1
+
+class IOBudget:
+    """Token bucket limiting the bytes per second the collector may read and write"""
+
+    def __init__(self, bytes_per_second):
+        self.rate = max(1, int(bytes_per_second))
+        self.tokens = float(self.rate)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def consume(self, nbytes):
+        """Block until nbytes of I/O fit in the budget"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= nbytes
+            deficit = -self.tokens
+        if deficit > 0:
+            time.sleep(deficit / self.rate)
+
+def lower_priority(whole_process=False):
+    """Drop CPU priority for the current process or, on Linux, the current thread"""
+    try:
+        if whole_process:
+            os.nice(19 - os.nice(0))
+        elif hasattr(os, 'setpriority') and hasattr(threading, 'get_native_id'):
+            # On Linux the "process" argument of setpriority is a thread id
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+    except (OSError, AttributeError) as e:
+        logging.debug(f"Could not lower GC priority: {str(e)}")
+
+def known_sandbox_paths():
+    """List sandboxes from the registry, falling back to the default sandbox root"""
+    paths = set(list_sandbox_paths())
+    try:
+        from sandbox_registry import query_sandboxes
+        paths.update(sandbox['path'] for sandbox in query_sandboxes())
+    except Exception as e:
+        logging.warning(f"Sandbox registry unavailable: {str(e)}")
+    return sorted(paths)
+
+def drop_page_cache(f):
+    """Tell the kernel the GC will not reread this file"""
+    if hasattr(os, 'posix_fadvise'):
+        try:
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+        except OSError:
+            pass
+
+def _stream_into(src, dst, budget):
+    """Copy src to dst in chunks under the I/O budget; returns the bytes copied"""
+    copied = 0
+    while True:
+        chunk = src.read(CHUNK_SIZE)
+        if not chunk:
+            return copied
+        budget.consume(len(chunk))
+        dst.write(chunk)
+        copied += len(chunk)
+
+def archive_path_for(logs_dir, log_name, now_ns=None):
+    """A new archive name for a log; the nanosecond part keeps same-second rotations apart"""
+    now_ns = now_ns if now_ns is not None else time.time_ns()
+    while True:
+        seconds, nanos = divmod(now_ns, 10 ** 9)
+        stamp = time.strftime('%Y%m%d%H%M%S', time.localtime(seconds))
+        path = os.path.join(logs_dir, f"{ARCHIVE_PREFIX}{log_name}.{stamp}.{nanos:09d}.gz")
+        if not os.path.exists(path):
+            return path
+        now_ns += 1
+
+def compress_file(src_path, dst_path, budget):
+    """Stream a file into dst_path under the I/O budget and remove the original"""
+    tmp_path = dst_path + '.tmp'
+    try:
+        with open(src_path, 'rb') as src, open(tmp_path, 'wb') as raw:
+            with gzip.GzipFile(filename=os.path.basename(src_path), mode='wb', fileobj=raw, compresslevel=6) as dst:
+                _stream_into(src, dst, budget)
+            drop_page_cache(src)
+        shutil.copystat(src_path, tmp_path)
+        os.replace(tmp_path, dst_path)
+    except BaseException:
+        _remove_quietly(tmp_path)
+        raise
+    os.remove(src_path)
+    return dst_path
+
+def copy_truncate(log_path, archive_path, budget):
+    """Compress a live log into archive_path, then truncate the log in place.
+
+    Writers keep appending through their open descriptor. Only the bytes
+    present when the copy starts are archived, however long the budgeted
+    copy takes; whatever was appended meanwhile is carried over to the
+    start of the truncated log. Bytes appended in the instant between the
+    last read of that tail and the truncate itself can still be lost, as
+    with any copy-and-truncate rotation, and writers not using O_APPEND
+    continue at their old offset. Returns the bytes archived.
+    """
+    tmp_path = archive_path + '.tmp'
+    try:
+        with open(log_path, 'r+b') as src, open(tmp_path, 'wb') as raw:
+            end = os.fstat(src.fileno()).st_size
+            with gzip.GzipFile(filename=os.path.basename(log_path), mode='wb', fileobj=raw, compresslevel=6) as dst:
+                copied = 0
+                while copied < end:
+                    chunk = src.read(min(CHUNK_SIZE, end - copied))
+                    if not chunk:
+                        break
+                    budget.consume(len(chunk))
+                    dst.write(chunk)
+                    copied += len(chunk)
+            drop_page_cache(src)
+            raw.flush()
+            os.fsync(raw.fileno())
+            shutil.copystat(log_path, tmp_path)
+            os.replace(tmp_path, archive_path)
+
+            # Collect what was appended during the copy, then cut the log
+            # right after the final read to keep the unguarded window short
+            tail = []
+            position = copied
+            while True:
+                chunk = os.pread(src.fileno(), CHUNK_SIZE, position)
+                if not chunk:
+                    break
+                tail.append(chunk)
+                position += len(chunk)
+            os.ftruncate(src.fileno(), 0)
+        if tail:
+            with open(log_path, 'ab') as log:
+                log.write(b''.join(tail))
+        return copied
+    except BaseException:
+        _remove_quietly(tmp_path)
+        raise
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def rotate_logs(sandbox_path, settings, budget):
+    """Rotate, compress and prune logs for one sandbox"""
+    logs_dir = os.path.join(sandbox_path, 'logs')
+    stats = {'rotated': 0, 'pruned': 0, 'bytes_compressed': 0}
+    if not os.path.isdir(logs_dir):
+        return stats
+
+    now = time.time()
+    archives = {}
+    for entry in os.scandir(logs_dir):
+        if not entry.is_file(follow_symlinks=False):
+            continue
+        st = entry.stat(follow_symlinks=False)
+
+        if entry.name.startswith(ARCHIVE_PREFIX):
+            # Only files named like our archives are ours to prune
+            match = ARCHIVE_RE.match(entry.name)
+            if match:
+                archives.setdefault(match.group(1), []).append((st.st_mtime, entry.path))
+            continue
+        if entry.name.endswith(('.tmp', '.gz')):
+            continue
+
+        match = ROTATED_RE.match(entry.name)
+        if match:
+            try:
+                archive_path = compress_file(entry.path, archive_path_for(logs_dir, match.group(1)), budget)
+            except OSError as e:
+                logging.warning(f"Failed to compress {entry.path}: {str(e)}")
+                continue
+            archives.setdefault(match.group(1), []).append((st.st_mtime, archive_path))
+            continue
+
+        too_big = st.st_size >= settings['max_log_bytes']
+        too_old = st.st_size > 0 and now - st.st_mtime >= settings['max_log_age']
+        if not (too_big or too_old):
+            continue
+
+        archive_path = archive_path_for(logs_dir, entry.name)
+        try:
+            archived = copy_truncate(entry.path, archive_path, budget)
+        except OSError as e:
+            logging.warning(f"Failed to rotate {entry.path}: {str(e)}")
+            continue
+        archives.setdefault(entry.name, []).append((now, archive_path))
+        stats['rotated'] += 1
+        stats['bytes_compressed'] += archived
+        logging.info(f"Rotated {entry.path} -> {archive_path}")
+
+    for base, items in archives.items():
+        items.sort(reverse=True)
+        for index, (mtime, path) in enumerate(items):
+            if index >= settings['keep_archives'] or now - mtime >= settings['archive_max_age']:
+                try:
+                    os.remove(path)
+                    stats['pruned'] += 1
+                except FileNotFoundError:
+                    pass
+
+    return stats
+
+def purge_temp(sandbox_path, settings, budget):
+    """Remove temp/ files and empty directories older than the age limit"""
+    temp_dir = os.path.join(sandbox_path, 'temp')
+    stats = {'files_removed': 0, 'dirs_removed': 0, 'bytes_freed': 0}
+    if not os.path.isdir(temp_dir):
+        return stats
+
+    cutoff = time.time() - settings['temp_max_age']
+    for root, dirs, files in os.walk(temp_dir, topdown=False):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                st = os.lstat(path)
+                if st.st_mtime < cutoff:
+                    os.remove(path)
+                    stats['files_removed'] += 1
+                    stats['bytes_freed'] += st.st_size
+                    budget.consume(4096)
+            except OSError:
+                continue
+        if root == temp_dir:
+            continue
+        try:
+            if os.lstat(root).st_mtime < cutoff and not os.listdir(root):
+                os.rmdir(root)
+                stats['dirs_removed'] += 1
+        except OSError:
+            continue
+
+    return stats
+
+def collect_sandbox(sandbox_path, settings=None, budget=None):
+    """Run one GC pass over a sandbox"""
+    settings = {**DEFAULT_SETTINGS, **(settings or {})}
+    budget = budget or IOBudget(8 * 1024 * 1024)
+
+    stats = {
+        'path': sandbox_path,
+        'logs': rotate_logs(sandbox_path, settings, budget),
+        'temp': purge_temp(sandbox_path, settings, budget)
+    }
+    return stats
+
+def collect_sandboxes(paths, settings=None, budget=None, stop_event=None):
+    """Run one GC pass over several sandboxes"""
+    results = []
+    for path in paths:
+        if stop_event is not None and stop_event.is_set():
+            break
+        try:
+            results.append(collect_sandbox(path, settings, budget))
+        except Exception as e:
+            logging.warning(f"GC failed for {path}: {str(e)}")
+    return results
+
+def run_gc_loop(get_paths, settings, budget, interval, stop_event):
+    """Run GC passes every interval seconds until stop_event is set"""
+    while not stop_event.is_set():
+        started = time.monotonic()
+        results = collect_sandboxes(get_paths(), settings, budget, stop_event)
+        rotated = sum(r['logs']['rotated'] for r in results)
+        purged = sum(r['temp']['files_removed'] for r in results)
+        logging.info(f"GC pass over {len(results)} sandboxes: {rotated} logs rotated, {purged} temp files purged")
+        stop_event.wait(max(0, interval - (time.monotonic() - started)))
+
+def start_gc_thread(get_paths=known_sandbox_paths, settings=None, io_budget='8MB', interval=600):
+    """Start a low-priority daemon thread running GC passes; returns its stop event"""
+    settings = {**DEFAULT_SETTINGS, **(settings or {})}
+    budget = IOBudget(parse_size(io_budget))
+    stop_event = threading.Event()
+
+    def worker():
+        lower_priority()
+        run_gc_loop(get_paths, settings, budget, interval, stop_event)
+
+    thread = threading.Thread(target=worker, name='sandbox-gc', daemon=True)
+    thread.start()
+    return stop_event
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    exit(main())
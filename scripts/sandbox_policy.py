@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Initializer Skill Script: sandbox_policy
+
+Description:
+    Enforce sandbox capability restrictions at runtime.
+    Compiles a sandbox's restrictions (sandbox_path_only,
+    block_internal_networks) into a path-prefix trie and a sorted CIDR
+    interval index, so each file or network decision costs O(path depth)
+    or O(log n) and repeated decisions come from an LRU cache. Agent
+    runtimes import get_sandbox_policy() and call check_path/check_address.
+    The sandbox's own config/ and scripts/ are always denied, so an agent
+    cannot rewrite the policy that confines it.
+"""
+
+import argparse
+import logging
+import json
+import os
+import bisect
+import functools
+import ipaddress
+import socket
+
+# Networks blocked by block_internal_networks
+INTERNAL_NETWORKS = [
+    '0.0.0.0/8',
+    '10.0.0.0/8',
+    '100.64.0.0/10',
+    '127.0.0.0/8',
+    '169.254.0.0/16',
+    '172.16.0.0/12',
+    '192.0.0.0/24',
+    '192.168.0.0/16',
+    '198.18.0.0/15',
+    '224.0.0.0/4',
+    '240.0.0.0/4',
+    '::/128',
+    '::1/128',
+    # NAT64 and 6to4 embed an IPv4 address, which may be an internal one
+    '64:ff9b::/96',
+    '2002::/16',
+    'fc00::/7',
+    'fe80::/10',
+    'ff00::/8'
+]
+
+# Sandbox directories holding its configuration and management scripts
+PROTECTED_DIRS = ['config', 'scripts']
+
+DEFAULT_CACHE_SIZE = 4096
+
+def main():
+    """Main script function"""
+    try:
+        parser = argparse.ArgumentParser(description='Check file and network access against a sandbox policy')
+        parser.add_argument('--name', type=str, help='Sandbox name', default=None)
+        parser.add_argument('--path', type=str, help='Sandbox directory path', default=None)
+        parser.add_argument('--file', type=str, action='append', help='File path to check (repeatable)', default=[])
+        parser.add_argument('--address', type=str, action='append', help='Host or IP address to check (repeatable)', default=[])
+
+        args = parser.parse_args()
+
+        if not (args.name or args.path):
+            logging.error("One of --name or --path is required")
+            return 1
+
+        from sandbox_disk_quota import resolve_sandbox_path
+        policy = get_sandbox_policy(resolve_sandbox_path(args.name, args.path))
+
+        decisions = {
+            'files': {path: policy.check_path(path) for path in args.file},
+            'addresses': {address: policy.check_host(address) for address in args.address}
+        }
+        print(json.dumps(decisions, indent=2))
+
+        allowed = all(decisions['files'].values()) and all(decisions['addresses'].values())
+        return 0 if allowed else 2
+
+    except Exception as e:
+        logging.exception(f"Policy check failed: {str(e)}")
+        return 1
+
+class PathTrie:
+    """Prefix trie over path components; the deepest marked ancestor decides"""
+
+    def __init__(self, default=False):
+        self.root = {}
+        self.default = default
+
+    @staticmethod
+    def _components(path):
+        drive, rest = os.path.splitdrive(os.path.normpath(path))
+        return [drive] + [part for part in rest.split(os.sep) if part]
+
+    def add(self, path, allowed=True):
+        """Mark a path (and everything below it) as allowed or denied"""
+        node = self.root
+        for part in self._components(path):
+            node = node.setdefault(part, {})
+        node[None] = allowed
+
+    def lookup(self, path):
+        """Return the verdict of the deepest marked prefix of path"""
+        verdict = self.root.get(None, self.default)
+        node = self.root
+        for part in self._components(path):
+            node = node.get(part)
+            if node is None:
+                break
+            verdict = node.get(None, verdict)
+        return verdict
+
+class IntervalIndex:
+    """Sorted, merged address intervals per IP version, searched with bisect"""
+
+    def __init__(self, networks=()):
+        intervals = {4: [], 6: []}
+        for network in networks:
+            net = ipaddress.ip_network(network, strict=False)
+            intervals[net.version].append((int(net.network_address), int(net.broadcast_address)))
+
+        self.starts = {}
+        self.ends = {}
+        for version, items in intervals.items():
+            merged = []
+            for start, end in sorted(items):
+                if merged and start <= merged[-1][1] + 1:
+                    merged[-1][1] = max(merged[-1][1], end)
+                else:
+                    merged.append([start, end])
+            self.starts[version] = [start for start, _ in merged]
+            self.ends[version] = [end for _, end in merged]
+
+    def contains(self, address):
+        """Check whether an address falls inside any interval"""
+        ip = ipaddress.ip_address(address)
+        if ip.version == 6 and ip.ipv4_mapped:
+            ip = ip.ipv4_mapped
+        value = int(ip)
+        i = bisect.bisect_right(self.starts[ip.version], value) - 1
+        return i >= 0 and value <= self.ends[ip.version][i]
+
+class SandboxPolicy:
+    """Compiled file and network policy for one sandbox"""
+
+    def __init__(self, sandbox_path, capabilities, cache_size=DEFAULT_CACHE_SIZE):
+        self.sandbox_path = os.path.realpath(sandbox_path)
+        file_cap = capabilities.get('file', {})
+        web_cap = capabilities.get('web', {})
+
+        self.file_enabled = file_cap.get('enabled', False)
+        self.web_enabled = web_cap.get('enabled', False)
+
+        # Without sandbox_path_only the sandbox may touch any path
+        self.paths = PathTrie(default='sandbox_path_only' not in file_cap.get('restrictions', []))
+        self.paths.add(self.sandbox_path, True)
+        for path in file_cap.get('allowed_paths', []):
+            self.paths.add(os.path.realpath(path), True)
+        for subdir in PROTECTED_DIRS:
+            self.paths.add(os.path.join(self.sandbox_path, subdir), False)
+        for path in file_cap.get('denied_paths', []):
+            self.paths.add(os.path.realpath(path), False)
+
+        blocked = list(web_cap.get('blocked_networks', []))
+        if 'block_internal_networks' in web_cap.get('restrictions', []):
+            blocked.extend(INTERNAL_NETWORKS)
+        self.networks = IntervalIndex(blocked)
+
+        self._check_resolved_path = functools.lru_cache(maxsize=cache_size)(self._decide_path)
+        self._check_ip = functools.lru_cache(maxsize=cache_size)(self._decide_address)
+
+    @classmethod
+    def from_sandbox(cls, sandbox_path, cache_size=DEFAULT_CACHE_SIZE):
+        """Build a policy from a sandbox's config/capabilities.json"""
+        capabilities_path = os.path.join(sandbox_path, 'config', 'capabilities.json')
+        try:
+            with open(capabilities_path, 'r') as f:
+                capabilities = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logging.warning(f"No capability configuration at {capabilities_path}, denying all access: {str(e)}")
+            capabilities = {}
+        return cls(sandbox_path, capabilities, cache_size)
+
+    def _decide_path(self, resolved_path):
+        return self.file_enabled and self.paths.lookup(resolved_path)
+
+    def _decide_address(self, address):
+        try:
+            return self.web_enabled and not self.networks.contains(address)
+        except ValueError:
+            return False
+
+    def check_path(self, path, resolve=True):
+        """Check whether the sandbox may access a file path.
+
+        Paths are resolved with realpath by default so symlinks cannot lead
+        out of the sandbox. Resolution is redone on every call, since a link
+        may be retargeted at any time, so only the decision for the resolved
+        path is cached; pass resolve=False for paths already resolved to skip
+        the realpath syscalls.
+        """
+        path = os.path.realpath(path) if resolve else os.path.normpath(os.path.abspath(path))
+        return self._check_resolved_path(path)
+
+    def check_address(self, address):
+        """Check whether the sandbox may connect to an IP address"""
+        return self._check_ip(address)
+
+    def check_host(self, host):
+        """Check a host name or address; every resolved address must be allowed"""
+        try:
+            ipaddress.ip_address(host)
+            return self.check_address(host)
+        except ValueError:
+            pass
+        if not self.web_enabled:
+            return False
+        try:
+            infos = socket.getaddrinfo(host, None)
+        except socket.gaierror:
+            return False
+        return all(self.check_address(info[4][0]) for info in infos)
+
+    def cache_info(self):
+        """Decision cache statistics"""
+        return {'paths': self._check_resolved_path.cache_info()._asdict(), 'addresses': self._check_ip.cache_info()._asdict()}
+
+_policies = {}
+
+def get_sandbox_policy(sandbox_path):
+    """Get the compiled policy for a sandbox, recompiling when its configuration changes"""
+    sandbox_path = os.path.abspath(sandbox_path)
+    try:
+        mtime = os.stat(os.path.join(sandbox_path, 'config', 'capabilities.json')).st_mtime_ns
+    except OSError:
+        mtime = None
+
+    cached = _policies.get(sandbox_path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    policy = SandboxPolicy.from_sandbox(sandbox_path)
+    _policies[sandbox_path] = (mtime, policy)
+    return policy
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    exit(main())
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Initializer Skill Script: sandbox_registry
+
+Description:
+    Maintain an indexed inventory of sandboxed agents.
+    Sandboxes are recorded in a single SQLite database that is updated
+    transactionally whenever create_sandboxed_agent creates or changes one,
+    so listing and lookups never need to crawl the sandbox directories.
+"""
+
+import argparse
+import logging
+import json
+import os
+import sqlite3
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sandboxes (
+    name TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    isolation_level TEXT,
+    isolated INTEGER NOT NULL DEFAULT 1,
+    status TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    config TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sandbox_capabilities (
+    capability TEXT NOT NULL,
+    name TEXT NOT NULL REFERENCES sandboxes(name) ON DELETE CASCADE,
+    PRIMARY KEY (capability, name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_sandboxes_status ON sandboxes(status);
+CREATE INDEX IF NOT EXISTS idx_sandboxes_isolation ON sandboxes(isolation_level);
+CREATE INDEX IF NOT EXISTS idx_capabilities_name ON sandbox_capabilities(name);
+"""
+
+def main():
+    """Main script function"""
+    try:
+        parser = argparse.ArgumentParser(description='Query the sandbox registry')
+        parser.add_argument('--registry', type=str, help='Registry database path', default=None)
+        subparsers = parser.add_subparsers(dest='command', required=True)
+
+        list_parser = subparsers.add_parser('list', help='List registered sandboxes')
+        list_parser.add_argument('--capability', type=str, help='Only sandboxes with this capability', default=None)
+        list_parser.add_argument('--isolation', type=str, help='Only sandboxes at this isolation level', default=None)
+        list_parser.add_argument('--status', type=str, help='Only sandboxes with this status', default=None)
+        list_parser.add_argument('--json', action='store_true', help='Output full records as JSON')
+
+        show_parser = subparsers.add_parser('show', help='Show one sandbox')
+        show_parser.add_argument('name', type=str, help='Sandbox name')
+
+        status_parser = subparsers.add_parser('status', help='Set sandbox status')
+        status_parser.add_argument('name', type=str, help='Sandbox name')
+        status_parser.add_argument('status', type=str, help='New status')
+
+        remove_parser = subparsers.add_parser('remove', help='Remove a sandbox from the registry')
+        remove_parser.add_argument('name', type=str, help='Sandbox name')
+
+        rebuild_parser = subparsers.add_parser('rebuild', help='Rebuild the registry from sandbox directories')
+        rebuild_parser.add_argument('--root', type=str, help='Sandbox root directory', default=None)
+
+        args = parser.parse_args()
+
+        if args.command == 'list':
+            sandboxes = query_sandboxes(args.capability, args.isolation, args.status, args.registry)
+            if args.json:
+                print(json.dumps(sandboxes, indent=2))
+            else:
+                for sandbox in sandboxes:
+                    print(f"{sandbox['name']}\t{sandbox['status']}\t{sandbox['isolation_level']}\t{sandbox['path']}")
+        elif args.command == 'show':
+            sandbox = get_sandbox(args.name, args.registry)
+            if not sandbox:
+                logging.error(f"Sandbox not registered: {args.name}")
+                return 1
+            print(json.dumps(sandbox, indent=2))
+        elif args.command == 'status':
+            if not set_sandbox_status(args.name, args.status, args.registry):
+                logging.error(f"Sandbox not registered: {args.name}")
+                return 1
+        elif args.command == 'remove':
+            if not unregister_sandbox(args.name, args.registry):
+                logging.error(f"Sandbox not registered: {args.name}")
+                return 1
+        elif args.command == 'rebuild':
+            count = rebuild_registry(args.root, args.registry)
+            logging.info(f"Registered {count} sandboxes")
+
+        return 0
+
+    except Exception as e:
+        logging.exception(f"Sandbox registry operation failed: {str(e)}")
+        return 1
+
+def default_registry_path():
+    """Default registry location next to the sandboxes it indexes"""
+    return os.path.join(os.path.expanduser('~/.openclaw'), 'sandboxes', 'registry.db')
+
+def open_registry(registry_path=None):
+    """Open (and create if needed) the registry database"""
+    registry_path = registry_path or default_registry_path()
+    os.makedirs(os.path.dirname(registry_path), exist_ok=True)
+
+    conn = sqlite3.connect(registry_path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute('PRAGMA foreign_keys=ON')
+    conn.executescript(SCHEMA)
+    return conn
+
+def register_sandbox(config, registry_path=None):
+    """Insert or update a sandbox record from a create_sandboxed_agent configuration"""
+    conn = open_registry(registry_path)
+    try:
+        _upsert_sandbox(conn, config, time.time())
+    finally:
+        conn.close()
+
+    logging.info(f"Registered sandbox: {config['name']}")
+
+def _upsert_sandbox(conn, config, now):
+    """Write one sandbox record and its capabilities inside a single transaction"""
+    name = config['name']
+    agent = config.get('agent', {})
+    capabilities = agent.get('capabilities') or config.get('capabilities', {}).get('allowed', [])
+    isolation_level = agent.get('sandbox', {}).get('isolation_level')
+
+    with conn:
+        conn.execute(
+            """
+            INSERT INTO sandboxes (name, path, isolation_level, isolated, status, created_at, updated_at, config)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(name) DO UPDATE SET
+                path = excluded.path,
+                isolation_level = excluded.isolation_level,
+                isolated = excluded.isolated,
+                status = excluded.status,
+                updated_at = excluded.updated_at,
+                config = excluded.config
+            """,
+            (
+                name,
+                config['path'],
+                isolation_level,
+                1 if config.get('isolation', True) else 0,
+                config.get('status', 'created'),
+                now,
+                now,
+                json.dumps(config)
+            )
+        )
+        conn.execute('DELETE FROM sandbox_capabilities WHERE name = ?', (name,))
+        conn.executemany(
+            'INSERT OR IGNORE INTO sandbox_capabilities (capability, name) VALUES (?, ?)',
+            [(cap, name) for cap in capabilities]
+        )
+
+def unregister_sandbox(name, registry_path=None):
+    """Remove a sandbox record"""
+    conn = open_registry(registry_path)
+    try:
+        with conn:
+            cursor = conn.execute('DELETE FROM sandboxes WHERE name = ?', (name,))
+        return cursor.rowcount > 0
+    finally:
+        conn.close()
+
+def set_sandbox_status(name, status, registry_path=None):
+    """Update the status of a registered sandbox"""
+    conn = open_registry(registry_path)
+    try:
+        with conn:
+            cursor = conn.execute(
+                'UPDATE sandboxes SET status = ?, updated_at = ? WHERE name = ?',
+                (status, time.time(), name)
+            )
+        return cursor.rowcount > 0
+    finally:
+        conn.close()
+
+def _row_to_dict(row, include_config=True):
+    """Convert a registry row into a plain dict"""
+    record = {
+        'name': row['name'],
+        'path': row['path'],
+        'isolation_level': row['isolation_level'],
+        'isolated': bool(row['isolated']),
+        'status': row['status'],
+        'created_at': row['created_at'],
+        'updated_at': row['updated_at']
+    }
+    if include_config:
+        record['config'] = json.loads(row['config'])
+    return record
+
+def get_sandbox(name, registry_path=None):
+    """Look up a sandbox by name"""
+    conn = open_registry(registry_path)
+    try:
+        row = conn.execute('SELECT * FROM sandboxes WHERE name = ?', (name,)).fetchone()
+        return _row_to_dict(row) if row else None
+    finally:
+        conn.close()
+
+def query_sandboxes(capability=None, isolation_level=None, status=None, registry_path=None):
+    """List sandboxes, optionally filtered by capability, isolation level or status"""
+    query = 'SELECT s.name, s.path, s.isolation_level, s.isolated, s.status, s.created_at, s.updated_at FROM sandboxes s'
+    clauses = []
+    params = []
+
+    if capability:
+        query += ' JOIN sandbox_capabilities c ON c.name = s.name AND c.capability = ?'
+        params.append(capability.lower())
+    if isolation_level:
+        clauses.append('s.isolation_level = ?')
+        params.append(isolation_level)
+    if status:
+        clauses.append('s.status = ?')
+        params.append(status)
+    if clauses:
+        query += ' WHERE ' + ' AND '.join(clauses)
+    query += ' ORDER BY s.name'
+
+    conn = open_registry(registry_path)
+    try:
+        return [_row_to_dict(row, include_config=False) for row in conn.execute(query, params)]
+    finally:
+        conn.close()
+
+def rebuild_registry(root=None, registry_path=None):
+    """Rebuild the registry by crawling sandbox agent configurations once.
+
+    Sandboxes found under root are (re)registered, and records whose
+    directory no longer holds a sandbox are removed, wherever it was.
+    """
+    root = root or os.path.join(os.path.expanduser('~/.openclaw'), 'sandboxes')
+    logging.info(f"Rebuilding sandbox registry from {root}")
+
+    conn = open_registry(registry_path)
+    count = 0
+    try:
+        now = time.time()
+        if os.path.isdir(root):
+            entries = list(os.scandir(root))
+        else:
+            # No sandboxes have been created there yet
+            logging.info(f"Sandbox root {root} does not exist; nothing to index")
+            entries = []
+        for entry in entries:
+            config_path = os.path.join(entry.path, 'config', 'agent.json')
+            if not entry.is_dir() or not os.path.exists(config_path):
+                continue
+            try:
+                with open(config_path, 'r') as f:
+                    agent_config = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                logging.warning(f"Skipping {config_path}: {str(e)}")
+                continue
+
+            name = agent_config.get('name', entry.name)
+            existing = conn.execute('SELECT status FROM sandboxes WHERE name = ?', (name,)).fetchone()
+            _upsert_sandbox(conn, {
+                'name': name,
+                'path': entry.path,
+                'agent': agent_config,
+                'status': existing['status'] if existing else 'created'
+            }, now)
+            count += 1
+
+        # Sandboxes deleted from disk (or never fully created) leave rows behind
+        stale = [
+            (row['name'],) for row in conn.execute('SELECT name, path FROM sandboxes')
+            if not os.path.exists(os.path.join(row['path'], 'config', 'agent.json'))
+        ]
+        with conn:
+            conn.executemany('DELETE FROM sandboxes WHERE name = ?', stale)
+        if stale:
+            logging.info(f"Removed {len(stale)} sandboxes no longer on disk")
+    finally:
+        conn.close()
+
+    return count
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    exit(main())
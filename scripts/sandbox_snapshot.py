@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""
+Initializer Skill Script: sandbox_snapshot
+
+Description:
+    Checkpoint a sandbox and roll it back cheaply.
+    File contents are split into fixed-size chunks kept in a
+    content-addressed store shared by all sandboxes, so identical data is
+    stored once. A snapshot is a manifest of the sandbox tree; files whose
+    size and mtime match the previous snapshot reuse its chunk list
+    without being read, and only changed files are hashed. Restore
+    compares the tree with the manifest the same way and rewrites,
+    creates or deletes only the files that differ.
+"""
+
+import argparse
+import logging
+import hashlib
+import json
+import os
+import shutil
+import stat
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+SNAPSHOT_ROOT = os.path.join(os.path.expanduser('~/.openclaw'), 'snapshots')
+MANIFEST_VERSION = 1
+
+CHUNK_SIZE = 4 * 1024 * 1024
+
+# Sandbox directories left out of snapshots by default
+DEFAULT_EXCLUDES = ['temp']
+
+# A file modified within this window of the previous snapshot may have
+# changed without its mtime changing, so it is hashed again
+MTIME_GRACE_NS = 2 * 1000 * 1000 * 1000
+
+def main():
+    """Main script function"""
+    try:
+        parser = argparse.ArgumentParser(description='Snapshot and restore sandboxes')
+        parser.add_argument('--name', type=str, help='Sandbox name', default=None)
+        parser.add_argument('--path', type=str, help='Sandbox directory path', default=None)
+        parser.add_argument('--store', type=str, help='Snapshot store directory', default=SNAPSHOT_ROOT)
+        subparsers = parser.add_subparsers(dest='command', required=True)
+
+        create_parser = subparsers.add_parser('create', help='Snapshot the sandbox')
+        create_parser.add_argument('--label', type=str, help='Label stored with the snapshot', default=None)
+        create_parser.add_argument('--exclude', type=str, help='Top-level directories to leave out (comma-separated)', default=','.join(DEFAULT_EXCLUDES))
+        create_parser.add_argument('--full', action='store_true', help='Hash every file instead of trusting size and mtime')
+
+        restore_parser = subparsers.add_parser('restore', help='Roll the sandbox back to a snapshot')
+        restore_parser.add_argument('snapshot', type=str, nargs='?', help='Snapshot id (default: latest)', default=None)
+        restore_parser.add_argument('--dry-run', action='store_true', help='Report the changes without making them')
+
+        subparsers.add_parser('list', help='List the sandbox\'s snapshots')
+
+        delete_parser = subparsers.add_parser('delete', help='Delete a snapshot')
+        delete_parser.add_argument('snapshot', type=str, help='Snapshot id')
+
+        subparsers.add_parser('gc', help='Remove chunks no snapshot references')
+
+        args = parser.parse_args()
+
+        store = SnapshotStore(args.store)
+
+        if args.command == 'gc':
+            print(json.dumps(store.collect_garbage(), indent=2))
+            return 0
+
+        if not (args.name or args.path):
+            logging.error("One of --name or --path is required")
+            return 1
+
+        from sandbox_disk_quota import resolve_sandbox_path
+        sandbox_path = resolve_sandbox_path(args.name, args.path)
+
+        if args.command == 'create':
+            excludes = [d.strip() for d in args.exclude.split(',') if d.strip()]
+            result = create_snapshot(store, sandbox_path, args.label, excludes, args.full)
+            print(json.dumps(result, indent=2))
+        elif args.command == 'restore':
+            result = restore_snapshot(store, sandbox_path, args.snapshot, args.dry_run)
+            print(json.dumps(result, indent=2))
+        elif args.command == 'list':
+            for manifest in store.list_manifests(sandbox_path):
+                print(f"{manifest['id']}\t{manifest['created_at']}\t{len(manifest['files'])} files\t{manifest.get('label') or ''}")
+        elif args.command == 'delete':
+            if not store.delete_manifest(sandbox_path, args.snapshot):
+                logging.error(f"Snapshot not found: {args.snapshot}")
+                return 1
+
+        return 0
+
+    except Exception as e:
+        logging.exception(f"Snapshot operation failed: {str(e)}")
+        return 1
+
+class SnapshotStore:
+    """Shared chunk store plus per-sandbox snapshot manifests"""
+
+    def __init__(self, root=SNAPSHOT_ROOT):
+        self.root = root
+        self.chunk_dir = os.path.join(root, 'chunks')
+        os.makedirs(self.chunk_dir, exist_ok=True)
+
+    @contextmanager
+    def locked(self, exclusive=False):
+        """Snapshots share the store; garbage collection needs it alone"""
+        with open(os.path.join(self.root, 'LOCK'), 'a') as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield
+
+    def chunk_path(self, digest):
+        return os.path.join(self.chunk_dir, digest[:2], digest[2:])
+
+    def put_chunk(self, digest, data):
+        """Store a chunk unless present; returns whether it was new"""
+        path = self.chunk_path(digest)
+        if os.path.exists(path):
+            return False
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        return True
+
+    def read_chunk(self, digest):
+        with open(self.chunk_path(digest), 'rb') as f:
+            return f.read()
+
+    def sandbox_dir(self, sandbox_path):
+        """Manifest directory for a sandbox, unique per sandbox path"""
+        tag = hashlib.blake2b(sandbox_path.encode('utf-8'), digest_size=4).hexdigest()
+        return os.path.join(self.root, 'sandboxes', f"{os.path.basename(sandbox_path)}-{tag}")
+
+    def list_manifests(self, sandbox_path):
+        """A sandbox's manifests, oldest first"""
+        directory = self.sandbox_dir(sandbox_path)
+        if not os.path.isdir(directory):
+            return []
+        manifests = []
+        for name in os.listdir(directory):
+            if name.endswith('.json'):
+                with open(os.path.join(directory, name), 'r') as f:
+                    manifests.append(json.load(f))
+        return sorted(manifests, key=lambda m: m['started_ns'])
+
+    def load_manifest(self, sandbox_path, snapshot_id=None):
+        """Load one manifest, or the latest when snapshot_id is None"""
+        if snapshot_id is None:
+            manifests = self.list_manifests(sandbox_path)
+            return manifests[-1] if manifests else None
+        path = os.path.join(self.sandbox_dir(sandbox_path), f"{snapshot_id}.json")
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    def save_manifest(self, sandbox_path, manifest):
+        directory = self.sandbox_dir(sandbox_path)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{manifest['id']}.json")
+        with open(path + '.tmp', 'w') as f:
+            json.dump(manifest, f)
+        os.replace(path + '.tmp', path)
+
+    def delete_manifest(self, sandbox_path, snapshot_id):
+        path = os.path.join(self.sandbox_dir(sandbox_path), f"{snapshot_id}.json")
+        if not os.path.exists(path):
+            return False
+        os.remove(path)
+        return True
+
+    def collect_garbage(self):
+        """Delete chunks not referenced by any sandbox's manifests"""
+        with self.locked(exclusive=True):
+            referenced = set()
+            sandboxes_dir = os.path.join(self.root, 'sandboxes')
+            for dirpath, _, filenames in os.walk(sandboxes_dir):
+                for name in filenames:
+                    if name.endswith('.json'):
+                        with open(os.path.join(dirpath, name), 'r') as f:
+                            for entry in json.load(f)['files'].values():
+                                referenced.update(entry['chunks'])
+
+            removed = 0
+            freed = 0
+            for dirpath, _, filenames in os.walk(self.chunk_dir):
+                for name in filenames:
+                    digest = os.path.basename(dirpath) + name
+                    if digest not in referenced:
+                        path = os.path.join(dirpath, name)
+                        freed += os.path.getsize(path)
+                        os.remove(path)
+                        removed += 1
+        logging.info(f"Removed {removed} unreferenced chunks ({freed} bytes)")
+        return {'chunks_removed': removed, 'bytes_freed': freed, 'chunks_referenced': len(referenced)}
+
+def walk_sandbox(sandbox_path, excludes=()):
+    """Yield (relative path, DirEntry) for every entry, skipping excluded top-level directories"""
+    stack = ['']
+    while stack:
+        relative = stack.pop()
+        with os.scandir(os.path.join(sandbox_path, relative)) as entries:
+            for entry in entries:
+                rel_path = os.path.join(relative, entry.name) if relative else entry.name
+                if not relative and entry.name in excludes:
+                    continue
+                yield rel_path, entry
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(rel_path)
+
+def hash_file(path, store=None):
+    """Chunk digests of a file, storing new chunks when a store is given: (digests, new chunks, new bytes)"""
+    digests = []
+    new_chunks = 0
+    new_bytes = 0
+    with open(path, 'rb') as f:
+        while True:
+            data = f.read(CHUNK_SIZE)
+            if not data:
+                break
+            digest = hashlib.blake2b(data, digest_size=20).hexdigest()
+            digests.append(digest)
+            if store is not None and store.put_chunk(digest, data):
+                new_chunks += 1
+                new_bytes += len(data)
+    return digests, new_chunks, new_bytes
+
+def unchanged(entry_stat, previous, cutoff_ns):
+    """Size and mtime match a manifest entry recorded safely before its snapshot"""
+    return (previous is not None
+            and previous['size'] == entry_stat.st_size
+            and previous['mtime_ns'] == entry_stat.st_mtime_ns
+            and entry_stat.st_mtime_ns < cutoff_ns)
+
+def create_snapshot(store, sandbox_path, label=None, excludes=DEFAULT_EXCLUDES, full=False):
+    """Snapshot a sandbox, hashing only files changed since its previous snapshot"""
+    if not os.path.isdir(sandbox_path):
+        raise FileNotFoundError(f"Sandbox not found: {sandbox_path}")
+
+    started_ns = time.time_ns()
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'id': time.strftime('%Y%m%dT%H%M%S', time.gmtime(started_ns / 1e9)) + '-' + os.urandom(2).hex(),
+        'sandbox': sandbox_path,
+        'label': label,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(started_ns / 1e9)),
+        'started_ns': started_ns,
+        'excludes': list(excludes),
+        'parent': None,
+        'dirs': {},
+        'symlinks': {},
+        'files': {}
+    }
+    stats = {'files': 0, 'hashed': 0, 'reused': 0, 'new_chunks': 0, 'new_bytes': 0}
+
+    with store.locked():
+        previous = None if full else store.load_manifest(sandbox_path)
+        previous_files = previous['files'] if previous else {}
+        cutoff_ns = previous['started_ns'] - MTIME_GRACE_NS if previous else 0
+        if previous:
+            manifest['parent'] = previous['id']
+
+        for rel_path, entry in walk_sandbox(sandbox_path, excludes):
+            st = entry.stat(follow_symlinks=False)
+            if stat.S_ISLNK(st.st_mode):
+                manifest['symlinks'][rel_path] = os.readlink(entry.path)
+            elif stat.S_ISDIR(st.st_mode):
+                manifest['dirs'][rel_path] = stat.S_IMODE(st.st_mode)
+            elif stat.S_ISREG(st.st_mode):
+                stats['files'] += 1
+                prev = previous_files.get(rel_path)
+                if unchanged(st, prev, cutoff_ns):
+                    chunks = prev['chunks']
+                    stats['reused'] += 1
+                else:
+                    chunks, new_chunks, new_bytes = hash_file(entry.path, store)
+                    stats['hashed'] += 1
+                    stats['new_chunks'] += new_chunks
+                    stats['new_bytes'] += new_bytes
+                manifest['files'][rel_path] = {
+                    'size': st.st_size,
+                    'mtime_ns': st.st_mtime_ns,
+                    'mode': stat.S_IMODE(st.st_mode),
+                    'chunks': chunks
+                }
+
+        store.save_manifest(sandbox_path, manifest)
+
+    logging.info(f"Snapshot {manifest['id']}: {stats['hashed']} files hashed, {stats['reused']} reused, "
+                 f"{stats['new_bytes']} new bytes")
+    return {'snapshot': manifest['id'], 'parent': manifest['parent'], **stats}
+
+def restore_file(store, path, entry):
+    """Rewrite one file from its chunks, atomically"""
+    tmp_path = f"{path}.restore-{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        for digest in entry['chunks']:
+            f.write(store.read_chunk(digest))
+    os.chmod(tmp_path, entry['mode'])
+    os.utime(tmp_path, ns=(entry['mtime_ns'], entry['mtime_ns']))
+    os.replace(tmp_path, path)
+
+def is_dir_entry(entry):
+    return entry.is_dir(follow_symlinks=False)
+
+def _remove(path, is_dir):
+    if is_dir:
+        shutil.rmtree(path)
+    else:
+        os.remove(path)
+
+def restore_snapshot(store, sandbox_path, snapshot_id=None, dry_run=False):
+    """Roll a sandbox back to a snapshot, touching only entries that differ"""
+    manifest = store.load_manifest(sandbox_path, snapshot_id)
+    if manifest is None:
+        raise FileNotFoundError(f"No snapshot {snapshot_id or '(latest)'} for {sandbox_path}")
+
+    files = manifest['files']
+    dirs = manifest['dirs']
+    symlinks = manifest['symlinks']
+    changes = {'written': [], 'deleted': [], 'created_dirs': [], 'metadata': []}
+    seen = set()
+    deleted_dirs = set()
+    # Directory modes are applied after everything else (rel path -> mode)
+    dir_modes = {}
+
+    with store.locked():
+        # Remove or note whatever the snapshot does not have in that form
+        for rel_path, entry in list(walk_sandbox(sandbox_path, manifest['excludes'])):
+            if os.path.dirname(rel_path) in deleted_dirs:
+                if is_dir_entry(entry):
+                    deleted_dirs.add(rel_path)
+                continue
+            st = entry.stat(follow_symlinks=False)
+            is_dir = stat.S_ISDIR(st.st_mode)
+            expected_dir = rel_path in dirs
+            if stat.S_ISLNK(st.st_mode):
+                if symlinks.get(rel_path) == os.readlink(entry.path):
+                    seen.add(rel_path)
+                    continue
+            elif is_dir and expected_dir:
+                seen.add(rel_path)
+                mode = stat.S_IMODE(st.st_mode)
+                if mode != dirs[rel_path]:
+                    changes['metadata'].append(rel_path)
+                    dir_modes[rel_path] = dirs[rel_path]
+                if mode & stat.S_IRWXU != stat.S_IRWXU and not dry_run:
+                    # Its entries may be rewritten or removed below
+                    os.chmod(entry.path, mode | stat.S_IRWXU)
+                    dir_modes[rel_path] = dirs[rel_path]
+                continue
+            elif stat.S_ISREG(st.st_mode) and rel_path in files:
+                seen.add(rel_path)
+                target = files[rel_path]
+                if st.st_size == target['size'] and st.st_mtime_ns == target['mtime_ns']:
+                    if stat.S_IMODE(st.st_mode) != target['mode']:
+                        changes['metadata'].append(rel_path)
+                        if not dry_run:
+                            os.chmod(entry.path, target['mode'])
+                    continue
+                if st.st_size == target['size'] and hash_file(entry.path)[0] == target['chunks']:
+                    # Same content, only the metadata moved
+                    changes['metadata'].append(rel_path)
+                    if not dry_run:
+                        os.chmod(entry.path, target['mode'])
+                        os.utime(entry.path, ns=(target['mtime_ns'], target['mtime_ns']))
+                    continue
+                changes['written'].append(rel_path)
+                if not dry_run:
+                    restore_file(store, entry.path, target)
+                continue
+
+            # Not in the snapshot, or present with a different type
+            changes['deleted'].append(rel_path)
+            if is_dir:
+                deleted_dirs.add(rel_path)
+            if not dry_run:
+                _remove(entry.path, is_dir)
+
+        # Recreate whatever is missing, parents first
+        for rel_path in sorted(dirs):
+            if rel_path not in seen:
+                changes['created_dirs'].append(rel_path)
+                dir_modes[rel_path] = dirs[rel_path]
+                if not dry_run:
+                    os.makedirs(os.path.join(sandbox_path, rel_path), exist_ok=True)
+        for rel_path, target in files.items():
+            if rel_path not in seen:
+                changes['written'].append(rel_path)
+                if not dry_run:
+                    restore_file(store, os.path.join(sandbox_path, rel_path), target)
+        for rel_path, link in symlinks.items():
+            if rel_path not in seen:
+                changes['written'].append(rel_path)
+                if not dry_run:
+                    os.symlink(link, os.path.join(sandbox_path, rel_path))
+        # Directory modes last and deepest first, so a read-only directory
+        # blocks neither its contents nor its subdirectories' modes
+        if not dry_run:
+            for rel_path in sorted(dir_modes, key=lambda path: path.count(os.sep), reverse=True):
+                os.chmod(os.path.join(sandbox_path, rel_path), dir_modes[rel_path])
+
+    summary = {key: len(value) for key, value in changes.items()}
+    logging.info(f"Restored {sandbox_path} to {manifest['id']}: {summary}")
+    return {'snapshot': manifest['id'], 'dry_run': dry_run, 'summary': summary, 'changes': changes}
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    exit(main())
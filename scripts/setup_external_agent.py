@@ -12,16 +12,16 @@ import logging
 import json
 import os
 import sys
-import subprocess
-import requests
-from pathlib import Path
 
+from tracing import span, traced, inject_headers
+
+@traced('external.main')
 def main():
     """Main script function"""
     try:
         parser = argparse.ArgumentParser(description='Setup external agent communication')
         parser.add_argument('--agent', type=str, help='Agent type (internal, external, hybrid)', required=True)
-        parser.add_argument('--protocol', type=str, help='Communication protocol (http, websocket, grpc)', default='http')
+        parser.add_argument('--protocol', type=str, help='Communication protocol (http, websocket, grpc, shm for co-located hemispheres)', default='http')
         parser.add_argument('--timeout', type=int, help='Connection timeout in seconds', default=30)
         parser.add_argument('--config', type=str, help='Configuration mode (auto, manual, custom)', default='auto')
         parser.add_argument('--url', type=str, help='External agent URL', default=None)
@@ -46,6 +46,7 @@ def main():
         logging.exception(f"External agent setup failed: {str(e)}")
         return 1
 
+@traced('external.setup')
 def setup_external_agent(agent_type, protocol, timeout, config_mode, url):
     """Setup external agent communication"""
     logging.info(f"Setting up external agent: type={agent_type}, protocol={protocol}, config={config_mode}")
@@ -80,6 +81,7 @@ def setup_external_agent(agent_type, protocol, timeout, config_mode, url):
     
     return config
 
+@traced('external.discover')
 def auto_discover_agent(config, url):
     """Auto-discover external agent"""
     logging.info("Auto-discovering external agent")
@@ -113,6 +115,8 @@ def auto_discover_agent(config, url):
 def discover_via_registry(config):
     """Discover agent via service registry"""
     try:
+        import requests
+        
         # Check for common service registries
         registries = [
             'http://localhost:8080/registry',
@@ -122,7 +126,9 @@ def discover_via_registry(config):
         
         for registry in registries:
             try:
-                response = requests.get(registry, timeout=config['timeout'])
+                with span('http.get', url=registry) as s:
+                    response = requests.get(registry, timeout=config['timeout'], headers=inject_headers())
+                    s.set_attribute('status_code', response.status_code)
                 if response.status_code == 200:
                     data = response.json()
                     if 'agent' in data:
@@ -196,6 +202,7 @@ def custom_configure_agent(config, url):
     # For now, use manual configuration
     return manual_configure_agent(config, url)
 
+@traced('external.probe')
 def probe_agent(config):
     """Probe agent for capabilities"""
     url = config['connection'].get('url')
@@ -207,11 +214,20 @@ def probe_agent(config):
         
         # Try to connect and get capabilities
         if config['protocol'] == 'http':
-            response = requests.get(f"{url}/api/v1/capabilities", timeout=config['timeout'])
+            import requests
+            with span('http.get', url=f"{url}/api/v1/capabilities") as s:
+                response = requests.get(f"{url}/api/v1/capabilities", timeout=config['timeout'], headers=inject_headers())
+                s.set_attribute('status_code', response.status_code)
             if response.status_code == 200:
                 data = response.json()
                 config['capabilities'] = data.get('capabilities', {})
                 config['authentication'] = data.get('authentication', {})
+        elif config['protocol'] == 'websocket':
+            from agent_channel import AgentChannel
+            with AgentChannel(url, connect_timeout=config['timeout']) as channel:
+                data = channel.request('capabilities', timeout=config['timeout'])
+            config['capabilities'] = data.get('capabilities', {})
+            config['authentication'] = data.get('authentication', {})
         
         return config
         
@@ -219,6 +235,7 @@ def probe_agent(config):
         logging.warning(f"Agent probe failed: {str(e)}")
         return config
 
+@traced('external.test_connection')
 def test_connection(config):
     """Test connection to external agent"""
     url = config['connection'].get('url')
@@ -229,8 +246,15 @@ def test_connection(config):
         logging.info(f"Testing connection to {url}")
         
         if config['protocol'] == 'http':
-            response = requests.get(f"{url}/health", timeout=config['timeout'])
+            import requests
+            with span('http.get', url=f"{url}/health") as s:
+                response = requests.get(f"{url}/health", timeout=config['timeout'], headers=inject_headers())
+                s.set_attribute('status_code', response.status_code)
             return response.status_code == 200
+        elif config['protocol'] == 'websocket':
+            from agent_channel import AgentChannel
+            with AgentChannel(url, connect_timeout=config['timeout']) as channel:
+                return channel.request('health', timeout=config['timeout']).get('status') == 'ok'
         
         return False
         
@@ -240,7 +264,21 @@ def test_connection(config):
 
 def configure_synchronization(agent_type, protocol):
     """Configure synchronization settings"""
-    return {
+    if protocol == 'shm':
+        # Co-located hemispheres share a memory-mapped store instead of exchanging JSON
+        from shared_state import STATE_FILE
+        return {
+            'method': 'shared_memory',
+            'frequency': 'continuous',
+            'consistency': 'per_record',
+            'mode': agent_type,
+            'protocol': protocol,
+            'message_format': 'raw',
+            'store': os.path.join('data', STATE_FILE)
+        }
+    
+    from sync_log import LOG_DIR
+    sync = {
         'method': 'real_time',
         'frequency': 'continuous',
         'consistency': 'strong',
@@ -251,8 +289,24 @@ def configure_synchronization(agent_type, protocol):
             'max_retries': 3,
             'backoff': 'exponential',
             'initial_delay': 1
+        },
+        # Strong consistency orders and persists every operation in the sync log
+        'log': {
+            'path': os.path.join('data', LOG_DIR),
+            'commit': 'group_fsync',
+            'catch_up': 'replay_from_checkpoint'
         }
     }
+    if protocol == 'websocket':
+        # One persistent multiplexed connection (agent_channel.py) instead of a request per operation
+        sync['channel'] = {
+            'heartbeat_interval': 5,
+            'heartbeat_timeout': 15,
+            'reconnect': 'exponential',
+            'max_backoff': 30,
+            'resume': True
+        }
+    return sync
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
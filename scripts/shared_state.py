@@ -0,0 +1,550 @@
+#!/usr/bin/env python3
+"""
+Initializer Skill Script: shared_state
+
+Description:
+    Shared state store for agent hemispheres running on the same host.
+    State lives in a memory-mapped file in the sandbox data/ directory as
+    fixed-size records in an open-addressing hash table, so both
+    processes read and write the same pages with no serialization. One
+    process writes (enforced with an advisory lock); any number read.
+    Every record carries a seqlock counter: the writer makes it odd
+    before changing the record and even afterwards, and readers retry
+    until they see the same even value before and after reading. If a
+    writer dies mid-update, readers time out instead of spinning forever
+    and the next writer to open the store discards the torn record. Reads
+    and writes go through memoryview slices of the mapping, so values are
+    copied at most once (get) or not at all (read_with). Inserts reuse
+    tombstones, and once they pass TOMBSTONE_LIMIT of the slots the writer
+    compacts the table in place by moving records back along their probe
+    paths; readers that miss a key while the store changed look again.
+
+File layout:
+    header  64 bytes   magic, format version, slot count, key size,
+                       value size, generation (bumped on every write)
+    slots   N records  seq u64, key length u16, state u16, value length
+                       u32, key bytes, value bytes; padded to 64 bytes
+"""
+
+import argparse
+import logging
+import hashlib
+import json
+import mmap
+import os
+import struct
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+STATE_FILE = 'shared_state.mmap'
+
+MAGIC = b'OCSTATE\0'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<8sIIIIQ')
+HEADER_SIZE = 64
+GENERATION_OFFSET = 24
+
+SEQ = struct.Struct('<Q')
+RECORD_FIELDS = struct.Struct('<HHI')
+RECORD_HEADER_SIZE = SEQ.size + RECORD_FIELDS.size
+ALIGNMENT = 64
+
+EMPTY = 0
+USED = 1
+DELETED = 2
+
+DEFAULT_SLOTS = 1024
+DEFAULT_KEY_SIZE = 64
+DEFAULT_VALUE_SIZE = 4096
+
+# Spins before a reader yields the CPU to a writer mid-update
+SPIN_LIMIT = 100
+# Seconds a record may stay mid-update before readers assume the writer died
+WRITE_STALL_TIMEOUT = 2.0
+
+# Fraction of slots that may be tombstones before the writer compacts
+TOMBSTONE_LIMIT = 0.25
+
+def main():
+    """Main script function"""
+    try:
+        parser = argparse.ArgumentParser(description='Inspect or update a sandbox shared state store')
+        parser.add_argument('--name', type=str, help='Sandbox name', default=None)
+        parser.add_argument('--path', type=str, help='Sandbox directory path', default=None)
+        subparsers = parser.add_subparsers(dest='command', required=True)
+
+        init_parser = subparsers.add_parser('init', help='Create the store')
+        init_parser.add_argument('--slots', type=int, help=f'Number of records (default {DEFAULT_SLOTS})', default=None)
+        init_parser.add_argument('--key-size', type=int, help=f'Maximum key length in bytes (default {DEFAULT_KEY_SIZE})', default=None)
+        init_parser.add_argument('--value-size', type=int, help=f'Maximum value length in bytes (default {DEFAULT_VALUE_SIZE})', default=None)
+
+        set_parser = subparsers.add_parser('set', help='Set a value')
+        set_parser.add_argument('key', type=str, help='Key')
+        set_parser.add_argument('value', type=str, help='Value (UTF-8)')
+
+        get_parser = subparsers.add_parser('get', help='Print a value')
+        get_parser.add_argument('key', type=str, help='Key')
+
+        delete_parser = subparsers.add_parser('delete', help='Delete a value')
+        delete_parser.add_argument('key', type=str, help='Key')
+
+        subparsers.add_parser('stat', help='Show store layout and usage')
+
+        args = parser.parse_args()
+
+        if not (args.name or args.path):
+            logging.error("One of --name or --path is required")
+            return 1
+
+        from sandbox_disk_quota import resolve_sandbox_path
+        sandbox_path = resolve_sandbox_path(args.name, args.path)
+
+        if args.command == 'init':
+            store = open_shared_state(sandbox_path, writer=True, slots=args.slots,
+                                      key_size=args.key_size, value_size=args.value_size)
+            logging.info(f"Shared state store ready at {store.path}")
+            print(json.dumps(store.stat(), indent=2))
+        elif args.command in ('set', 'delete'):
+            store = open_shared_state(sandbox_path, writer=True)
+            if args.command == 'set':
+                store.set(args.key, args.value.encode('utf-8'))
+            elif not store.delete(args.key):
+                logging.error(f"Key not found: {args.key}")
+                return 1
+        elif args.command == 'get':
+            store = open_shared_state(sandbox_path)
+            value = store.get(args.key)
+            if value is None:
+                logging.error(f"Key not found: {args.key}")
+                return 1
+            print(value.decode('utf-8', 'replace'))
+        elif args.command == 'stat':
+            store = open_shared_state(sandbox_path)
+            print(json.dumps(store.stat(), indent=2))
+
+        store.close()
+        return 0
+
+    except Exception as e:
+        logging.exception(f"Shared state operation failed: {str(e)}")
+        return 1
+
+def record_size(key_size, value_size):
+    """Size of one record, padded to a cache line"""
+    size = RECORD_HEADER_SIZE + key_size + value_size
+    return (size + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+class _WriteWait:
+    """Back-off for a reader that found a record mid-update"""
+
+    def __init__(self, path, slot):
+        self.path = path
+        self.slot = slot
+        self.spins = 0
+        self.deadline = None
+
+    def wait(self):
+        self.spins += 1
+        if self.spins < SPIN_LIMIT:
+            return
+        self.spins = 0
+        now = time.monotonic()
+        if self.deadline is None:
+            self.deadline = now + WRITE_STALL_TIMEOUT
+        elif now > self.deadline:
+            # Opening the store as a writer repairs records a crashed writer left behind
+            raise TimeoutError(f"Record {self.slot} of {self.path} has been mid-update for "
+                               f"{WRITE_STALL_TIMEOUT}s; the writer may have crashed")
+        time.sleep(0)
+
+class SharedState:
+    """A memory-mapped key/value store with seqlock-versioned records"""
+
+    def __init__(self, path, writer=False):
+        self.path = path
+        self.writer = writer
+        self._fd = os.open(path, os.O_RDWR if writer else os.O_RDONLY)
+        try:
+            if writer and fcntl is not None:
+                try:
+                    fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    raise RuntimeError(f"Another process is already writing {path}")
+
+            access = mmap.ACCESS_WRITE if writer else mmap.ACCESS_READ
+            self._mmap = mmap.mmap(self._fd, 0, access=access)
+        except Exception:
+            os.close(self._fd)
+            raise
+        self.buf = memoryview(self._mmap)
+
+        magic, version, self.slots, self.key_size, self.value_size, _ = HEADER.unpack_from(self.buf, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"Not a shared state store (format {FORMAT_VERSION}): {path}")
+        self.record_size = record_size(self.key_size, self.value_size)
+        if len(self.buf) < HEADER_SIZE + self.slots * self.record_size:
+            self.close()
+            raise ValueError(f"Shared state store is truncated: {path}")
+
+        # Key -> slot hints; always re-verified against the record itself
+        self._slot_hints = {}
+        self.tombstones = 0
+
+        # Holding the lock means no other writer is alive to finish an update
+        if writer and fcntl is not None:
+            self._recover()
+
+    def close(self):
+        if self.buf is not None:
+            self.buf.release()
+            self.buf = None
+            self._mmap.close()
+            os.close(self._fd)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def _offset(self, slot):
+        return HEADER_SIZE + slot * self.record_size
+
+    def _home(self, key):
+        digest = hashlib.blake2b(key, digest_size=8).digest()
+        return int.from_bytes(digest, 'little') % self.slots
+
+    def _read_record(self, slot, key, reader=None):
+        """Consistent read of one record: (state, matches key, reader result)"""
+        offset = self._offset(slot)
+        buf = self.buf
+        key_offset = offset + RECORD_HEADER_SIZE
+        value_offset = key_offset + self.key_size
+        waiter = None
+        while True:
+            before = SEQ.unpack_from(buf, offset)[0]
+            if before & 1:
+                waiter = waiter or _WriteWait(self.path, slot)
+                waiter.wait()
+                continue
+
+            key_len, state, value_len = RECORD_FIELDS.unpack_from(buf, offset + SEQ.size)
+            matches = (state == USED and key_len == len(key)
+                       and value_len <= self.value_size
+                       and buf[key_offset:key_offset + key_len] == key)
+            result = None
+            if matches and reader is not None:
+                result = reader(buf[value_offset:value_offset + value_len])
+
+            if SEQ.unpack_from(buf, offset)[0] == before:
+                return state, matches, result
+
+    def _probe(self, key):
+        """Walk key's probe path: (slot holding key or None, first reusable slot or None)"""
+        free = None
+        slot = self._home(key)
+        for _ in range(self.slots):
+            state, matches, _ = self._read_record(slot, key)
+            if matches:
+                return slot, free
+            if state != USED and free is None:
+                free = slot
+            if state == EMPTY:
+                break
+            slot = (slot + 1) % self.slots
+        return None, free
+
+    def _find(self, key):
+        """Slot holding key, or None"""
+        hint = self._slot_hints.get(key)
+        if hint is not None and self._read_record(hint, key)[1]:
+            return hint
+
+        while True:
+            generation = self.generation()
+            slot, _ = self._probe(key)
+            if slot is not None:
+                self._slot_hints[key] = slot
+                return slot
+            # Compaction moves a record ahead of the probe before removing the
+            # old copy, so a miss only counts if nothing was written meanwhile
+            if self.generation() == generation:
+                return None
+
+    @staticmethod
+    def _key_bytes(key):
+        return key.encode('utf-8') if isinstance(key, str) else bytes(key)
+
+    def read_with(self, key, reader):
+        """Call reader on a zero-copy view of the value; None if key is absent.
+
+        reader may run more than once if the writer changes the record
+        meanwhile, and the view must not be kept after it returns.
+        """
+        key = self._key_bytes(key)
+        slot = self._find(key)
+        while slot is not None:
+            _, matches, result = self._read_record(slot, key, reader)
+            if matches:
+                return result
+            # The record moved or was deleted between lookup and read
+            slot = self._find(key)
+        return None
+
+    def get(self, key):
+        """Get a copy of the value as bytes, or None"""
+        return self.read_with(key, bytes)
+
+    def get_into(self, key, out):
+        """Copy the value into a writable buffer; returns the value length, or None.
+
+        A value longer than out is truncated to len(out).
+        """
+        target = memoryview(out).cast('B')
+
+        def copy(view):
+            n = min(len(view), len(target))
+            target[:n] = view[:n]
+            return len(view)
+        return self.read_with(key, copy)
+
+    def version(self, key):
+        """Number of completed writes to key's record, or None"""
+        key = self._key_bytes(key)
+        slot = self._find(key)
+        if slot is None:
+            return None
+        return SEQ.unpack_from(self.buf, self._offset(slot))[0] // 2
+
+    def generation(self):
+        """Store-wide write counter, for cheap change polling"""
+        return SEQ.unpack_from(self.buf, GENERATION_OFFSET)[0]
+
+    def _write_record(self, slot, key, state, value=b''):
+        offset = self._offset(slot)
+        buf = self.buf
+        # Round up so a record left odd by a crashed writer stays odd until done
+        seq = SEQ.unpack_from(buf, offset)[0] | 1
+        SEQ.pack_into(buf, offset, seq)
+        RECORD_FIELDS.pack_into(buf, offset + SEQ.size, len(key), state, len(value))
+        key_offset = offset + RECORD_HEADER_SIZE
+        buf[key_offset:key_offset + len(key)] = key
+        value_offset = key_offset + self.key_size
+        buf[value_offset:value_offset + len(value)] = value
+        SEQ.pack_into(buf, offset, seq + 1)
+        SEQ.pack_into(buf, GENERATION_OFFSET, self.generation() + 1)
+
+    def _record_key(self, slot):
+        """State and key of a record; only for the writer, which nothing changes underneath"""
+        offset = self._offset(slot)
+        key_len, state, _ = RECORD_FIELDS.unpack_from(self.buf, offset + SEQ.size)
+        key_offset = offset + RECORD_HEADER_SIZE
+        return state, bytes(self.buf[key_offset:key_offset + min(key_len, self.key_size)])
+
+    def _displacement(self, key, slot):
+        return (slot - self._home(key)) % self.slots
+
+    def _recover(self):
+        """Tombstone records a crashed writer left mid-update (odd seq) or mid-move"""
+        repaired = 0
+        for slot in range(self.slots):
+            if SEQ.unpack_from(self.buf, self._offset(slot))[0] & 1:
+                # The key and value may be torn, so the record cannot be trusted
+                self._write_record(slot, b'', DELETED)
+                repaired += 1
+
+        # A compaction that crashed between copying a record and removing the
+        # original leaves two copies; lookups reach the nearer one first
+        nearest = {}
+        for slot in range(self.slots):
+            state, key = self._record_key(slot)
+            if state == DELETED:
+                self.tombstones += 1
+            if state != USED:
+                continue
+            other = nearest.get(key)
+            if other is None:
+                nearest[key] = slot
+                continue
+            if self._displacement(key, slot) < self._displacement(key, other):
+                nearest[key], slot = slot, other
+            self._write_record(slot, b'', DELETED)
+            self.tombstones += 1
+            repaired += 1
+
+        if repaired:
+            self._slot_hints.clear()
+            logging.warning(f"Discarded {repaired} record(s) left mid-update in {self.path}")
+
+    def set(self, key, value):
+        """Set key to a bytes-like value (writer only)"""
+        if not self.writer:
+            raise PermissionError("Shared state store is open read-only")
+        key = self._key_bytes(key)
+        value = memoryview(value).cast('B')
+        if not key or len(key) > self.key_size:
+            raise ValueError(f"Key must be 1-{self.key_size} bytes")
+        if len(value) > self.value_size:
+            raise ValueError(f"Value of {len(value)} bytes exceeds the {self.value_size} byte record size")
+
+        slot = self._slot_hints.get(key)
+        if slot is None or not self._read_record(slot, key)[1]:
+            slot, free = self._probe(key)
+            if slot is None:
+                # The first tombstone on the path is reused before any empty slot
+                if free is None:
+                    raise RuntimeError(f"Shared state store is full ({self.slots} records)")
+                slot = free
+                if self._record_key(slot)[0] == DELETED:
+                    self.tombstones -= 1
+        self._write_record(slot, key, USED, value)
+        self._slot_hints[key] = slot
+
+    def delete(self, key):
+        """Delete key (writer only); returns whether it existed"""
+        if not self.writer:
+            raise PermissionError("Shared state store is open read-only")
+        key = self._key_bytes(key)
+        slot = self._find(key)
+        if slot is None:
+            return False
+        # Tombstones keep probe chains intact for readers
+        self._write_record(slot, b'', DELETED)
+        self._slot_hints.pop(key, None)
+        self.tombstones += 1
+        if self.tombstones > self.slots * TOMBSTONE_LIMIT:
+            self.compact()
+        return True
+
+    def compact(self):
+        """Clear tombstones in place (writer only); returns how many were cleared.
+
+        Each record is moved to the first free slot on its probe path by
+        writing the copy before tombstoning the original, so it can always
+        be found. Once no record can move, no probe path crosses a
+        tombstone and every one of them can become empty.
+        """
+        if not self.writer:
+            raise PermissionError("Shared state store is open read-only")
+        moved = True
+        while moved:
+            moved = False
+            for slot in range(self.slots):
+                state, key = self._record_key(slot)
+                if state != USED:
+                    continue
+                target = self._home(key)
+                while target != slot and self._record_key(target)[0] == USED:
+                    target = (target + 1) % self.slots
+                if target == slot:
+                    continue
+                offset = self._offset(slot)
+                value_len = RECORD_FIELDS.unpack_from(self.buf, offset + SEQ.size)[2]
+                value_offset = offset + RECORD_HEADER_SIZE + self.key_size
+                self._write_record(target, key, USED, bytes(self.buf[value_offset:value_offset + value_len]))
+                self._write_record(slot, b'', DELETED)
+                moved = True
+
+        cleared = 0
+        for slot in range(self.slots):
+            if self._record_key(slot)[0] == DELETED:
+                self._write_record(slot, b'', EMPTY)
+                cleared += 1
+        self.tombstones = 0
+        self._slot_hints.clear()
+        if cleared:
+            logging.debug(f"Compacted {self.path}: cleared {cleared} tombstones")
+        return cleared
+
+    def keys(self):
+        """Keys currently stored"""
+        keys = []
+        for slot in range(self.slots):
+            offset = self._offset(slot)
+            waiter = None
+            while True:
+                before = SEQ.unpack_from(self.buf, offset)[0]
+                if before & 1:
+                    waiter = waiter or _WriteWait(self.path, slot)
+                    waiter.wait()
+                    continue
+                key_len, state, _ = RECORD_FIELDS.unpack_from(self.buf, offset + SEQ.size)
+                key = bytes(self.buf[offset + RECORD_HEADER_SIZE:offset + RECORD_HEADER_SIZE + min(key_len, self.key_size)])
+                if SEQ.unpack_from(self.buf, offset)[0] == before:
+                    break
+            if state == USED:
+                keys.append(key.decode('utf-8', 'replace'))
+        return keys
+
+    def stat(self):
+        return {
+            'path': self.path,
+            'slots': self.slots,
+            'key_size': self.key_size,
+            'value_size': self.value_size,
+            'record_size': self.record_size,
+            'file_size': len(self.buf),
+            'used': len(self.keys()),
+            'tombstones': sum(1 for slot in range(self.slots)
+                              if RECORD_FIELDS.unpack_from(self.buf, self._offset(slot) + SEQ.size)[1] == DELETED),
+            'generation': self.generation()
+        }
+
+def create_shared_state(path, slots=DEFAULT_SLOTS, key_size=DEFAULT_KEY_SIZE, value_size=DEFAULT_VALUE_SIZE):
+    """Create an empty store file unless one exists; returns whether this call created it.
+
+    The file only appears once fully initialized, and an existing store is
+    never replaced, so a writer racing another creator keeps its lock on
+    the file everyone ends up using.
+    """
+    if key_size > 0xFFFF:
+        raise ValueError("Key size must fit in 16 bits")
+    size = HEADER_SIZE + slots * record_size(key_size, value_size)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, slots, key_size, value_size, 0))
+            # Sparse file: record pages are allocated when first written
+            f.truncate(size)
+        # link() fails if path exists, unlike replace()
+        os.link(tmp_path, path)
+        return True
+    except FileExistsError:
+        return False
+    finally:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+def open_shared_state(sandbox_path, writer=False, slots=None, key_size=None, value_size=None):
+    """Open a sandbox's shared state store, creating it if a writer opens it first.
+
+    Layout arguments apply when the store is created; if the store already
+    exists, any that are given must match it.
+    """
+    path = os.path.join(sandbox_path, 'data', STATE_FILE)
+    if writer and not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        create_shared_state(path, slots or DEFAULT_SLOTS, key_size or DEFAULT_KEY_SIZE,
+                            value_size or DEFAULT_VALUE_SIZE)
+    store = SharedState(path, writer)
+
+    requested = {'slots': slots, 'key_size': key_size, 'value_size': value_size}
+    mismatched = [f"{name}={getattr(store, name)}" for name, value in requested.items()
+                  if value is not None and value != getattr(store, name)]
+    if mismatched:
+        store.close()
+        raise ValueError(f"Shared state store {path} already exists with {', '.join(mismatched)}; "
+                         "remove it to change the layout")
+    return store
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    exit(main())
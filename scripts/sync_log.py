@@ -0,0 +1,552 @@
+#!/usr/bin/env python3
+"""
+Initializer Skill Script: sync_log
+
+Description:
+    Durable, ordered log of the operations synchronized between agents.
+    Operations are appended to segment files under the sandbox
+    data/sync_log/ directory; a segment is closed once it reaches its size
+    limit and a new one starts at the next offset. A single committer
+    thread writes whatever appends are pending and covers them all with
+    one fsync (group commit), so concurrent appenders share the cost.
+    Each segment has a sparse offset index, so replay can start at any
+    offset without scanning the log from the beginning. After every fsync
+    the writer records the durable end offset in DURABLE, and readers stop
+    there: records past it may still be lost in a crash and their offsets
+    reused. Compaction rewrites closed segments without records whose key
+    was durably written again later, and leaves corrupt segments alone.
+    Offsets never change, so a restarted agent catches up by replaying
+    from its last checkpoint only.
+
+Record format:
+    crc32 u32, offset u64, timestamp f64, key length u16, op u8, pad u8,
+    value length u32, key bytes, value bytes
+"""
+
+import argparse
+import logging
+import bisect
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import namedtuple
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+LOG_DIR = 'sync_log'
+CONSUMER_DIR = 'consumers'
+DURABLE_FILE = 'DURABLE'
+
+RECORD = struct.Struct('<IQdHBxI')
+INDEX_ENTRY = struct.Struct('<QQ')
+DURABLE_END = struct.Struct('<Q')
+
+OP_SET = 1
+OP_DELETE = 2
+OP_NAMES = {OP_SET: 'set', OP_DELETE: 'delete'}
+
+SEGMENT_BYTES = 16 * 1024 * 1024
+# One index entry per this many bytes of segment
+INDEX_INTERVAL = 4096
+CHECKPOINT_EVERY = 1000
+
+LogRecord = namedtuple('LogRecord', 'offset timestamp op key value position size')
+
+def main():
+    """Main script function"""
+    try:
+        parser = argparse.ArgumentParser(description='Inspect, replay or compact a sandbox sync log')
+        parser.add_argument('--name', type=str, help='Sandbox name', default=None)
+        parser.add_argument('--path', type=str, help='Sandbox directory path', default=None)
+        subparsers = parser.add_subparsers(dest='command', required=True)
+
+        append_parser = subparsers.add_parser('append', help='Append one operation')
+        append_parser.add_argument('key', type=str, help='Key')
+        append_parser.add_argument('value', type=str, nargs='?', help='Value (UTF-8)', default='')
+        append_parser.add_argument('--delete', action='store_true', help='Record a delete instead of a set')
+
+        replay_parser = subparsers.add_parser('replay', help='Print operations from an offset as JSONL')
+        replay_parser.add_argument('--from', dest='start', type=int, help='First offset to replay', default=0)
+        replay_parser.add_argument('--limit', type=int, help='Maximum number of operations', default=None)
+
+        catch_up_parser = subparsers.add_parser('catch-up', help='Print operations a consumer has not seen and advance it')
+        catch_up_parser.add_argument('--consumer', type=str, help='Consumer name', required=True)
+
+        subparsers.add_parser('compact', help='Drop superseded records from closed segments')
+        subparsers.add_parser('stat', help='Show segments and offsets')
+
+        args = parser.parse_args()
+
+        if not (args.name or args.path):
+            logging.error("One of --name or --path is required")
+            return 1
+
+        from sandbox_disk_quota import resolve_sandbox_path
+        directory = log_directory(resolve_sandbox_path(args.name, args.path))
+
+        if args.command == 'append':
+            with SyncLog(directory) as log:
+                offset = log.append(args.key, args.value.encode('utf-8'), OP_DELETE if args.delete else OP_SET)
+            print(offset)
+        elif args.command == 'replay':
+            for count, record in enumerate(replay(directory, args.start)):
+                if args.limit is not None and count >= args.limit:
+                    break
+                print(json.dumps(record_to_dict(record)))
+        elif args.command == 'catch-up':
+            count = catch_up(directory, args.consumer, lambda record: print(json.dumps(record_to_dict(record))))
+            logging.info(f"Consumer {args.consumer} caught up with {count} operations")
+        elif args.command == 'compact':
+            with SyncLog(directory) as log:
+                print(json.dumps(log.compact(), indent=2))
+        elif args.command == 'stat':
+            print(json.dumps(log_stat(directory), indent=2))
+
+        return 0
+
+    except Exception as e:
+        logging.exception(f"Sync log operation failed: {str(e)}")
+        return 1
+
+def log_directory(sandbox_path):
+    return os.path.join(sandbox_path, 'data', LOG_DIR)
+
+def segment_path(directory, base, suffix='.log'):
+    return os.path.join(directory, f"{base:020d}{suffix}")
+
+def fsync_directory(directory):
+    """Make file creations and renames in directory durable"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        # Directories cannot be opened on Windows; renames there are durable already
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def read_durable_end(directory):
+    """Offset just past the last record the writer has fsynced; None for a log without DURABLE"""
+    try:
+        with open(os.path.join(directory, DURABLE_FILE), 'rb') as f:
+            data = f.read(DURABLE_END.size)
+    except OSError:
+        return None
+    return DURABLE_END.unpack(data)[0] if len(data) == DURABLE_END.size else None
+
+def list_segments(directory):
+    """Base offsets of the log's segments, in order"""
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    return sorted(int(name[:-4]) for name in names if name.endswith('.log') and name[:-4].isdigit())
+
+def encode_record(offset, timestamp, op, key, value):
+    body = RECORD.pack(0, offset, timestamp, len(key), op, len(value))[4:] + key + value
+    return struct.pack('<I', zlib.crc32(body)) + body
+
+def read_segment(path, position=0, values=True):
+    """Yield a segment's records from a file position, stopping at a torn or corrupt tail"""
+    with open(path, 'rb') as f:
+        f.seek(position)
+        while True:
+            header = f.read(RECORD.size)
+            if len(header) < RECORD.size:
+                return
+            crc, offset, timestamp, key_len, op, value_len = RECORD.unpack(header)
+            key = f.read(key_len)
+            if values:
+                value = f.read(value_len)
+                if len(key) < key_len or len(value) < value_len:
+                    return
+                if zlib.crc32(header[4:] + key + value) != crc:
+                    return
+            else:
+                value = None
+                if len(key) < key_len:
+                    return
+                f.seek(value_len, os.SEEK_CUR)
+            size = RECORD.size + key_len + value_len
+            yield LogRecord(offset, timestamp, op, key, value, position, size)
+            position += size
+
+def read_index(directory, base):
+    """A segment's (offsets, positions) index; empty if missing"""
+    try:
+        with open(segment_path(directory, base, '.index'), 'rb') as f:
+            data = f.read()
+    except OSError:
+        return [], []
+    entries = [INDEX_ENTRY.unpack_from(data, i) for i in range(0, len(data) - len(data) % INDEX_ENTRY.size, INDEX_ENTRY.size)]
+    return [offset for offset, _ in entries], [position for _, position in entries]
+
+def replay(directory, start=0, end=None):
+    """Yield every durable record from offset start up to (not including) end, in order.
+
+    end defaults to the durable end the writer last recorded.
+    """
+    if end is None:
+        end = read_durable_end(directory)
+    bases = list_segments(directory)
+    first = max(bisect.bisect_right(bases, start) - 1, 0)
+    for base in bases[first:]:
+        path = segment_path(directory, base)
+        position = 0
+        if base < start:
+            offsets, positions = read_index(directory, base)
+            i = bisect.bisect_right(offsets, start) - 1
+            if i >= 0:
+                position = positions[i]
+                # Compaction may have swapped the segment under this index; verify the entry
+                first_record = next(read_segment(path, position), None)
+                if first_record is None or first_record.offset != offsets[i]:
+                    position = 0
+        if end is not None and base >= end:
+            return
+        try:
+            for record in read_segment(path, position):
+                if end is not None and record.offset >= end:
+                    return
+                if record.offset >= start:
+                    yield record
+        except FileNotFoundError:
+            continue
+
+def record_to_dict(record):
+    return {
+        'offset': record.offset,
+        'timestamp': record.timestamp,
+        'op': OP_NAMES.get(record.op, record.op),
+        'key': record.key.decode('utf-8', 'replace'),
+        'value': record.value.decode('utf-8', 'replace') if record.value is not None else None
+    }
+
+def load_checkpoint(directory, consumer):
+    """Next offset a consumer has to apply"""
+    try:
+        with open(os.path.join(directory, CONSUMER_DIR, consumer), 'r') as f:
+            return int(f.read().strip() or 0)
+    except (OSError, ValueError):
+        return 0
+
+def save_checkpoint(directory, consumer, next_offset):
+    consumer_dir = os.path.join(directory, CONSUMER_DIR)
+    os.makedirs(consumer_dir, exist_ok=True)
+    path = os.path.join(consumer_dir, consumer)
+    with open(path + '.tmp', 'w') as f:
+        f.write(str(next_offset))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(path + '.tmp', path)
+    fsync_directory(consumer_dir)
+
+def catch_up(directory, consumer, apply):
+    """Apply the operations a consumer has not seen yet, advancing its checkpoint.
+
+    The checkpoint is saved after records are applied, so after a crash a
+    few operations may be applied again (at-least-once).
+    """
+    next_offset = load_checkpoint(directory, consumer)
+    count = 0
+    for record in replay(directory, next_offset):
+        apply(record)
+        next_offset = record.offset + 1
+        count += 1
+        if count % CHECKPOINT_EVERY == 0:
+            save_checkpoint(directory, consumer, next_offset)
+    if count % CHECKPOINT_EVERY:
+        save_checkpoint(directory, consumer, next_offset)
+    return count
+
+def log_stat(directory):
+    segments = []
+    for base in list_segments(directory):
+        path = segment_path(directory, base)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            continue
+        segments.append({'base_offset': base, 'bytes': size, 'index_entries': len(read_index(directory, base)[0])})
+    consumers = {}
+    consumer_dir = os.path.join(directory, CONSUMER_DIR)
+    if os.path.isdir(consumer_dir):
+        for name in os.listdir(consumer_dir):
+            if not name.endswith('.tmp'):
+                consumers[name] = load_checkpoint(directory, name)
+    return {'directory': directory, 'durable_end': read_durable_end(directory), 'segments': segments, 'consumers': consumers}
+
+class SyncLog:
+    """Single-writer append-only log with group-commit durability"""
+
+    def __init__(self, directory, segment_bytes=SEGMENT_BYTES):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock_file = open(os.path.join(directory, 'LOCK'), 'a')
+        if fcntl is not None:
+            try:
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                self._lock_file.close()
+                raise RuntimeError(f"Another process is already writing {directory}")
+
+        self.segments = list_segments(directory) or [0]
+        self._segments_lock = threading.Lock()
+        self._compact_lock = threading.Lock()
+        self.next_offset = self._recover(self.segments[-1])
+        self.durable_offset = self.next_offset - 1
+        self._durable_file = os.fdopen(os.open(os.path.join(directory, DURABLE_FILE), os.O_RDWR | os.O_CREAT, 0o644), 'r+b')
+        self._mark_durable(self.next_offset)
+        fsync_directory(directory)
+
+        self._cond = threading.Condition()
+        self._pending = []
+        self._closing = False
+        self._error = None
+        self._committer = threading.Thread(target=self._commit_loop, name='sync-log-commit', daemon=True)
+        self._committer.start()
+
+    def _recover(self, base):
+        """Open the active segment, cutting off a torn tail and rebuilding its index"""
+        path = segment_path(self.directory, base)
+        next_offset = base
+        position = 0
+        index = []
+        if os.path.exists(path):
+            for record in read_segment(path, 0, values=True):
+                if not index or record.position - index[-1][1] >= INDEX_INTERVAL:
+                    index.append((record.offset, record.position))
+                next_offset = record.offset + 1
+                position = record.position + record.size
+            if os.path.getsize(path) > position:
+                logging.warning(f"Truncating torn tail of {path} at byte {position}")
+                with open(path, 'r+b') as f:
+                    f.truncate(position)
+            # A crashed writer's last records may never have reached the disk
+            with open(path, 'r+b') as f:
+                os.fsync(f.fileno())
+
+        with open(segment_path(self.directory, base, '.index'), 'wb') as f:
+            f.write(b''.join(INDEX_ENTRY.pack(*entry) for entry in index))
+
+        self._file = open(path, 'ab')
+        self._index_file = open(segment_path(self.directory, base, '.index'), 'ab')
+        self._position = position
+        self._last_indexed = index[-1][1] if index else None
+        return next_offset
+
+    def _mark_durable(self, end):
+        """Publish the durable end offset to readers; only called once records before it are fsynced.
+
+        Not fsynced itself: after a crash the marker can only fall behind
+        the log, never run ahead of it.
+        """
+        self._durable_file.seek(0)
+        self._durable_file.write(DURABLE_END.pack(end))
+        self._durable_file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def append(self, key, value=b'', op=OP_SET, wait=True):
+        """Append an operation and return its offset; with wait, block until it is durable"""
+        key = key.encode('utf-8') if isinstance(key, str) else bytes(key)
+        value = bytes(value)
+        with self._cond:
+            if self._closing:
+                raise RuntimeError("Sync log is closed")
+            if self._error:
+                raise self._error
+            offset = self.next_offset
+            self.next_offset += 1
+            self._pending.append((offset, encode_record(offset, time.time(), op, key, value)))
+            self._cond.notify_all()
+            if wait:
+                self._wait_durable(offset)
+        return offset
+
+    def _wait_durable(self, offset):
+        while self.durable_offset < offset and not self._error:
+            self._cond.wait()
+        if self._error:
+            raise self._error
+
+    def sync(self):
+        """Block until everything appended so far is durable"""
+        with self._cond:
+            self._wait_durable(self.next_offset - 1)
+
+    def _commit_loop(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closing:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                batch = self._pending
+                self._pending = []
+
+            # Everything appended while the previous fsync ran commits together
+            try:
+                for offset, data in batch:
+                    self._write(offset, data)
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._index_file.flush()
+                self._mark_durable(batch[-1][0] + 1)
+            except OSError as e:
+                logging.error(f"Sync log commit failed: {str(e)}")
+                with self._cond:
+                    self._error = e
+                    self._cond.notify_all()
+                return
+
+            with self._cond:
+                self.durable_offset = batch[-1][0]
+                self._cond.notify_all()
+
+    def _write(self, offset, data):
+        if self._position and self._position + len(data) > self.segment_bytes:
+            self._roll(offset)
+        if self._last_indexed is None or self._position - self._last_indexed >= INDEX_INTERVAL:
+            self._index_file.write(INDEX_ENTRY.pack(offset, self._position))
+            self._last_indexed = self._position
+        self._file.write(data)
+        self._position += len(data)
+
+    def _roll(self, base):
+        """Close the active segment and start a new one at offset base"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        # Only the active segment's index is rebuilt on recovery, so a closed one must be on disk
+        self._index_file.flush()
+        os.fsync(self._index_file.fileno())
+        self._index_file.close()
+        self._file = open(segment_path(self.directory, base), 'ab')
+        self._index_file = open(segment_path(self.directory, base, '.index'), 'ab')
+        fsync_directory(self.directory)
+        self._position = 0
+        self._last_indexed = None
+        with self._segments_lock:
+            self.segments.append(base)
+
+    def compact(self):
+        """Rewrite closed segments without records superseded by a later write to the same key"""
+        with self._compact_lock:
+            with self._segments_lock:
+                segments = list(self.segments)
+            closed = segments[:-1]
+            stats = {'segments_rewritten': 0, 'records_dropped': 0, 'bytes_before': 0, 'bytes_after': 0}
+            if not closed:
+                return stats
+
+            # Only durable, CRC-checked records may supersede others: a record
+            # past durable_offset can still be lost in a crash
+            with self._cond:
+                durable = self.durable_offset
+            latest = {}
+            for base in segments:
+                for record in read_segment(segment_path(self.directory, base)):
+                    if record.offset > durable:
+                        break
+                    latest[record.key] = record.offset
+
+            for base in closed:
+                path = segment_path(self.directory, base)
+                records = []
+                end = 0
+                for record in read_segment(path):
+                    records.append((record.key, record.offset))
+                    end = record.position + record.size
+                if end != os.path.getsize(path):
+                    # Rewriting would silently drop everything after the bad record
+                    logging.warning(f"Not compacting {path}: corrupt record at byte {end}")
+                    continue
+                if not any(latest.get(key, -1) > offset for key, offset in records):
+                    continue
+
+                before = os.path.getsize(path)
+                index = []
+                position = 0
+                kept = 0
+                with open(path + '.compact', 'wb') as out:
+                    for record in read_segment(path):
+                        if latest.get(record.key, -1) > record.offset:
+                            continue
+                        if not index or position - index[-1][1] >= INDEX_INTERVAL:
+                            index.append((record.offset, position))
+                        out.write(encode_record(record.offset, record.timestamp, record.op, record.key, record.value))
+                        position += record.size
+                        kept += 1
+                    out.flush()
+                    os.fsync(out.fileno())
+                index_path = segment_path(self.directory, base, '.index')
+                with open(index_path + '.compact', 'wb') as f:
+                    f.write(b''.join(INDEX_ENTRY.pack(*entry) for entry in index))
+                    f.flush()
+                    os.fsync(f.fileno())
+                # The index is replaced first: a stale index entry could point past the new segment's end
+                os.replace(index_path + '.compact', index_path)
+                os.replace(path + '.compact', path)
+                fsync_directory(self.directory)
+
+                stats['segments_rewritten'] += 1
+                stats['records_dropped'] += len(records) - kept
+                stats['bytes_before'] += before
+                stats['bytes_after'] += position
+            if stats['segments_rewritten']:
+                logging.info(f"Compacted {stats['segments_rewritten']} segments, dropped {stats['records_dropped']} records")
+            return stats
+
+    def start_compaction(self, interval=300):
+        """Compact in a background thread every interval seconds until closed"""
+        def loop():
+            while True:
+                with self._cond:
+                    if self._cond.wait_for(lambda: self._closing, timeout=interval):
+                        return
+                try:
+                    self.compact()
+                except Exception as e:
+                    logging.warning(f"Sync log compaction failed: {str(e)}")
+        thread = threading.Thread(target=loop, name='sync-log-compact', daemon=True)
+        thread.start()
+        return thread
+
+    def close(self):
+        """Commit pending appends and release the log"""
+        with self._cond:
+            if self._closing:
+                return
+            self._closing = True
+            self._cond.notify_all()
+        self._committer.join()
+        with self._compact_lock:
+            self._file.close()
+            self._index_file.close()
+        self._durable_file.close()
+        if fcntl is not None:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+        self._lock_file.close()
+
+def open_sync_log(sandbox_path, segment_bytes=SEGMENT_BYTES):
+    """Open a sandbox's sync log for appending"""
+    return SyncLog(log_directory(sandbox_path), segment_bytes)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    exit(main())
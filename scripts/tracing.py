@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Initializer Skill Script: tracing
+
+Description:
+    Lightweight cross-script tracing.
+    Spans carry trace and parent IDs, nest through context variables and
+    cross process boundaries through the W3C-style TRACEPARENT environment
+    variable. Finished spans are queued to a background exporter that
+    appends them to a JSONL file, one write per span so processes sharing
+    the file never interleave within a line. Tracing is enabled by setting
+    INITIALIZER_TRACE_FILE; when it is unset every helper is a no-op.
+
+Usage:
+    INITIALIZER_TRACE_FILE=trace.jsonl python initializer.py bootstrap ...
+    python tracing.py summary trace.jsonl
+"""
+
+import atexit
+import contextvars
+import functools
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+TRACE_FILE_ENV = 'INITIALIZER_TRACE_FILE'
+TRACEPARENT_ENV = 'TRACEPARENT'
+
+QUEUE_SIZE = 10000
+
+SPAN_KEYS = ('trace_id', 'span_id', 'parent_id', 'name', 'duration_ms', 'pid', 'status')
+
+# A span is written with one O_APPEND write; kept within PIPE_BUF so the
+# line also stays whole when the trace file is a pipe
+MAX_RECORD_BYTES = 4096
+
+_current_span = contextvars.ContextVar('initializer_current_span', default=None)
+
+def main():
+    """Main script function"""
+    try:
+        import argparse
+
+        parser = argparse.ArgumentParser(description='Inspect initializer trace files')
+        subparsers = parser.add_subparsers(dest='command', required=True)
+        summary_parser = subparsers.add_parser('summary', help='Summarize spans per trace')
+        summary_parser.add_argument('file', type=str, help='Trace JSONL file')
+
+        args = parser.parse_args()
+
+        if args.command == 'summary':
+            print(json.dumps(summarize_trace_file(args.file), indent=2))
+        return 0
+
+    except Exception as e:
+        logging.exception(f"Trace inspection failed: {str(e)}")
+        return 1
+
+class _NoopSpan:
+    """Stand-in span used while tracing is disabled"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set_attribute(self, key, value):
+        pass
+
+_NOOP_SPAN = _NoopSpan()
+
+class Span:
+    """A timed operation within a trace"""
+
+    def __init__(self, name, trace_id, parent_id, attributes):
+        self.name = name
+        self.trace_id = trace_id
+        self.parent_id = parent_id
+        self.span_id = os.urandom(8).hex()
+        self.attributes = attributes
+        self.status = 'ok'
+        self.error = None
+        self._token = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def traceparent(self):
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def __enter__(self):
+        self.start_ns = time.time_ns()
+        self._start = time.perf_counter_ns()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration_ns = time.perf_counter_ns() - self._start
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.status = 'error'
+            self.error = f"{exc_type.__name__}: {exc}"
+        _exporter.submit({
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'start_ns': self.start_ns,
+            'duration_ms': duration_ns / 1e6,
+            'pid': os.getpid(),
+            'thread': threading.current_thread().name,
+            'status': self.status,
+            'error': self.error,
+            'attributes': self.attributes
+        })
+        return False
+
+class _Exporter:
+    """Buffers finished spans and appends them to the trace file from a daemon thread"""
+
+    def __init__(self):
+        self.path = None
+        self.fd = None
+        self.queue = None
+        self.thread = None
+        self.dropped = 0
+        self.lock = threading.Lock()
+
+    def start(self, path):
+        with self.lock:
+            if self.thread is not None:
+                return
+            self.path = path
+            self.queue = queue.Queue(maxsize=QUEUE_SIZE)
+            self.thread = threading.Thread(target=self._run, name='trace-exporter', daemon=True)
+            self.thread.start()
+            atexit.register(self.shutdown)
+
+    def submit(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # Never block the traced code; losing spans is preferable
+            self.dropped += 1
+
+    def _write(self, record):
+        line = json.dumps(record, default=str) + '\n'
+        if len(line.encode('utf-8')) > MAX_RECORD_BYTES:
+            error = record.get('error')
+            line = json.dumps(dict(record, attributes={}, error=error and error[:1024], truncated=True), default=str) + '\n'
+        try:
+            if self.fd is None:
+                self.fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, 'O_CLOEXEC', 0), 0o644)
+            os.write(self.fd, line.encode('utf-8'))
+        except OSError as e:
+            logging.debug(f"Failed to write span to {self.path}: {str(e)}")
+
+    def _run(self):
+        while True:
+            record = self.queue.get()
+            if record is None:
+                # Spans that finished while shutting down are still written
+                while True:
+                    try:
+                        record = self.queue.get_nowait()
+                    except queue.Empty:
+                        return
+                    if record is not None:
+                        self._write(record)
+            self._write(record)
+
+    def shutdown(self, timeout=5):
+        if self.thread is None:
+            return
+        deadline = time.monotonic() + timeout
+        # The sentinel waits its turn behind every queued span, however full the queue is
+        while self.thread.is_alive():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                self.queue.put(None, timeout=min(remaining, 0.1))
+                break
+            except queue.Full:
+                continue
+        self.thread.join(max(0, deadline - time.monotonic()))
+
+_exporter = _Exporter()
+_enabled = False
+_parent_from_env = None
+
+def configure(trace_file=None):
+    """Enable tracing to trace_file (default: $INITIALIZER_TRACE_FILE)"""
+    global _enabled, _parent_from_env
+    trace_file = trace_file or os.environ.get(TRACE_FILE_ENV)
+    if not trace_file:
+        return False
+
+    os.environ[TRACE_FILE_ENV] = trace_file
+    _parent_from_env = parse_traceparent(os.environ.get(TRACEPARENT_ENV))
+    _exporter.start(trace_file)
+    _enabled = True
+    return True
+
+def is_enabled():
+    return _enabled
+
+def parse_traceparent(value):
+    """Parse a traceparent value into (trace_id, span_id), or None"""
+    if not value:
+        return None
+    parts = value.strip().split('-')
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    return parts[1], parts[2]
+
+def span(name, **attributes):
+    """Context manager timing an operation as a child of the current span"""
+    if not _enabled:
+        return _NOOP_SPAN
+    parent = _current_span.get()
+    if parent is not None:
+        return Span(name, parent.trace_id, parent.span_id, attributes)
+    if _parent_from_env:
+        return Span(name, _parent_from_env[0], _parent_from_env[1], attributes)
+    return Span(name, os.urandom(16).hex(), None, attributes)
+
+def traced(name=None):
+    """Decorator wrapping each call of a function in a span"""
+    def decorator(fn):
+        span_name = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with span(span_name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def current_traceparent():
+    """traceparent value for the current span, or None"""
+    current = _current_span.get()
+    if current is not None:
+        return current.traceparent()
+    if _parent_from_env:
+        return f"00-{_parent_from_env[0]}-{_parent_from_env[1]}-01"
+    return None
+
+def child_env(env=None):
+    """Environment for a child process that continues the current trace"""
+    if not _enabled:
+        return env
+    env = dict(os.environ if env is None else env)
+    traceparent = current_traceparent()
+    if traceparent:
+        env[TRACEPARENT_ENV] = traceparent
+    return env
+
+def inject_headers(headers=None):
+    """HTTP headers carrying the current trace context"""
+    headers = dict(headers or {})
+    if _enabled:
+        traceparent = current_traceparent()
+        if traceparent:
+            headers['traceparent'] = traceparent
+    return headers
+
+def traced_run(args, **kwargs):
+    """subprocess.run inside a span, passing trace context to the child"""
+    import subprocess
+    if not _enabled:
+        return subprocess.run(args, **kwargs)
+    command = args if isinstance(args, str) else ' '.join(str(a) for a in args)
+    with span('subprocess', command=command) as s:
+        kwargs['env'] = child_env(kwargs.get('env'))
+        result = subprocess.run(args, **kwargs)
+        s.set_attribute('returncode', result.returncode)
+        return result
+
+def summarize_trace_file(path):
+    """Summarize a trace file: per trace, its root spans and slowest spans"""
+    traces = {}
+    skipped = 0
+    with open(path, 'r') as f:
+        for line in f:
+            # A line cut short by a crash or a foreign writer is skipped, not fatal
+            try:
+                record = json.loads(line)
+                if not isinstance(record, dict) or not all(key in record for key in SPAN_KEYS):
+                    raise ValueError("missing span fields")
+            except (ValueError, TypeError):
+                skipped += 1
+                continue
+            traces.setdefault(record['trace_id'], []).append(record)
+    if skipped:
+        logging.warning(f"Skipped {skipped} malformed lines in {path}")
+
+    summary = {}
+    for trace_id, spans in traces.items():
+        span_ids = {s['span_id'] for s in spans}
+        roots = [s for s in spans if s['parent_id'] not in span_ids]
+        slowest = sorted(spans, key=lambda s: s['duration_ms'], reverse=True)[:10]
+        summary[trace_id] = {
+            'spans': len(spans),
+            'processes': len({s['pid'] for s in spans}),
+            'errors': sum(1 for s in spans if s['status'] == 'error'),
+            'roots': [{'name': s['name'], 'duration_ms': round(s['duration_ms'], 3)} for s in roots],
+            'slowest': [{'name': s['name'], 'pid': s['pid'], 'duration_ms': round(s['duration_ms'], 3)} for s in slowest]
+        }
+    return summary
+
+# Tracing switches on for any process started with INITIALIZER_TRACE_FILE set
+configure()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    exit(main())
@@ -0,0 +1,181 @@
+import os
+import socket
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+import agent_channel
+from agent_channel import AgentChannel, EchoHandler, EchoServer
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("Condition not met in time")
+        time.sleep(0.01)
+
+class TestAgentChannel(unittest.TestCase):
+
+    def setUp(self):
+        self.server = EchoServer(('127.0.0.1', 0))
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.url = f"ws://127.0.0.1:{self.server.server_address[1]}"
+
+    def open_channel(self):
+        channel = AgentChannel(self.url, heartbeat_interval=0.5, heartbeat_timeout=5)
+        channel.connect()
+        self.addCleanup(channel.close)
+        return channel
+
+    def drop_connection(self, channel):
+        """Kill the socket under the channel, as a network failure would"""
+        disconnects = channel.metrics()['disconnects']
+        channel._ws.sock.shutdown(socket.SHUT_RDWR)
+        wait_until(lambda: channel.metrics()['disconnects'] > disconnects)
+
+    def test_request_response(self):
+        channel = self.open_channel()
+        self.assertEqual(channel.request('echo', {'a': [1, 2]}), {'a': [1, 2]})
+        requests = [channel.send_request('echo', i) for i in range(50)]
+        self.assertEqual([request.wait(5) for request in requests], list(range(50)))
+        with self.assertRaises(RuntimeError):
+            channel.request('missing', timeout=5)
+
+        metrics = channel.metrics()
+        self.assertEqual((metrics['requests'], metrics['errors'], metrics['in_flight']), (52, 1, 0))
+
+    def test_unanswered_request_is_resent_after_disconnect(self):
+        channel = self.open_channel()
+        request = channel.send_request('sleep', 0.3)
+        self.drop_connection(channel)
+
+        self.assertEqual(request.wait(10), {'slept': 0.3})
+        self.assertEqual(channel.metrics()['connects'], 2)
+
+    def test_stream_resumes_after_last_seq(self):
+        for i in range(3):
+            self.server.publish('events', i)
+        received = []
+        channel = self.open_channel()
+        # start=0 asks for the whole history
+        channel.subscribe('events', lambda data, seq: received.append((seq, data)), start=0)
+        wait_until(lambda: len(received) == 3)
+
+        # Hold the reconnect until pushes have been missed
+        reconnect = threading.Event()
+        connect_websocket = agent_channel.connect_websocket
+
+        def delayed_connect(*args, **kwargs):
+            reconnect.wait(5)
+            return connect_websocket(*args, **kwargs)
+
+        with patch.object(agent_channel, 'connect_websocket', side_effect=delayed_connect):
+            self.drop_connection(channel)
+            for i in range(3, 5):
+                self.server.publish('events', i)
+            reconnect.set()
+            wait_until(lambda: len(received) >= 5)
+
+        self.server.publish('events', 5)
+        wait_until(lambda: len(received) >= 6)
+        self.assertEqual(received, [(i + 1, i) for i in range(6)])
+
+class RecordingSocket:
+    """Stands in for a server-side WebSocket; send_text can be held until released"""
+
+    def __init__(self, hold=None):
+        self.sent = []
+        self.hold = hold
+        self.sending = threading.Event()
+
+    def send_text(self, text):
+        self.sending.set()
+        if self.hold is not None:
+            self.hold.wait(5)
+        self.sent.append(text)
+
+class TestEchoServer(unittest.TestCase):
+
+    def setUp(self):
+        self.server = EchoServer(('127.0.0.1', 0))
+        self.addCleanup(self.server.server_close)
+
+    def handler(self, session):
+        handler = EchoHandler.__new__(EchoHandler)
+        handler.server = self.server
+        handler.cache = self.server.session_cache(session)
+        handler.ws = RecordingSocket()
+        return handler
+
+    def test_resent_request_runs_once(self):
+        calls = []
+        release = threading.Event()
+
+        def run_method(handler, method, params):
+            calls.append(method)
+            release.wait(5)
+            return params
+
+        first, resent = self.handler('s'), self.handler('s')
+        message = {'type': 'request', 'id': 1, 'method': 'echo', 'params': 'x'}
+        with patch.object(EchoHandler, 'run_method', run_method):
+            threads = [threading.Thread(target=h.handle_request, args=(message,)) for h in (first, resent)]
+            threads[0].start()
+            wait_until(lambda: calls)
+            threads[1].start()
+            time.sleep(0.05)
+            release.set()
+            for thread in threads:
+                thread.join(5)
+        self.assertEqual(calls, ['echo'])
+        self.assertEqual(first.ws.sent, resent.ws.sent)
+        self.assertEqual(len(first.ws.sent), 1)
+
+    def test_sessions_are_bounded(self):
+        with patch.object(agent_channel, 'SESSION_LIMIT', 3):
+            first = self.server.session_cache('s0')
+            for i in range(1, 4):
+                self.server.session_cache(f"s{i}")
+            self.assertEqual(list(self.server.sessions), ['s1', 's2', 's3'])
+            # Resuming a session keeps it
+            self.server.session_cache('s1')
+            self.server.session_cache('s4')
+            self.assertEqual(list(self.server.sessions), ['s3', 's1', 's4'])
+        self.assertIsNot(self.server.session_cache('s0'), first)
+
+    def test_slow_subscriber_does_not_block_the_server(self):
+        release = threading.Event()
+        slow = RecordingSocket(hold=release)
+        self.server.subscribe('slow', slow)
+        publisher = threading.Thread(target=self.server.publish, args=('slow', 1))
+        publisher.start()
+        self.addCleanup(release.set)
+        self.assertTrue(slow.sending.wait(5))
+
+        # Other streams and subscribers proceed while the push is stuck
+        fast = RecordingSocket()
+
+        def other_stream():
+            self.server.subscribe('fast', fast)
+            self.server.publish('fast', 'x')
+            self.server.unsubscribe(fast)
+
+        other = threading.Thread(target=other_stream)
+        other.start()
+        other.join(2)
+        self.assertFalse(other.is_alive())
+        self.assertFalse(release.is_set())
+        self.assertEqual(len(fast.sent), 1)
+
+        release.set()
+        publisher.join(5)
+        self.assertEqual(len(slow.sent), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import hashlib
+import os
+import stat
+import sys
+import tarfile
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+import bootstrap_browser
+from bootstrap_browser import detect_browser, find_browser_candidates, get_installed_engines, install_from_mirror
+
+def write_executable(path, body):
+    with open(path, 'w') as f:
+        f.write(f"#!/bin/sh\n{body}\n")
+    os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR)
+    return path
+
+class BrowserTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = Path(self.tmp.name)
+        patcher = patch.object(bootstrap_browser, 'get_detection_cache_path',
+                               return_value=self.root / 'cache' / 'browsers.json')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache_dir = self.root / 'ms-playwright'
+        env = patch.dict(os.environ, {'PLAYWRIGHT_BROWSERS_PATH': str(self.cache_dir)})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def expect_revisions(self, revisions):
+        patcher = patch.object(bootstrap_browser, 'get_expected_revisions', return_value=revisions)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make_build(self, name, complete=True):
+        chrome = self.cache_dir / name / 'chrome-linux' / 'chrome'
+        chrome.parent.mkdir(parents=True)
+        write_executable(chrome, f'echo "{name}"')
+        if complete:
+            (self.cache_dir / name / 'INSTALLATION_COMPLETE').touch()
+        return chrome
+
+class TestDetectBrowser(BrowserTestCase):
+
+    def detect(self, candidates):
+        probe = bootstrap_browser.probe_browser
+        with patch.object(bootstrap_browser, 'find_browser_candidates', return_value=candidates), \
+             patch.object(bootstrap_browser, 'probe_browser', wraps=probe) as probes:
+            return detect_browser(), probes.call_count
+
+    def test_working_browser_is_cached(self):
+        chrome = write_executable(self.root / 'chrome', 'echo "Chrome 120"')
+        detected, probes = self.detect([('chrome', str(chrome))])
+        self.assertEqual(detected['version'], 'Chrome 120')
+        self.assertEqual(probes, 1)
+        self.assertEqual(self.detect([('chrome', str(chrome))]), (detected, 0))
+
+    def test_failed_probe_expires(self):
+        chrome = write_executable(self.root / 'chrome', 'exit 1')
+        self.assertEqual(self.detect([('chrome', str(chrome))]), (None, 1))
+        # Trusted only briefly: not re-probed right away...
+        self.assertEqual(self.detect([('chrome', str(chrome))]), (None, 0))
+
+        # ...but once the TTL passes a browser that has started working is found
+        write_executable(self.root / 'fixed', 'echo "Chrome 120"')
+        os.utime(self.root / 'fixed', ns=(os.stat(chrome).st_mtime_ns,) * 2)
+        os.replace(self.root / 'fixed', chrome)
+        with patch.object(bootstrap_browser, 'NEGATIVE_CACHE_TTL', 0):
+            detected, probes = self.detect([('chrome', str(chrome))])
+        self.assertEqual((detected['version'], probes), ('Chrome 120', 1))
+
+    def test_changed_binary_is_probed_again(self):
+        chrome = write_executable(self.root / 'chrome', 'echo "Chrome 120"')
+        self.detect([('chrome', str(chrome))])
+        write_executable(chrome, 'echo "Chrome 121"')
+        os.utime(chrome, ns=(1, 1))
+        detected, probes = self.detect([('chrome', str(chrome))])
+        self.assertEqual((detected['version'], probes), ('Chrome 121', 1))
+
+class TestPlaywrightBuilds(BrowserTestCase):
+
+    def test_newest_revision_is_preferred(self):
+        self.make_build('chromium-999')
+        newest = self.make_build('chromium-1100')
+        with patch.object(bootstrap_browser, 'BROWSER_CANDIDATES', []):
+            self.assertEqual(find_browser_candidates()[0], ('chromium', str(newest)))
+
+    def test_only_expected_revision_counts_as_installed(self):
+        self.make_build('chromium-1091')
+        self.make_build('firefox-1429', complete=False)
+        self.expect_revisions({'chromium': '1100'})
+        self.assertEqual(get_installed_engines(), set())
+
+        self.make_build('chromium-1100')
+        self.assertEqual(get_installed_engines(), {'chromium'})
+
+    def test_any_revision_counts_without_playwright_metadata(self):
+        self.make_build('chromium-1091')
+        self.expect_revisions({})
+        self.assertEqual(get_installed_engines(), {'chromium'})
+
+    def test_wrapped_tarball_mirror_installs_expected_revision(self):
+        mirror = self.root / 'src' / 'mirror'
+        mirror.mkdir(parents=True)
+        sums = []
+        for build in ['chromium-1091', 'chromium-1100']:
+            archive = mirror / f"{build}.tar.gz"
+            chrome = self.root / 'src' / build / 'chrome-linux' / 'chrome'
+            chrome.parent.mkdir(parents=True)
+            write_executable(chrome, f'echo "{build}"')
+            with tarfile.open(archive, 'w:gz') as tar:
+                tar.add(chrome.parent, arcname='chrome-linux')
+            sums.append(f"{hashlib.sha256(archive.read_bytes()).hexdigest()}  {archive.name}\n")
+        (mirror / 'SHA256SUMS').write_text(''.join(sums))
+        tarball = self.root / 'mirror.tar.gz'
+        with tarfile.open(tarball, 'w:gz') as tar:
+            tar.add(mirror, arcname='mirror')
+
+        self.expect_revisions({'chromium': '1091'})
+        self.assertTrue(install_from_mirror(['chromium'], str(tarball)))
+        self.assertTrue((self.cache_dir / 'chromium-1091' / 'chrome-linux' / 'chrome').exists())
+        self.assertFalse((self.cache_dir / 'chromium-1100').exists())
+        self.assertEqual(get_installed_engines(), {'chromium'})
+
+if __name__ == '__main__':
+    unittest.main()
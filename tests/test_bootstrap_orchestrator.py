@@ -0,0 +1,79 @@
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+import bootstrap_orchestrator
+from bootstrap_orchestrator import run_stages
+
+def stage(result=None, error=None, seconds=0.0):
+    def run(deps):
+        time.sleep(seconds)
+        if error:
+            raise RuntimeError(error)
+        return {'result': result, 'deps': deps}
+    return run
+
+class TestRunStages(unittest.TestCase):
+
+    def test_dependents_receive_results(self):
+        report = run_stages({
+            'a': (stage('a'), []),
+            'b': (stage('b', seconds=0.1), []),
+            'c': (stage('c'), ['a', 'b'])
+        })
+        self.assertEqual(report['status'], 'success')
+        self.assertEqual(report['stages']['c']['result']['deps'], {
+            'a': {'result': 'a', 'deps': {}},
+            'b': {'result': 'b', 'deps': {}}
+        })
+        self.assertEqual(report['critical_path']['stages'], ['b', 'c'])
+
+    def test_failure_skips_only_dependents(self):
+        report = run_stages({
+            'a': (stage(error='boom'), []),
+            'b': (stage('b'), []),
+            'c': (stage('c'), ['a']),
+            'd': (stage('d'), ['c'])
+        })
+        statuses = {name: entry['status'] for name, entry in report['stages'].items()}
+        self.assertEqual(statuses, {'a': 'failed', 'b': 'success', 'c': 'skipped', 'd': 'skipped'})
+        self.assertEqual(report['stages']['a']['error'], 'boom')
+        self.assertEqual(report['status'], 'failed')
+
+    def test_unknown_dependency_rejected(self):
+        with self.assertRaises(ValueError):
+            run_stages({'a': (stage(), ['missing'])})
+
+class TestMain(unittest.TestCase):
+
+    def run_main(self, *argv):
+        def chatty(args, results):
+            print("stage chatter")
+            return {'timeout': getattr(args, 'external_timeout', None)}
+
+        stdout = io.StringIO()
+        with patch.object(sys, 'argv', ['bootstrap_orchestrator.py', '--skip-browser'] + list(argv)), \
+             patch.object(bootstrap_orchestrator, 'permissions_stage', chatty), \
+             patch.object(bootstrap_orchestrator, 'framework_stage', chatty), \
+             patch.object(bootstrap_orchestrator, 'external_stage', chatty), \
+             contextlib.redirect_stdout(stdout), \
+             contextlib.redirect_stderr(io.StringIO()) as stderr:
+            code = bootstrap_orchestrator.main()
+        return code, stdout.getvalue(), stderr.getvalue()
+
+    def test_stdout_carries_only_the_report(self):
+        code, stdout, stderr = self.run_main('--agent', 'external', '--external-timeout', '5')
+        self.assertEqual(code, 0)
+        report = json.loads(stdout)
+        self.assertEqual(report['stages']['external']['result'], {'timeout': 5})
+        self.assertEqual(stderr.count("stage chatter"), 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,166 @@
+import os
+import stat
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from browser_pool import BrowserPool, PendingBrowser
+
+# Answers the DevTools HTTP endpoints the pool uses and announces itself like Chromium
+STUB_BROWSER = '''#!{python}
+import json, sys
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+class Handler(BaseHTTPRequestHandler):
+    def reply(self):
+        body = json.dumps({{'id': 'page', 'webSocketDebuggerUrl': 'ws://stub/page'}}).encode()
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    do_GET = do_PUT = reply
+    def log_message(self, *args):
+        pass
+
+server = HTTPServer(('127.0.0.1', 0), Handler)
+print(f"DevTools listening on ws://127.0.0.1:{{server.server_address[1]}}/devtools/browser/stub", file=sys.stderr, flush=True)
+server.serve_forever()
+'''
+
+# Starts slowly and exits without announcing a DevTools endpoint
+FAILING_BROWSER = '''#!{python}
+import time
+time.sleep(0.5)
+'''
+
+def write_executable(path, source):
+    with open(path, 'w') as f:
+        f.write(source.format(python=sys.executable))
+    os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR)
+    return path
+
+def lease_concurrently(pool, count, timeout):
+    results = []
+    lock = threading.Lock()
+
+    def worker():
+        try:
+            outcome = pool.lease(timeout=timeout)
+        except BaseException as e:
+            outcome = e
+        with lock:
+            results.append(outcome)
+
+    threads = [threading.Thread(target=worker) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+class TestBrowserPool(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.stub_browser = write_executable(os.path.join(self.tmp.name, 'stub-browser'), STUB_BROWSER)
+        self.failing_browser = write_executable(os.path.join(self.tmp.name, 'failing-browser'), FAILING_BROWSER)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def start_pool(self, executable, **options):
+        pool = BrowserPool(executable, health_interval=3600, **options)
+        pool.start()
+        self.addCleanup(pool.stop)
+        return pool
+
+    def test_concurrent_leases_respect_per_process_limit(self):
+        pool = self.start_pool(self.stub_browser, min_size=1, max_size=1, leases_per_process=2, max_uses=10)
+        results = lease_concurrently(pool, 6, timeout=1)
+        leased = [r for r in results if isinstance(r, dict)]
+        self.assertEqual(len(leased), 2)
+        self.assertTrue(all(isinstance(r, TimeoutError) for r in results if not isinstance(r, dict)))
+        browser = pool.browsers[0]
+        self.assertEqual(len(browser.leases), 2)
+        self.assertEqual(browser.uses, 2)
+
+    def test_concurrent_leases_respect_max_uses(self):
+        pool = self.start_pool(self.stub_browser, min_size=1, max_size=1, leases_per_process=8, max_uses=3)
+        results = lease_concurrently(pool, 6, timeout=1)
+        self.assertEqual(len([r for r in results if isinstance(r, dict)]), 3)
+        self.assertEqual(pool.browsers[0].uses, 3)
+
+    def test_failed_open_page_rolls_back_reservation(self):
+        pool = self.start_pool(self.stub_browser, min_size=1, max_size=1, leases_per_process=1)
+        browser = pool.browsers[0]
+        with patch.object(browser, 'open_page', side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                pool.lease(timeout=1)
+        self.assertEqual(browser.leases, set())
+        self.assertEqual(browser.uses, 0)
+        self.assertEqual(pool.leases, {})
+
+        lease = pool.lease(timeout=1)
+        self.assertEqual(lease['browser_id'], browser.id)
+        self.assertTrue(pool.release(lease['lease_id']))
+
+    def test_release_makes_slot_available(self):
+        pool = self.start_pool(self.stub_browser, min_size=1, max_size=1, leases_per_process=1)
+        first = pool.lease(timeout=1)
+        threading.Timer(0.2, pool.release, args=(first['lease_id'],)).start()
+        second = pool.lease(timeout=5)
+        self.assertEqual(second['browser_id'], first['browser_id'])
+
+    def test_spawn_failure_wakes_waiters(self):
+        pool = BrowserPool(self.failing_browser, min_size=0, max_size=1, health_interval=3600)
+        started = time.monotonic()
+        results = lease_concurrently(pool, 2, timeout=10)
+        elapsed = time.monotonic() - started
+
+        # The waiter retries the freed slot itself instead of sleeping until its timeout
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in results))
+        self.assertLess(elapsed, 5)
+        self.assertEqual(pool.browsers, [])
+
+    def test_stop_during_spawn(self):
+        pool = BrowserPool(self.stub_browser, min_size=0, max_size=1, health_interval=3600)
+        spawned = []
+
+        def spawn_after_stop():
+            pool.stop()
+            spawned.append(BrowserPool._spawn(pool))
+            return spawned[-1]
+
+        with patch.object(pool, '_spawn', side_effect=spawn_after_stop):
+            with self.assertRaisesRegex(RuntimeError, 'stopped'):
+                pool.lease(timeout=1)
+        # The browser started for the abandoned slot is not leaked
+        self.assertIsNotNone(spawned[0].process.poll())
+        self.assertEqual(pool.browsers, [])
+
+    def test_expired_lease_is_reclaimed(self):
+        pool = self.start_pool(self.stub_browser, min_size=1, max_size=1, leases_per_process=1, lease_ttl=0.5)
+        kept = pool.lease(timeout=1)
+        time.sleep(0.3)
+        self.assertTrue(pool.renew(kept['lease_id']))
+        time.sleep(0.3)
+        self.assertEqual(pool.reclaim_expired(), 0)
+
+        time.sleep(0.5)
+        self.assertEqual(pool.reclaim_expired(), 1)
+        self.assertFalse(pool.renew(kept['lease_id']))
+        self.assertEqual(pool.lease(timeout=1)['browser_id'], kept['browser_id'])
+
+    def test_status_skips_starting_browsers(self):
+        pool = self.start_pool(self.stub_browser, min_size=1, max_size=2)
+        with pool.lock:
+            pool.browsers.append(PendingBrowser())
+        self.assertEqual(len(pool.status()['browsers']), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from create_sandboxed_agent import create_sandboxed_agent
+
+class TestCreateSandboxedAgent(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        home = patch.dict(os.environ, {'HOME': self.tmp.name})
+        home.start()
+        self.addCleanup(home.stop)
+        self.sandbox = os.path.join(self.tmp.name, 'sandbox')
+
+    def write_template(self, content):
+        path = os.path.join(self.tmp.name, 'template.json')
+        with open(path, 'w') as f:
+            f.write(content if isinstance(content, str) else json.dumps(content))
+        return path
+
+    def create(self, template):
+        return create_sandboxed_agent('alpha', 'web,file', None, self.sandbox, template, True)
+
+    def test_template_cannot_override_owned_keys(self):
+        template = self.write_template({
+            'capabilities': ['shell'],
+            'sandbox': {'enabled': False, 'mounts': ['/']},
+            'security': {'permission_model': 'open'},
+            'brain': {'type': 'specialized'},
+            'tools': ['search']
+        })
+        agent = self.create(template)['agent']
+
+        self.assertEqual(agent['capabilities'], ['web', 'file'])
+        # Owned keys are replaced outright, not merged with the template's additions
+        self.assertEqual(agent['sandbox'], {'enabled': True, 'path': self.sandbox, 'isolation_level': 'high'})
+        self.assertEqual(agent['security']['permission_model'], 'restricted')
+        self.assertEqual((agent['brain'], agent['tools']), ({'type': 'specialized', 'mode': 'sandboxed'}, ['search']))
+        with open(os.path.join(self.sandbox, 'config', 'agent.json')) as f:
+            self.assertEqual(json.load(f), agent)
+
+    def test_bad_template_creates_nothing(self):
+        for content in ['{"name": ', '["not", "an", "object"]']:
+            with self.assertRaises(ValueError):
+                self.create(self.write_template(content))
+            self.assertFalse(os.path.exists(self.sandbox))
+        with self.assertRaises(ValueError):
+            self.create('no-such-template')
+        self.assertFalse(os.path.exists(self.sandbox))
+
+if __name__ == '__main__':
+    unittest.main()
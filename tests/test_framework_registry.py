@@ -0,0 +1,84 @@
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+import framework_registry
+from framework_registry import get_framework_registry, normalize_declaration
+
+class TestFrameworkRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        patcher = patch.multiple(framework_registry, PLUGIN_DIR=self.tmp.name, _registry=None,
+                                 _entry_point_declarations=[])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def write_plugin(self, name, content):
+        with open(os.path.join(self.tmp.name, name), 'w') as f:
+            json.dump(content, f)
+
+    def test_plugin_is_registered(self):
+        self.write_plugin('good.json', {'name': 'good', 'detect': {'module': 'good'},
+                                        'compatibility': {'openclaw': 'Via MCP'}})
+        registry = get_framework_registry()
+        self.assertIn('good', registry.names)
+        self.assertTrue(registry.is_compatible('good', 'openclaw'))
+        self.assertEqual(registry.get('good')['dependencies']['core'], [])
+
+    def test_malformed_plugins_are_skipped(self):
+        self.write_plugin('bad.json', [
+            {'name': 'detailed', 'capabilities_detailed': ['agent_management']},
+            {'name': 'entry', 'capabilities_detailed': {'agent_management': True}},
+            {'name': 'deps', 'dependencies': {'core': 'python'}},
+            {'name': 'detect', 'detect': {'command': 'tool --version'}},
+            {'name': 'compat', 'compatibility': ['openclaw']},
+            {'name': 'caps', 'capabilities': 'agents'},
+            {'name': 'good'}
+        ])
+        with self.assertLogs(level='WARNING') as logs:
+            registry = get_framework_registry()
+        self.assertEqual(len(logs.records), 6)
+        self.assertEqual(registry.names, ['openclaw', 'langchain', 'crewai', 'good'])
+
+    def test_plugin_listing_is_throttled(self):
+        self.write_plugin('good.json', {'name': 'good'})
+        with patch.object(framework_registry, 'list_plugin_files', wraps=framework_registry.list_plugin_files) as listings, \
+             patch.object(framework_registry, 'normalize_declaration', wraps=normalize_declaration) as normalized:
+            registry = get_framework_registry()
+            for _ in range(3):
+                self.assertIs(get_framework_registry(), registry)
+        self.assertEqual(listings.call_count, 1)
+        # Three built-ins and the plugin, each normalized once
+        self.assertEqual(normalized.call_count, 4)
+
+    def test_plugin_changes_are_picked_up(self):
+        self.write_plugin('good.json', {'name': 'good'})
+        get_framework_registry()
+        # Let the coarse filesystem clock move on
+        time.sleep(0.05)
+
+        # A new file changes the directory mtime and is seen at once
+        self.write_plugin('other.json', {'name': 'other'})
+        self.assertIn('other', get_framework_registry().names)
+
+        # An edit in place waits for the next full listing
+        time.sleep(0.05)
+        self.write_plugin('good.json', {'name': 'renamed'})
+        self.assertIn('good', get_framework_registry().names)
+        with patch.object(framework_registry, 'RECHECK_INTERVAL', 0):
+            self.assertEqual(get_framework_registry().names[-2:], ['renamed', 'other'])
+
+    def test_normalize_rejects_bad_detail_types(self):
+        with self.assertRaises(ValueError):
+            normalize_declaration({'name': 'x', 'capabilities_detailed': {'memory_management': {'supported': 'yes'}}})
+
+if __name__ == '__main__':
+    unittest.main()
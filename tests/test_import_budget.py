@@ -0,0 +1,80 @@
+import os
+import subprocess
+import sys
+import unittest
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts')
+INITIALIZER = os.path.join(SCRIPTS_DIR, 'initializer.py')
+
+sys.path.insert(0, SCRIPTS_DIR)
+
+from initializer import COMMANDS
+
+# Import time allowed on top of bare interpreter startup, in milliseconds
+IMPORT_BUDGET_MS = float(os.environ.get('INITIALIZER_IMPORT_BUDGET_MS', 50))
+RUNS = 5
+
+def import_profile(command):
+    """Run a command under -X importtime: ({module: cumulative us}, {top-level module: cumulative us})"""
+    env = dict(os.environ)
+    env.pop('INITIALIZER_TRACE_FILE', None)
+    # Budget warm starts: let the first run cache bytecode for the ones that count
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime'] + list(command),
+        capture_output=True, text=True, env=env, timeout=60
+    )
+    modules = {}
+    top_level = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line.split('|', 2)
+        cumulative = int(cumulative_us.strip())
+        modules[name.strip()] = cumulative
+        # Top-level entries (no indentation) already include their nested imports
+        if not name[1:].startswith(' '):
+            top_level[name.strip()] = cumulative
+    return modules, top_level
+
+STARTUP_MODULES = set(import_profile(['-c', 'pass'])[1])
+
+def best_profile(args):
+    """Modules imported and the fastest total import time (us) past startup over several runs"""
+    totals = []
+    for _ in range(RUNS):
+        modules, top_level = import_profile([INITIALIZER] + list(args))
+        totals.append(sum(us for name, us in top_level.items() if name not in STARTUP_MODULES))
+    # The fastest run keeps scheduler noise out of the budget
+    return modules, min(totals)
+
+class TestImportBudget(unittest.TestCase):
+
+    def assert_within_budget(self, args, forbidden=()):
+        modules, total = best_profile(args)
+        self.assertLess(total / 1000, IMPORT_BUDGET_MS,
+                        f"'initializer {' '.join(args)}' spent {total / 1000:.1f}ms importing")
+        for module in forbidden:
+            self.assertFalse(module in modules, f"'initializer {' '.join(args)}' imported {module}")
+
+    def test_top_level_help(self):
+        script_modules = [module for module, _ in COMMANDS.values()]
+        self.assert_within_budget(['--help'], forbidden=['argparse', *script_modules])
+
+    def test_sandbox_help(self):
+        self.assert_within_budget(['sandbox', '--help'], forbidden=['sqlite3', 'sandbox_registry'])
+
+    def test_external_help(self):
+        self.assert_within_budget(['external', '--help'], forbidden=['requests', 'agent_channel', 'sync_log'])
+
+    def test_registry_help(self):
+        self.assert_within_budget(['registry', '--help'])
+
+    def test_quota_help(self):
+        self.assert_within_budget(['quota', '--help'])
+
+    def test_trace_help(self):
+        self.assert_within_budget(['trace', '--help'], forbidden=['subprocess'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+import copy
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from merge_agents import SubtreeHasher, merge_documents, merge_jsonl_files
+
+def nested(depth, leaf):
+    """{'level': {'level': ... {'value': leaf}}} with depth dict levels"""
+    node = {'value': leaf}
+    for _ in range(depth):
+        node = {'level': node, 'name': 'x'}
+    return node
+
+def deepest(node):
+    while 'level' in node:
+        node = node['level']
+    return node
+
+class TestSubtreeHasher(unittest.TestCase):
+
+    def test_digests_are_keyed_by_container(self):
+        inner = {'c': [1, 2]}
+        doc = {'a': inner, 'b': 'x'}
+        hasher = SubtreeHasher()
+        hasher.digest(doc)
+        self.assertEqual(set(hasher.digests), {id(doc), id(inner), id(inner['c'])})
+
+    def test_memo_hits_for_hashed_subtrees(self):
+        doc = nested(50, 'leaf')
+        hasher = SubtreeHasher()
+        digest = hasher.digest(doc)
+        with patch('merge_agents.hashlib.blake2b', wraps=hashlib.blake2b) as blake2b:
+            self.assertEqual(hasher.digest(doc), digest)
+            self.assertEqual(hasher.digest(doc['level']['level']), hasher.digests[id(doc['level']['level'])])
+        blake2b.assert_not_called()
+
+    def test_equal_structures_hash_equal(self):
+        hasher = SubtreeHasher()
+        self.assertEqual(hasher.digest({'a': [1, {'b': None}]}), hasher.digest({'a': [1, {'b': None}]}))
+        self.assertNotEqual(hasher.digest({'a': 1}), hasher.digest({'a': '1'}))
+        self.assertNotEqual(hasher.digest({'ab': 'c'}), hasher.digest({'a': 'bc'}))
+
+    def test_deep_tree_hashes(self):
+        hasher = SubtreeHasher()
+        self.assertEqual(len(hasher.digest(nested(20000, 1))), 16)
+
+class TestMergeDocuments(unittest.TestCase):
+
+    def test_non_overlapping_changes_merge(self):
+        base = {'name': 'agent', 'settings': {'timeout': 30, 'retries': 3}, 'capabilities': ['web', 'file']}
+        ours = copy.deepcopy(base)
+        ours['settings']['timeout'] = 60
+        ours['capabilities'].append('shell')
+        theirs = copy.deepcopy(base)
+        theirs['settings']['retries'] = 5
+        theirs['capabilities'].remove('file')
+        del theirs['name']
+
+        merged, conflicts = merge_documents(base, ours, theirs)
+        self.assertEqual(conflicts, [])
+        self.assertEqual(merged, {'settings': {'timeout': 60, 'retries': 5}, 'capabilities': ['web', 'shell']})
+
+    def test_keyed_lists_merge_by_id(self):
+        base = {'steps': [{'id': 'a', 'run': 1}, {'id': 'b', 'run': 2}]}
+        ours = {'steps': [{'id': 'a', 'run': 10}, {'id': 'b', 'run': 2}]}
+        theirs = {'steps': [{'id': 'a', 'run': 1}, {'id': 'c', 'run': 3}]}
+
+        merged, conflicts = merge_documents(base, ours, theirs)
+        self.assertEqual(conflicts, [])
+        self.assertEqual(merged, {'steps': [{'id': 'a', 'run': 10}, {'id': 'c', 'run': 3}]})
+
+    def test_conflicts_keep_ours_in_document_order(self):
+        base = {'a': 1, 'b': {'c': 1}, 'd': 1}
+        ours = {'a': 2, 'b': {'c': 2}, 'd': 2}
+        theirs = {'a': 3, 'b': {'c': 3}}
+
+        merged, conflicts = merge_documents(base, ours, theirs)
+        self.assertEqual(merged, ours)
+        self.assertEqual([(c['path'], c['reason']) for c in conflicts],
+                         [('/a', 'modify/modify'), ('/b/c', 'modify/modify'), ('/d', 'modify/delete')])
+
+    def test_deep_trees_merge(self):
+        base = nested(5000, 0)
+        ours = nested(5000, 0)
+        theirs = nested(5000, 0)
+        deepest(ours)['value'] = 1
+        deepest(theirs)['extra'] = True
+
+        merged, conflicts = merge_documents(base, ours, theirs)
+        self.assertEqual(conflicts, [])
+        self.assertEqual(deepest(merged), {'value': 1, 'extra': True})
+
+    def test_deep_conflict_is_reported(self):
+        base, ours, theirs = nested(3000, 0), nested(3000, 1), nested(3000, 2)
+        merged, conflicts = merge_documents(base, ours, theirs)
+        self.assertEqual(len(conflicts), 1)
+        self.assertEqual(conflicts[0]['path'], '/level' * 3000 + '/value')
+        self.assertEqual(deepest(merged)['value'], 1)
+
+    def test_each_subtree_hashed_once(self):
+        depth = 400
+        base, ours, theirs = nested(depth, 0), nested(depth, 1), nested(depth, 2)
+        with patch('merge_agents.hashlib.blake2b', wraps=hashlib.blake2b) as blake2b:
+            merge_documents(base, ours, theirs)
+        # One digest per container plus its scalar children; rehashing per level would be quadratic
+        containers = 3 * (depth + 1)
+        self.assertLess(blake2b.call_count, 4 * containers)
+
+class TestMergeJsonl(unittest.TestCase):
+
+    def write_jsonl(self, directory, name, nodes):
+        path = os.path.join(directory, name)
+        with open(path, 'w') as f:
+            for node in nodes:
+                f.write(json.dumps(node) + '\n')
+        return path
+
+    def test_streaming_merge(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            base = self.write_jsonl(tmp, 'base.jsonl', [{'id': 1, 'v': 0}, {'id': 2, 'v': 0}, {'id': 3, 'v': 0}])
+            ours = self.write_jsonl(tmp, 'ours.jsonl', [{'id': 1, 'v': 1}, {'id': 2, 'v': 0}, {'id': 3, 'v': 5}])
+            theirs = self.write_jsonl(tmp, 'theirs.jsonl', [{'id': 1, 'v': 0}, {'id': 3, 'v': 6}, {'id': 4, 'v': 0}])
+            output = os.path.join(tmp, 'merged.jsonl')
+
+            conflicts = merge_jsonl_files(base, ours, theirs, output)
+            with open(output) as f:
+                merged = [json.loads(line) for line in f]
+
+        self.assertEqual(merged, [{'id': 1, 'v': 1}, {'id': 3, 'v': 5}, {'id': 4, 'v': 0}])
+        self.assertEqual([c['path'] for c in conflicts], ['/[id=3]/v'])
+
+if __name__ == '__main__':
+    unittest.main()
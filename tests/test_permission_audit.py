@@ -0,0 +1,108 @@
+import os
+import stat
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from permission_audit import apply_entry, apply_policy, audit_tree, compile_policy, load_policy
+
+class TreeTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = os.path.join(self.tmp.name, 'tree')
+        for i in range(3):
+            os.makedirs(os.path.join(self.root, f"d{i}", 'nested'))
+            for name in ['a', 'b']:
+                path = os.path.join(self.root, f"d{i}", 'nested', name)
+                with open(path, 'w') as f:
+                    f.write(name)
+                os.chmod(path, 0o600)
+        for dirpath, dirnames, _ in os.walk(self.root):
+            os.chmod(dirpath, 0o700)
+
+    def audit(self, policy, workers=4):
+        return sorted((v['path'], v['check']) for v in audit_tree(self.root, policy, workers))
+
+class TestPermissionAudit(TreeTestCase):
+
+    def test_compliant_tree_has_no_violations(self):
+        self.assertEqual(self.audit({'dir_mode': '700', 'forbidden_bits': '077', 'owner': os.geteuid()}), [])
+
+    def test_violations_found_at_every_depth(self):
+        loose_dir = os.path.join(self.root, 'd1')
+        loose_file = os.path.join(self.root, 'd2', 'nested', 'b')
+        os.chmod(loose_dir, 0o755)
+        os.chmod(loose_file, 0o644)
+        self.assertEqual(self.audit({'dir_mode': '700', 'forbidden_bits': '077'}),
+                         [(loose_dir, 'mode'), (loose_file, 'forbidden_bits')])
+        # One worker walks the same tree to the same result
+        self.assertEqual(self.audit({'dir_mode': '700', 'forbidden_bits': '077'}, workers=1),
+                         [(loose_dir, 'mode'), (loose_file, 'forbidden_bits')])
+
+    def test_owner_and_symlinks(self):
+        os.symlink('/etc/passwd', os.path.join(self.root, 'link'))
+        violations = self.audit({'owner': os.geteuid() + 1})
+        # Symlinks are never reported; everything else has the wrong owner
+        self.assertEqual(len(violations), 1 + 3 * 4)
+        self.assertNotIn((os.path.join(self.root, 'link'), 'owner'), violations)
+
+    def test_policy_from_security_config(self):
+        os.makedirs(os.path.join(self.root, 'config'))
+        with open(os.path.join(self.root, 'config', 'security.json'), 'w') as f:
+            f.write('{"file_permissions": "750"}')
+        policy = load_policy(None, self.root)
+        self.assertEqual((policy['dir_mode'], policy['forbidden_bits']), ('750', '027'))
+
+class TestPermissionApply(TreeTestCase):
+
+    def mode(self, path):
+        return stat.S_IMODE(os.lstat(path).st_mode)
+
+    def test_apply_fixes_tree_and_is_idempotent(self):
+        policy = {'dir_mode': '750', 'forbidden_bits': '027'}
+        loose_file = os.path.join(self.root, 'd0', 'nested', 'a')
+        os.chmod(loose_file, 0o666)
+
+        planned = list(apply_policy(self.root, policy, dry_run=True))
+        self.assertEqual(self.mode(self.root), 0o700)
+        changes = list(apply_policy(self.root, policy))
+        self.assertEqual(changes, planned)
+        # Files first, then directories from the deepest up to the root
+        paths = [c['path'] for c in changes]
+        self.assertEqual(paths[0], loose_file)
+        self.assertEqual(paths[-1], self.root)
+        depths = [p.count(os.sep) for p in paths[1:]]
+        self.assertEqual(depths, sorted(depths, reverse=True))
+
+        self.assertEqual(self.mode(loose_file), 0o640)
+        self.assertEqual(self.mode(os.path.join(self.root, 'd2', 'nested')), 0o750)
+        self.assertEqual(self.audit(policy), [])
+        self.assertEqual(list(apply_policy(self.root, policy)), [])
+
+    def test_swapped_entry_is_not_followed(self):
+        outside = os.path.join(self.tmp.name, 'outside')
+        with open(outside, 'w') as f:
+            f.write('secret')
+        os.chmod(outside, 0o644)
+        path = os.path.join(self.root, 'd0', 'nested', 'a')
+        scanned = os.lstat(path)
+        os.remove(path)
+        os.symlink(outside, path)
+
+        changes = apply_entry(path, scanned, compile_policy({'file_mode': '777'}))
+        self.assertIn('error', changes[0])
+        self.assertEqual(self.mode(outside), 0o644)
+
+        # A hard link to another file is refused as well
+        os.remove(path)
+        os.link(outside, path)
+        changes = apply_entry(path, scanned, compile_policy({'file_mode': '777'}))
+        self.assertIn('error', changes[0])
+        self.assertEqual(self.mode(outside), 0o644)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import os
+import stat
+import sys
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+import sandbox_disk_quota
+from sandbox_disk_quota import check_sandbox_quota, chmod_nofollow, load_index
+
+def write(path, size):
+    with open(path, 'wb') as f:
+        f.write(b'x' * size)
+
+def age(path, seconds=3600):
+    """Backdate an entry so it counts as quiet"""
+    then = time.time() - seconds
+    os.utime(path, (then, then), follow_symlinks=False)
+
+class TestDiskQuota(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.sandbox = self.tmp.name
+        for subdir in ['config', 'workspace', 'data', 'logs', 'temp']:
+            os.makedirs(os.path.join(self.sandbox, subdir))
+        self.file = os.path.join(self.sandbox, 'workspace', 'out.bin')
+        write(self.file, 4096)
+
+    def check(self, **options):
+        return check_sandbox_quota(self.sandbox, '1MB', rescan_after=10 ** 9, **options)
+
+    def test_growth_in_place_is_counted(self):
+        before = self.check()['used_bytes']
+        with open(self.file, 'ab') as f:
+            f.write(b'x' * 65536)
+        self.assertGreaterEqual(self.check()['used_bytes'], before + 65536)
+
+    def test_quiet_directories_rotate_within_budget(self):
+        for i in range(6):
+            os.makedirs(os.path.join(self.sandbox, 'data', f"d{i}"))
+        self.check()
+        for dirpath, dirnames, filenames in os.walk(self.sandbox):
+            for name in filenames:
+                age(os.path.join(dirpath, name))
+            age(dirpath)
+        # Recently changed directories are all rescanned once more and recorded as quiet
+        self.check(budget=2)
+
+        with patch.object(sandbox_disk_quota, 'scan_directory', wraps=sandbox_disk_quota.scan_directory) as scan:
+            self.check(budget=2)
+        # The index file itself keeps config/ hot; everything else waits its turn
+        self.assertLessEqual(scan.call_count, 3)
+
+        # A quiet file that grows is found once the rotation reaches it
+        write(os.path.join(self.sandbox, 'data', 'd5', 'late.bin'), 8192)
+        age(os.path.join(self.sandbox, 'data', 'd5', 'late.bin'))
+        age(os.path.join(self.sandbox, 'data', 'd5'))
+        directories = len(load_index(self.sandbox)['dirs'])
+        used = [self.check(budget=2)['used_bytes'] for _ in range(directories)]
+        self.assertGreaterEqual(used[-1], used[0] + 8192)
+
+    def test_block_revokes_file_write_bits_and_restores_them(self):
+        os.chmod(self.file, 0o640)
+        report = check_sandbox_quota(self.sandbox, '1KB', action='block', rescan_after=10 ** 9)
+        self.assertEqual(report['state'], 'blocked')
+        self.assertEqual(stat.S_IMODE(os.stat(self.file).st_mode), 0o440)
+        self.assertFalse(os.stat(os.path.join(self.sandbox, 'workspace')).st_mode & 0o222)
+
+        os.chmod(os.path.join(self.sandbox, 'workspace'), 0o700)
+        os.remove(self.file)
+        write(os.path.join(self.sandbox, 'workspace', 'small'), 10)
+        os.chmod(os.path.join(self.sandbox, 'workspace'), 0o500)
+        report = check_sandbox_quota(self.sandbox, '1MB', action='block', rescan_after=10 ** 9)
+        self.assertEqual(report['state'], 'ok')
+        self.assertEqual(stat.S_IMODE(os.stat(os.path.join(self.sandbox, 'workspace')).st_mode), 0o755 & ~self.umask())
+
+    def umask(self):
+        mask = os.umask(0)
+        os.umask(mask)
+        return mask
+
+    def test_chmod_does_not_follow_swapped_symlink(self):
+        outside = os.path.join(self.tmp.name, 'outside')
+        write(outside, 1)
+        os.chmod(outside, 0o644)
+        checked = os.lstat(self.file)
+        os.remove(self.file)
+        os.symlink(outside, self.file)
+
+        self.assertFalse(chmod_nofollow(self.file, 0o444, checked))
+        self.assertEqual(stat.S_IMODE(os.stat(outside).st_mode), 0o644)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import gzip
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from sandbox_gc import ARCHIVE_RE, IOBudget, rotate_logs, DEFAULT_SETTINGS
+
+class WritingBudget(IOBudget):
+    """An I/O budget that appends to the log while the collector copies it"""
+
+    def __init__(self, log_path, lines_per_chunk=50):
+        super().__init__(1 << 40)
+        self.log_path = log_path
+        self.lines_per_chunk = lines_per_chunk
+        self.next_line = 0
+
+    def append(self, count):
+        with open(self.log_path, 'a') as f:
+            for _ in range(count):
+                f.write(f"line {self.next_line}\n")
+                self.next_line += 1
+
+    def consume(self, nbytes):
+        self.append(self.lines_per_chunk)
+
+class TestRotateLogs(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.logs = os.path.join(self.tmp.name, 'logs')
+        os.makedirs(self.logs)
+        self.log = os.path.join(self.logs, 'agent.log')
+        self.settings = {**DEFAULT_SETTINGS, 'max_log_bytes': 1024}
+
+    def archives(self):
+        return sorted(name for name in os.listdir(self.logs) if ARCHIVE_RE.match(name))
+
+    def all_lines(self):
+        lines = []
+        for name in self.archives():
+            with gzip.open(os.path.join(self.logs, name), 'rt') as f:
+                lines.extend(f.read().splitlines())
+        with open(self.log) as f:
+            lines.extend(f.read().splitlines())
+        return lines
+
+    def test_log_written_during_rotation(self):
+        budget = WritingBudget(self.log)
+        budget.append(5000)
+        # Every chunk the collector copies is chased by more lines, so the
+        # log is always bigger than what was archived
+        with patch('sandbox_gc.CHUNK_SIZE', 4096):
+            stats = rotate_logs(self.tmp.name, self.settings, budget)
+
+        self.assertEqual(stats['rotated'], 1)
+        self.assertEqual(len(self.archives()), 1)
+        self.assertEqual(self.all_lines(), [f"line {i}" for i in range(budget.next_line)])
+        # The lines written during the copy start the new log
+        with open(self.log) as f:
+            self.assertTrue(f.readline().startswith('line 5000'))
+
+    def test_repeated_rotations_in_one_second_keep_every_archive(self):
+        budget = IOBudget(1 << 40)
+        writer = WritingBudget(self.log)
+        for _ in range(3):
+            writer.append(200)
+            rotate_logs(self.tmp.name, self.settings, budget)
+        self.assertEqual(len(self.archives()), 3)
+        self.assertEqual(self.all_lines(), [f"line {i}" for i in range(600)])
+
+    def test_only_own_archives_are_pruned(self):
+        foreign = os.path.join(self.logs, 'agent.log.backup.gz')
+        with gzip.open(foreign, 'wt') as f:
+            f.write('kept')
+        budget = IOBudget(1 << 40)
+        writer = WritingBudget(self.log)
+        for _ in range(4):
+            writer.append(200)
+            rotate_logs(self.tmp.name, {**self.settings, 'keep_archives': 2}, budget)
+
+        self.assertEqual(len(self.archives()), 2)
+        self.assertTrue(os.path.exists(foreign))
+
+if __name__ == '__main__':
+    unittest.main()
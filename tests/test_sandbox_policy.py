@@ -0,0 +1,67 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from sandbox_policy import get_sandbox_policy
+
+class TestSandboxPolicy(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.sandbox = os.path.realpath(os.path.join(self.tmp.name, 'sandbox'))
+        for subdir in ['config', 'workspace', 'scripts']:
+            os.makedirs(os.path.join(self.sandbox, subdir))
+        self.write_capabilities({
+            'file': {'enabled': True, 'restrictions': ['sandbox_path_only']},
+            'web': {'enabled': True, 'restrictions': ['block_internal_networks']}
+        })
+
+    def write_capabilities(self, capabilities):
+        with open(os.path.join(self.sandbox, 'config', 'capabilities.json'), 'w') as f:
+            json.dump(capabilities, f)
+
+    def test_paths_confined_to_sandbox(self):
+        policy = get_sandbox_policy(self.sandbox)
+        self.assertTrue(policy.check_path(os.path.join(self.sandbox, 'workspace', 'notes.txt')))
+        self.assertFalse(policy.check_path(os.path.join(self.tmp.name, 'outside.txt')))
+        self.assertFalse(policy.check_path(os.path.join(self.sandbox, 'workspace', '..', '..', 'outside.txt')))
+
+    def test_config_and_scripts_are_denied(self):
+        policy = get_sandbox_policy(self.sandbox)
+        self.assertFalse(policy.check_path(os.path.join(self.sandbox, 'config', 'capabilities.json')))
+        self.assertFalse(policy.check_path(os.path.join(self.sandbox, 'scripts', 'start.sh')))
+
+        # A link in the workspace does not lead into config/ either
+        link = os.path.join(self.sandbox, 'workspace', 'caps')
+        os.symlink(os.path.join(self.sandbox, 'config'), link)
+        self.assertFalse(policy.check_path(os.path.join(link, 'capabilities.json')))
+
+        # Retargeting the link is seen on the next check
+        os.remove(link)
+        os.symlink(os.path.join(self.sandbox, 'workspace'), link)
+        self.assertTrue(policy.check_path(os.path.join(link, 'capabilities.json')))
+
+    def test_internal_networks_blocked(self):
+        policy = get_sandbox_policy(self.sandbox)
+        self.assertTrue(policy.check_address('93.184.216.34'))
+        for address in ['10.1.2.3', '127.0.0.1', '::ffff:192.168.1.1', '64:ff9b::a01:203', '2002:a01:203::1', 'fd00::1']:
+            self.assertFalse(policy.check_address(address), address)
+
+    def test_policy_recompiled_when_capabilities_change(self):
+        self.assertTrue(get_sandbox_policy(self.sandbox).check_address('93.184.216.34'))
+        self.write_capabilities({'file': {'enabled': True}, 'web': {'enabled': False}})
+        stat = os.stat(os.path.join(self.sandbox, 'config', 'capabilities.json'))
+        os.utime(os.path.join(self.sandbox, 'config', 'capabilities.json'), ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+        policy = get_sandbox_policy(self.sandbox)
+        self.assertFalse(policy.check_address('93.184.216.34'))
+        # Without sandbox_path_only anything but the protected directories is allowed
+        self.assertTrue(policy.check_path(os.path.join(self.tmp.name, 'outside.txt')))
+        self.assertFalse(policy.check_path(os.path.join(self.sandbox, 'config', 'capabilities.json')))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from sandbox_registry import get_sandbox, query_sandboxes, rebuild_registry, register_sandbox, set_sandbox_status
+
+class TestSandboxRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = os.path.join(self.tmp.name, 'sandboxes')
+        self.registry = os.path.join(self.tmp.name, 'registry.db')
+
+    def make_sandbox(self, name, capabilities=('web', 'file'), root=None):
+        path = os.path.join(root or self.root, name)
+        os.makedirs(os.path.join(path, 'config'))
+        with open(os.path.join(path, 'config', 'agent.json'), 'w') as f:
+            json.dump({'name': name, 'capabilities': list(capabilities), 'sandbox': {'isolation_level': 'high'}}, f)
+        return path
+
+    def test_register_and_query_by_capability(self):
+        path = self.make_sandbox('alpha')
+        register_sandbox({'name': 'alpha', 'path': path, 'capabilities': {'allowed': ['web']}}, self.registry)
+        self.assertEqual([s['name'] for s in query_sandboxes('web', registry_path=self.registry)], ['alpha'])
+        self.assertEqual(query_sandboxes('shell', registry_path=self.registry), [])
+
+    def test_rebuild_indexes_sandboxes_and_keeps_status(self):
+        self.make_sandbox('alpha')
+        self.make_sandbox('beta', capabilities=['shell'])
+        self.assertEqual(rebuild_registry(self.root, self.registry), 2)
+        set_sandbox_status('alpha', 'paused', self.registry)
+
+        self.assertEqual(rebuild_registry(self.root, self.registry), 2)
+        self.assertEqual(get_sandbox('alpha', self.registry)['status'], 'paused')
+        self.assertEqual([s['name'] for s in query_sandboxes('shell', registry_path=self.registry)], ['beta'])
+
+    def test_rebuild_removes_deleted_sandboxes(self):
+        self.make_sandbox('alpha')
+        gone = self.make_sandbox('beta')
+        elsewhere = self.make_sandbox('gamma', root=os.path.join(self.tmp.name, 'custom'))
+        register_sandbox({'name': 'gamma', 'path': elsewhere}, self.registry)
+        rebuild_registry(self.root, self.registry)
+
+        shutil.rmtree(gone)
+        rebuild_registry(self.root, self.registry)
+        names = [s['name'] for s in query_sandboxes(registry_path=self.registry)]
+        # Sandboxes created with --path outside the root stay while they exist
+        self.assertEqual(names, ['alpha', 'gamma'])
+        self.assertEqual(query_sandboxes('web', registry_path=self.registry)[0]['name'], 'alpha')
+
+    def test_missing_root_is_empty(self):
+        path = self.make_sandbox('alpha', root=os.path.join(self.tmp.name, 'custom'))
+        register_sandbox({'name': 'alpha', 'path': path}, self.registry)
+        shutil.rmtree(path)
+        self.assertEqual(rebuild_registry(os.path.join(self.tmp.name, 'missing'), self.registry), 0)
+        self.assertIsNone(get_sandbox('alpha', self.registry))
+
+if __name__ == '__main__':
+    unittest.main()
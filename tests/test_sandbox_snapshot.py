@@ -0,0 +1,80 @@
+import os
+import stat
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+import sandbox_snapshot
+from sandbox_snapshot import SnapshotStore, create_snapshot, restore_snapshot
+
+def mode_of(path):
+    return stat.S_IMODE(os.lstat(path).st_mode)
+
+class TestRestoreSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.sandbox = os.path.join(self.tmp.name, 'sandbox')
+        self.store = SnapshotStore(os.path.join(self.tmp.name, 'snapshots'))
+        self.outer = os.path.join(self.sandbox, 'data')
+        self.inner = os.path.join(self.outer, 'inner')
+        os.makedirs(self.inner)
+        with open(os.path.join(self.inner, 'state.json'), 'w') as f:
+            f.write('{"step": 1}')
+        # Read-only directories, as an agent may leave its finished outputs
+        os.chmod(self.inner, 0o555)
+        os.chmod(self.outer, 0o555)
+        self.addCleanup(self.make_writable)
+        create_snapshot(self.store, self.sandbox)
+
+    def make_writable(self):
+        for path in (self.outer, self.inner):
+            if os.path.isdir(path):
+                os.chmod(path, 0o755)
+
+    def test_changed_file_in_read_only_directories(self):
+        self.make_writable()
+        with open(os.path.join(self.inner, 'state.json'), 'w') as f:
+            f.write('{"step": 2, "more": true}')
+        with open(os.path.join(self.inner, 'scratch'), 'w') as f:
+            f.write('x')
+        os.chmod(self.inner, 0o555)
+        os.chmod(self.outer, 0o700)
+
+        result = restore_snapshot(self.store, self.sandbox)
+        self.assertEqual(result['changes']['deleted'], [os.path.join('data', 'inner', 'scratch')])
+        with open(os.path.join(self.inner, 'state.json')) as f:
+            self.assertEqual(f.read(), '{"step": 1}')
+        self.assertEqual(mode_of(self.outer), 0o555)
+        self.assertEqual(mode_of(self.inner), 0o555)
+
+    def test_directory_modes_are_applied_last_deepest_first(self):
+        self.make_writable()
+        os.remove(os.path.join(self.inner, 'state.json'))
+        os.rmdir(self.inner)
+
+        chmods = []
+        real_chmod = os.chmod
+        def record_chmod(path, mode, *args, **kwargs):
+            chmods.append(path)
+            return real_chmod(path, mode, *args, **kwargs)
+        with patch.object(sandbox_snapshot.os, 'chmod', side_effect=record_chmod):
+            restore_snapshot(self.store, self.sandbox)
+
+        self.assertEqual(chmods[-2:], [self.inner, self.outer])
+        self.assertEqual(mode_of(self.outer), 0o555)
+        self.assertEqual(mode_of(self.inner), 0o555)
+        self.assertTrue(os.path.exists(os.path.join(self.inner, 'state.json')))
+
+    def test_dry_run_changes_nothing(self):
+        os.chmod(self.outer, 0o755)
+        result = restore_snapshot(self.store, self.sandbox, dry_run=True)
+        self.assertEqual(result['changes']['metadata'], ['data'])
+        self.assertEqual(mode_of(self.outer), 0o755)
+
+if __name__ == '__main__':
+    unittest.main()
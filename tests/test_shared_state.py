@@ -0,0 +1,147 @@
+import os
+import random
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+import shared_state
+from shared_state import SEQ, STATE_FILE, USED, create_shared_state, open_shared_state
+
+class TestSharedState(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.sandbox = self.tmp.name
+        self.path = os.path.join(self.sandbox, 'data', STATE_FILE)
+
+    def crash_mid_write(self, key, value):
+        """Leave key's record odd, as a writer killed inside _write_record would"""
+        writer = open_shared_state(self.sandbox, writer=True, slots=16)
+        writer.set(key, value)
+        offset = writer._offset(writer._find(key.encode()))
+        SEQ.pack_into(writer.buf, offset, SEQ.unpack_from(writer.buf, offset)[0] + 1)
+        writer.close()
+
+    def test_set_and_get(self):
+        with open_shared_state(self.sandbox, writer=True, slots=16) as writer:
+            writer.set('plan', b'step 3')
+            with open_shared_state(self.sandbox) as reader:
+                self.assertEqual(reader.get('plan'), b'step 3')
+                self.assertEqual(reader.version('plan'), 1)
+
+    @patch.object(shared_state, 'WRITE_STALL_TIMEOUT', 0.05)
+    def test_reader_gives_up_on_crashed_writer(self):
+        self.crash_mid_write('plan', b'step 3')
+        with open_shared_state(self.sandbox) as reader:
+            with self.assertRaises(TimeoutError):
+                reader.get('plan')
+            with self.assertRaises(TimeoutError):
+                reader.keys()
+
+    def test_writer_recovers_crashed_records(self):
+        self.crash_mid_write('plan', b'step 3')
+        with self.assertLogs(level='WARNING'):
+            writer = open_shared_state(self.sandbox, writer=True)
+        with writer, open_shared_state(self.sandbox) as reader:
+            self.assertIsNone(reader.get('plan'))
+            writer.set('plan', b'step 4')
+            self.assertEqual(reader.get('plan'), b'step 4')
+
+    def test_create_never_replaces_existing_store(self):
+        with open_shared_state(self.sandbox, writer=True, slots=16) as writer:
+            inode = os.stat(self.path).st_ino
+            self.assertFalse(create_shared_state(self.path, slots=16))
+            self.assertEqual(os.stat(self.path).st_ino, inode)
+            # The first writer still holds the lock on the live file
+            with self.assertRaises(RuntimeError):
+                open_shared_state(self.sandbox, writer=True)
+            writer.set('plan', b'kept')
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), [STATE_FILE])
+
+    def test_layout_mismatch_is_an_error(self):
+        open_shared_state(self.sandbox, writer=True, slots=16).close()
+        with self.assertRaises(ValueError):
+            open_shared_state(self.sandbox, writer=True, slots=32)
+        with open_shared_state(self.sandbox, writer=True, slots=16) as store:
+            self.assertEqual(store.slots, 16)
+
+    def test_churn_keeps_lookups_short(self):
+        rng = random.Random(7)
+        live = {}
+        with open_shared_state(self.sandbox, writer=True, slots=64) as writer, \
+             open_shared_state(self.sandbox) as reader:
+            for i in range(5000):
+                if live and (len(live) > 40 or rng.random() < 0.5):
+                    key = rng.choice(sorted(live))
+                    self.assertTrue(writer.delete(key))
+                    del live[key]
+                else:
+                    key = f"key-{i}"
+                    writer.set(key, key.encode())
+                    live[key] = key.encode()
+                self.assertLessEqual(writer.tombstones, 64 * shared_state.TOMBSTONE_LIMIT)
+
+            self.assertEqual(sorted(reader.keys()), sorted(live))
+            for key, value in live.items():
+                self.assertEqual(reader.get(key), value)
+            # A miss stops at an empty slot instead of walking the whole table
+            with patch.object(reader, '_read_record', wraps=reader._read_record) as reads:
+                self.assertIsNone(reader.get('never-set'))
+            self.assertLess(reads.call_count, 64)
+
+    def test_reader_retries_a_miss_while_compaction_moves_the_key(self):
+        with open_shared_state(self.sandbox, writer=True, slots=16) as writer, \
+             open_shared_state(self.sandbox) as reader:
+            home = writer._home(b'anchor')
+            filler = next(f"filler-{i}" for i in range(10000) if writer._home(f"filler-{i}".encode()) == home)
+            writer.set(filler, b'x')
+            writer.set('anchor', b'kept')
+            writer.delete(filler)
+
+            read_record = reader._read_record
+            calls = []
+
+            def compact_mid_probe(slot, key, reader_fn=None):
+                calls.append(slot)
+                result = read_record(slot, key, reader_fn)
+                if len(calls) == 1:
+                    # The probe has passed the tombstone the anchor is about to move into
+                    writer.compact()
+                return result
+
+            with patch.object(reader, '_read_record', side_effect=compact_mid_probe):
+                self.assertEqual(reader.get('anchor'), b'kept')
+            self.assertEqual(writer._find(b'anchor'), home)
+
+    def test_compaction_keeps_every_record(self):
+        with open_shared_state(self.sandbox, writer=True, slots=32) as writer:
+            for i in range(24):
+                writer.set(f"key-{i}", b'%d' % i)
+            for i in range(0, 24, 3):
+                writer.delete(f"key-{i}")
+            self.assertEqual(writer.compact(), 8)
+            self.assertEqual(writer.stat()['tombstones'], 0)
+            with open_shared_state(self.sandbox) as reader:
+                for i in range(24):
+                    self.assertEqual(reader.get(f"key-{i}"), None if i % 3 == 0 else b'%d' % i)
+
+    def test_writer_drops_copy_left_by_interrupted_move(self):
+        with open_shared_state(self.sandbox, writer=True, slots=16) as writer:
+            writer.set('a', b'1')
+            slot = writer._find(b'a')
+            # As if compaction crashed after copying the record ahead of a stale original
+            writer._write_record((slot + 1) % 16, b'a', USED, b'old')
+        with self.assertLogs(level='WARNING'):
+            writer = open_shared_state(self.sandbox, writer=True)
+        with writer:
+            self.assertEqual(writer.get('a'), b'1')
+            self.assertTrue(writer.delete('a'))
+            self.assertIsNone(writer.get('a'))
+            self.assertEqual(writer.stat()['tombstones'], 2)
+
+if __name__ == '__main__':
+    unittest.main()
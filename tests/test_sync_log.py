@@ -0,0 +1,105 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+import sync_log
+from sync_log import SyncLog, encode_record, read_durable_end, replay, segment_path, OP_SET
+
+# Room for a handful of small records per segment
+SEGMENT_BYTES = 200
+
+class TestSyncLogCompaction(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.directory = self.tmp.name
+        self.log = SyncLog(self.directory, segment_bytes=SEGMENT_BYTES)
+        self.addCleanup(self.log.close)
+
+    def fill_closed_segment(self):
+        """Append to the first segment until the log rolls over; returns its offsets"""
+        offsets = []
+        while len(self.log.segments) == 1:
+            offsets.append(self.log.append(f"key{len(offsets)}", b'value'))
+        return offsets[:-1]
+
+    def values(self):
+        return {record.key: (record.offset, record.value) for record in replay(self.directory)}
+
+    def test_superseded_records_are_dropped(self):
+        offsets = self.fill_closed_segment()
+        rewritten = self.log.append('key0', b'newer')
+
+        stats = self.log.compact()
+        self.assertEqual(stats['records_dropped'], 1)
+        remaining = [record.offset for record in replay(self.directory)]
+        self.assertNotIn(offsets[0], remaining)
+        self.assertEqual(self.values()[b'key0'], (rewritten, b'newer'))
+
+    def test_records_past_durable_offset_do_not_supersede(self):
+        offsets = self.fill_closed_segment()
+        # A write the committer has put in the active segment but not yet made durable
+        active = segment_path(self.directory, self.log.segments[-1])
+        with open(active, 'ab') as f:
+            f.write(encode_record(self.log.next_offset, time.time(), OP_SET, b'key0', b'lost in a crash'))
+
+        self.assertEqual(self.log.compact()['records_dropped'], 0)
+        self.assertIn(offsets[0], [record.offset for record in replay(self.directory)])
+
+    def test_corrupt_segment_is_not_rewritten(self):
+        self.fill_closed_segment()
+        self.log.append('key0', b'newer')
+        path = segment_path(self.directory, self.log.segments[0])
+        with open(path, 'r+b') as f:
+            f.seek(-1, os.SEEK_END)
+            last = f.read(1)
+            f.seek(-1, os.SEEK_END)
+            f.write(bytes([last[0] ^ 0xFF]))
+        with open(path, 'rb') as f:
+            corrupted = f.read()
+
+        with self.assertLogs(level='WARNING'):
+            stats = self.log.compact()
+        self.assertEqual(stats['segments_rewritten'], 0)
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), corrupted)
+
+class TestSyncLogDurability(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.directory = self.tmp.name
+
+    def test_readers_stop_at_durable_offset(self):
+        with SyncLog(self.directory, segment_bytes=SEGMENT_BYTES) as log:
+            durable = [log.append(f"key{i}", b'value') for i in range(3)]
+            self.assertEqual(read_durable_end(self.directory), durable[-1] + 1)
+            # Flushed by the writer but not yet fsynced: invisible to other processes
+            with open(segment_path(self.directory, log.segments[-1]), 'ab') as f:
+                f.write(encode_record(log.next_offset, time.time(), OP_SET, b'key9', b'not durable'))
+            self.assertEqual([record.offset for record in replay(self.directory)], durable)
+
+    def test_closed_index_and_directory_are_fsynced(self):
+        synced = []
+        real_fsync = os.fsync
+        def fsync(fd):
+            synced.append(os.readlink(f"/proc/self/fd/{fd}"))
+            real_fsync(fd)
+
+        with SyncLog(self.directory, segment_bytes=SEGMENT_BYTES) as log:
+            first = log.segments[0]
+            with patch.object(sync_log.os, 'fsync', fsync):
+                while len(log.segments) == 1:
+                    log.append('key', b'value')
+        self.assertIn(segment_path(self.directory, first, '.index'), synced)
+        self.assertIn(os.path.realpath(self.directory), synced)
+
+if __name__ == '__main__':
+    unittest.main()
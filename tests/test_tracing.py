@@ -0,0 +1,71 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts')
+sys.path.insert(0, SCRIPTS_DIR)
+
+from tracing import MAX_RECORD_BYTES, TRACE_FILE_ENV, _Exporter, summarize_trace_file
+
+# Emits spans with attributes of assorted sizes, some past MAX_RECORD_BYTES
+EMITTER = '''
+from tracing import span
+for i in range(300):
+    with span('work', index=i, payload='x' * (i * 37 % 6000)):
+        pass
+'''
+
+def span_record(trace_id, name, duration_ms=1.0, parent_id=None, span_id=None):
+    return {'trace_id': trace_id, 'span_id': span_id or name, 'parent_id': parent_id, 'name': name,
+            'duration_ms': duration_ms, 'pid': 1, 'status': 'ok'}
+
+class TestTracing(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.trace_file = os.path.join(self.tmp.name, 'trace.jsonl')
+
+    def read_lines(self):
+        with open(self.trace_file, 'rb') as f:
+            return f.read().splitlines()
+
+    def test_processes_sharing_a_file_write_whole_lines(self):
+        env = dict(os.environ, PYTHONPATH=SCRIPTS_DIR, **{TRACE_FILE_ENV: self.trace_file})
+        children = [subprocess.Popen([sys.executable, '-c', EMITTER], env=env) for _ in range(4)]
+        self.assertEqual([child.wait(30) for child in children], [0] * 4)
+
+        lines = self.read_lines()
+        self.assertEqual(len(lines), 4 * 300)
+        records = [json.loads(line) for line in lines]
+        self.assertTrue(all(len(line) < MAX_RECORD_BYTES for line in lines))
+        self.assertTrue(any(record.get('truncated') for record in records))
+        self.assertEqual(len({record['pid'] for record in records}), 4)
+
+    def test_shutdown_drains_the_queue(self):
+        exporter = _Exporter()
+        exporter.start(self.trace_file)
+        for i in range(5000):
+            exporter.submit(span_record('t', f"s{i}"))
+        exporter.shutdown()
+        self.assertFalse(exporter.thread.is_alive())
+        self.assertEqual(len(self.read_lines()), 5000 - exporter.dropped)
+
+    def test_summary_skips_malformed_lines(self):
+        with open(self.trace_file, 'w') as f:
+            f.write(json.dumps(span_record('t', 'root', 5.0)) + '\n')
+            f.write('{"trace_id": "t", "span_id": "cut sh\n')
+            f.write('"a string"\n[]\n\n')
+            f.write(json.dumps(span_record('t', 'child', 2.0, parent_id='root')) + '\n')
+            f.write(json.dumps(span_record('t', 'tail', 1.0, parent_id='root'))[:-10])
+
+        with self.assertLogs(level='WARNING'):
+            summary = summarize_trace_file(self.trace_file)
+        self.assertEqual(summary['t']['spans'], 2)
+        self.assertEqual(summary['t']['roots'], [{'name': 'root', 'duration_ms': 5.0}])
+
+if __name__ == '__main__':
+    unittest.main()